@@ -1,28 +1,59 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, Field
-from typing import List, Optional
-import uuid
-from motor.motor_asyncio import AsyncIOMotorClient
+from typing import List, Optional, Set, Tuple
 import os
-from dotenv import load_dotenv
+import uuid
+from motor.motor_asyncio import AsyncIOMotorDatabase
 from fastapi import Depends
-from api.admin_insights import get_current_user   # or from wherever get_current_user is defined
-
+from api.database import get_db
+from api import http_cache
+from api.http_cache import response_cache
 
 
-# Load environment variables
-load_dotenv()
+# Database the collection lived in before it moved to DB_NAME
+LEGACY_DB_NAME = os.environ.get('PHOTOGRAPHER_DB', 'photographer_db')
 
 # Router
 router = APIRouter(prefix="/api/about-me", tags=["About Me"])
 
-# MongoDB setup
-MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017")
-DB_NAME = os.getenv("PHOTOGRAPHER_DB", "photographer_db")
 
-client = AsyncIOMotorClient(MONGO_URL)
-db = client[DB_NAME]
-collection = db["about_me"]
+def get_collection(db: AsyncIOMotorDatabase = Depends(get_db)):
+    return db["about_me"]
+
+
+async def copy_legacy_about_me(source, target, batch_size: int = 500) -> Tuple[int, int]:
+    """Copy About Me documents from the legacy collection into the current one.
+
+    Users who already have a document in target keep it, so the copy can be
+    rerun at any time. The legacy collection had no unique index, so only the
+    first document per user is copied. Returns (copied, skipped).
+    """
+    copied = skipped = 0
+    seen: Set[str] = set()
+    batch: List[dict] = []
+
+    async def flush() -> None:
+        nonlocal copied, skipped
+        user_ids = [doc["user_id"] for doc in batch]
+        existing = {d["user_id"] async for d in target.find({"user_id": {"$in": user_ids}}, {"_id": 0, "user_id": 1})}
+        missing = [doc for doc in batch if doc["user_id"] not in existing]
+        if missing:
+            await target.insert_many(missing, ordered=False)
+        copied += len(missing)
+        skipped += len(batch) - len(missing)
+        batch.clear()
+
+    async for doc in source.find({"user_id": {"$exists": True}}).sort("_id", 1).batch_size(batch_size):
+        if doc["user_id"] in seen:
+            skipped += 1
+            continue
+        seen.add(doc["user_id"])
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            await flush()
+    if batch:
+        await flush()
+    return copied, skipped
 
 # --------- Pydantic Models ---------
 class AboutMeCreate(BaseModel):
@@ -48,7 +79,7 @@ class AboutMe(BaseModel):
 
 # --------- CREATE ---------
 @router.post("/", response_model=AboutMe)
-async def create_about_me(data: AboutMeCreate,):
+async def create_about_me(data: AboutMeCreate, collection=Depends(get_collection)):
     
     try:
         print(f"🔍 Checking for existing profile for user: {data.user_id}")
@@ -72,6 +103,7 @@ async def create_about_me(data: AboutMeCreate,):
             raise HTTPException(status_code=500, detail="Failed to create profile")
             
         print(f"✅ Successfully created profile: {created_doc}")
+        await response_cache.bump(collection.database, data.user_id, http_cache.ABOUT_ME)
         return AboutMe(**created_doc)
         
     except HTTPException:
@@ -84,7 +116,7 @@ async def create_about_me(data: AboutMeCreate,):
 
 # --------- UPDATE ---------
 @router.put("/{user_id}", response_model=AboutMe)
-async def update_about_me(user_id: str, data: AboutMeUpdate):
+async def update_about_me(user_id: str, data: AboutMeUpdate, collection=Depends(get_collection)):
     try:
         print(f"🔍 Checking existing profile for update - user: {user_id}")
         # Check if profile exists
@@ -121,6 +153,7 @@ async def update_about_me(user_id: str, data: AboutMeUpdate):
             raise HTTPException(status_code=500, detail="Failed to fetch updated profile")
             
         print(f"✅ Successfully updated profile: {updated_doc}")
+        await response_cache.bump(collection.database, user_id, http_cache.ABOUT_ME)
         return AboutMe(**updated_doc)
         
     except HTTPException:
@@ -133,15 +166,18 @@ async def update_about_me(user_id: str, data: AboutMeUpdate):
 
 # --------- GET (Fetch by user_id) ---------
 @router.get("/{user_id}", response_model=AboutMe)
-async def get_about_me(user_id: str):
-    try:
+async def get_about_me(user_id: str, request: Request, collection=Depends(get_collection)):
+    async def load():
         print(f"🔍 Fetching profile for user: {user_id}")
         doc = await collection.find_one({"user_id": user_id})
         if not doc:
             print(f"❌ Profile not found for user: {user_id}")
             raise HTTPException(status_code=404, detail="About Me profile not found")
         print(f"✅ Found profile: {doc}")
-        return AboutMe(**doc)
+        return AboutMe(**doc), {}
+
+    try:
+        return await response_cache.respond(request, collection.database, http_cache.ABOUT_ME, user_id, load)
     except HTTPException:
         raise
     except Exception as e:
@@ -152,7 +188,7 @@ async def get_about_me(user_id: str):
 
 # --------- DELETE ---------
 @router.delete("/{user_id}")
-async def delete_about_me(user_id: str):
+async def delete_about_me(user_id: str, collection=Depends(get_collection)):
     try:
         print(f"🗑️ Deleting profile for user: {user_id}")
         result = await collection.delete_one({"user_id": user_id})
@@ -160,6 +196,7 @@ async def delete_about_me(user_id: str):
             print(f"❌ Profile not found for deletion - user: {user_id}")
             raise HTTPException(status_code=404, detail="About Me profile not found")
         print(f"✅ Successfully deleted profile for user: {user_id}")
+        await response_cache.bump(collection.database, user_id, http_cache.ABOUT_ME)
         return {"message": "About Me profile deleted successfully"}
     except HTTPException:
         raise
@@ -0,0 +1,154 @@
+# api/admin_export.py
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from api.admin_insights import require_admin
+from api.auth import User, get_current_user
+from api.database import get_db
+from api.loaders import Loaders
+
+router = APIRouter(prefix="/api/admin/export", tags=["Admin Export"])
+
+# Documents pulled from the cursor (and enriched) per round trip. Memory per
+# export is bounded by this, not by the size of the collection.
+EXPORT_BATCH_SIZE = 500
+
+COLUMNS: Dict[str, List[str]] = {
+    "users": ["id", "email", "full_name", "role", "restricted", "restriction_reason", "created_at"],
+    "bookings": [
+        "id", "status", "booking_date", "booking_time", "location", "created_at",
+        "user_id", "user_name", "user_email",
+        "photographer_id", "photographer_name",
+        "package_id", "package_name", "package_price",
+    ],
+    "reviews": ["id", "photographer_id", "user_id", "reviewer_name", "rating", "review_text", "created_at"],
+    "reports": [
+        "id", "status", "reason", "description", "admin_action", "created_at",
+        "reporter_id", "reporter_name", "photographer_id", "photographer_name",
+    ],
+}
+
+PROJECTIONS: Dict[str, Dict[str, int]] = {
+    "users": {"_id": 0, "password": 0},
+    "bookings": {"_id": 0},
+    "reviews": {"_id": 0},
+    "reports": {"_id": 0},
+}
+
+
+def _name(doc):
+    return doc.get("full_name") if doc else None
+
+
+async def _enrich(db, kind: str, batch: List[dict]) -> List[Dict[str, Any]]:
+    """Flatten one batch into export rows, resolving references with one query per collection."""
+    # fresh loaders per batch so the memo cache can't grow with the export
+    loaders = Loaders(db)
+
+    if kind == "bookings":
+        users, packages = await asyncio.gather(
+            loaders.users.load_many([b.get("user_id") for b in batch] + [b.get("photographer_id") for b in batch]),
+            loaders.packages.load_many(b.get("package_id") for b in batch),
+        )
+        for b in batch:
+            user = users.get(b.get("user_id"))
+            package = packages.get(b.get("package_id"))
+            b["user_name"] = _name(user)
+            b["user_email"] = user.get("email") if user else None
+            b["photographer_name"] = _name(users.get(b.get("photographer_id")))
+            b["package_name"] = package.get("name") if package else None
+            b["package_price"] = package.get("price") if package else None
+
+    elif kind == "reviews":
+        users = await loaders.users.load_many(r.get("user_id") for r in batch)
+        for r in batch:
+            r["reviewer_name"] = _name(users.get(r.get("user_id")))
+
+    elif kind == "reports":
+        users = await loaders.users.load_many(
+            [r.get("reporter_id") for r in batch] + [r.get("photographer_id") for r in batch]
+        )
+        for r in batch:
+            r["reporter_name"] = _name(users.get(r.get("reporter_id")))
+            r["photographer_name"] = _name(users.get(r.get("photographer_id")))
+
+    columns = COLUMNS[kind]
+    return [{col: doc.get(col) for col in columns} for doc in batch]
+
+
+def _cell(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+async def _export_rows(db, kind: str) -> AsyncIterator[List[Dict[str, Any]]]:
+    cursor = db[kind].find({}, PROJECTIONS[kind]).sort("_id", 1).batch_size(EXPORT_BATCH_SIZE)
+    batch: List[dict] = []
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            yield await _enrich(db, kind, batch)
+            batch = []
+    if batch:
+        yield await _enrich(db, kind, batch)
+
+
+async def _ndjson(db, kind: str) -> AsyncIterator[bytes]:
+    async for rows in _export_rows(db, kind):
+        yield "".join(json.dumps(row, default=_json_default) + "\n" for row in rows).encode()
+
+
+async def _csv(db, kind: str) -> AsyncIterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(COLUMNS[kind])
+    yield buf.getvalue().encode()
+
+    async for rows in _export_rows(db, kind):
+        buf.seek(0)
+        buf.truncate()
+        writer.writerows([[_cell(row[col]) for col in COLUMNS[kind]] for row in rows])
+        yield buf.getvalue().encode()
+
+
+@router.get("/{kind}")
+async def export_collection(
+    kind: str,
+    format: str = Query("ndjson", description="ndjson / csv"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_db),
+):
+    """Admin: stream a full dump of users, bookings, reviews or reports"""
+    require_admin(current_user)
+
+    if kind not in COLUMNS:
+        raise HTTPException(status_code=404, detail=f"Unknown export. Must be one of {sorted(COLUMNS)}")
+    if format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="Invalid format. Must be one of ['csv', 'ndjson']")
+
+    if format == "csv":
+        body, media_type = _csv(db, kind), "text/csv"
+    else:
+        body, media_type = _ndjson(db, kind), "application/x-ndjson"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{kind}.{format}"'},
+    )
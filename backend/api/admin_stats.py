@@ -0,0 +1,105 @@
+# api/admin_stats.py
+import asyncio
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+COUNTERS_COLLECTION = "counters"
+STATS_DOC_ID = "admin_stats"
+
+# How long a worker serves the same stats snapshot to the dashboard poll
+ADMIN_STATS_CACHE_SECONDS = float(os.environ.get('ADMIN_STATS_CACHE_SECONDS', '5'))
+
+STAT_FIELDS = [
+    "total_users",
+    "total_photographers",
+    "pending_photographers",
+    "approved_photographers",
+    "total_bookings",
+    "pending_bookings",
+    "pending_reports",
+    "total_reviews",
+]
+
+_cache: Optional[Tuple[float, Dict[str, int]]] = None
+
+
+def _total(collection, exact: bool):
+    return collection.count_documents({}) if exact else collection.estimated_document_count()
+
+
+async def recount(db, exact: bool = False) -> Dict[str, int]:
+    """Recount every stat, all queries in flight at once.
+
+    Filtered counts hit single-field indexes (COUNT_SCAN). The collection
+    totals come from metadata via estimated_document_count, which can drift
+    after an unclean shutdown; exact=True counts them with count_documents.
+    """
+    values = await asyncio.gather(
+        db.users.count_documents({"role": "user"}),
+        db.users.count_documents({"role": "photographer"}),
+        db.photographer_profiles.count_documents({"approval_status": "pending"}),
+        db.photographer_profiles.count_documents({"approval_status": "approved"}),
+        _total(db.bookings, exact),
+        db.bookings.count_documents({"status": "pending"}),
+        db.reports.count_documents({"status": "pending"}),
+        _total(db.reviews, exact),
+    )
+    return dict(zip(STAT_FIELDS, values))
+
+
+async def refresh(db, exact: bool = False) -> Dict[str, int]:
+    """Recount and overwrite the materialized counters document."""
+    global _cache
+    stats = await recount(db, exact)
+    await db[COUNTERS_COLLECTION].replace_one({"_id": STATS_DOC_ID}, stats, upsert=True)
+    _cache = (time.monotonic() + ADMIN_STATS_CACHE_SECONDS, stats)
+    return stats
+
+
+async def get_stats(db, fresh: bool = False) -> Dict[str, int]:
+    """Admin dashboard counters: cached snapshot, else the counters document, else a recount.
+
+    fresh=True skips both and recounts exactly.
+    """
+    global _cache
+    if fresh:
+        return await refresh(db, exact=True)
+
+    if _cache is not None and _cache[0] > time.monotonic():
+        return _cache[1]
+
+    doc = await db[COUNTERS_COLLECTION].find_one({"_id": STATS_DOC_ID}, {"_id": 0})
+    if doc is None or any(field not in doc for field in STAT_FIELDS):
+        return await refresh(db)
+
+    stats = {field: doc[field] for field in STAT_FIELDS}
+    _cache = (time.monotonic() + ADMIN_STATS_CACHE_SECONDS, stats)
+    return stats
+
+
+async def bump(db, **deltas: int) -> None:
+    """Apply write-side deltas to the counters document, e.g. bump(db, total_bookings=1).
+
+    The document is never upserted here: until the first recount creates it,
+    there is nothing to keep in sync, and a partial document would be wrong.
+    """
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if deltas:
+        await db[COUNTERS_COLLECTION].update_one({"_id": STATS_DOC_ID}, {"$inc": deltas})
+
+
+def status_deltas(prefix: str, tracked: Tuple[str, ...], old: Optional[str], new: Optional[str]) -> Dict[str, int]:
+    """Counter deltas for a document moving from status `old` to `new`.
+
+    e.g. status_deltas("photographers", ("pending", "approved"), "pending", "approved")
+    -> {"pending_photographers": -1, "approved_photographers": 1}
+    """
+    deltas: Dict[str, int] = {}
+    if old == new:
+        return deltas
+    if old in tracked:
+        deltas[f"{old}_{prefix}"] = deltas.get(f"{old}_{prefix}", 0) - 1
+    if new in tracked:
+        deltas[f"{new}_{prefix}"] = deltas.get(f"{new}_{prefix}", 0) + 1
+    return deltas
@@ -0,0 +1,124 @@
+# api/auth.py
+import os
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+import jwt
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
+
+from api.database import get_db
+
+security = HTTPBearer()
+SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your-secret-key-change-in-production')
+ALGORITHM = "HS256"
+
+USER_CACHE_TTL_SECONDS = float(os.environ.get('USER_CACHE_TTL_SECONDS', '30'))
+USER_CACHE_MAX_SIZE = int(os.environ.get('USER_CACHE_MAX_SIZE', '10000'))
+
+
+class User(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    email: EmailStr
+    full_name: str
+    role: str  # user, photographer, admin
+    restricted: bool = False
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class UserCache:
+    """Bounded LRU of resolved `User` objects keyed by user id, with a TTL per entry.
+
+    Invalidation is in-process: the worker that restricts/deletes a user evicts
+    it immediately, other workers pick the change up within the TTL. Restricted
+    users are rejected on load and so never cached.
+    """
+
+    def __init__(self, maxsize: int = USER_CACHE_MAX_SIZE, ttl: float = USER_CACHE_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, User]]" = OrderedDict()
+        # Bumped on every invalidation so that a lookup which started before an
+        # eviction cannot write its (now stale) result back afterwards.
+        self.generation = 0
+
+    def get(self, user_id: str) -> Optional[User]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return user
+
+    def set(self, user_id: str, user: User, generation: int) -> None:
+        if generation != self.generation or self.maxsize <= 0:
+            return
+        self._entries[user_id] = (time.monotonic() + self.ttl, user)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> None:
+        self.generation += 1
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+def invalidate_user(user_id: str) -> None:
+    """Evict a user from the auth cache; call after any restriction, role change or delete."""
+    user_cache.invalidate(user_id)
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncIOMotorDatabase = Depends(get_db),
+) -> User:
+    return await user_from_token(credentials.credentials, db)
+
+
+async def user_from_token(token: str, db: AsyncIOMotorDatabase) -> User:
+    """Resolve a bearer token to its user; for transports that cannot send headers (e.g. EventSource).
+
+    Restricted users are refused with 403 on every authenticated route,
+    matching login, which issues them no token.
+    """
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        user_id: str = payload.get("sub")
+        if user_id is None:
+            raise HTTPException(status_code=401, detail="Invalid token")
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token expired")
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    generation = user_cache.generation
+    # Users awaiting the cascade delete job are already gone as far as auth goes
+    user_doc = await db.users.find_one({"id": user_id, "deleted": {"$ne": True}}, {"_id": 0, "password": 0})
+    if user_doc is None:
+        raise HTTPException(status_code=401, detail="User not found")
+
+    user = User(**user_doc)
+    if user.restricted:
+        raise HTTPException(status_code=403, detail="Your account is restricted by an admin")
+    user_cache.set(user_id, user, generation)
+    return user
@@ -0,0 +1,187 @@
+# api/booking_calendar.py
+import os
+import re
+from datetime import date, datetime, time, timedelta, timezone
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from fastapi import HTTPException
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+# One document per photographer: {_id: photographer_id, intervals: [
+#   {booking_id, start, end, status}]}. Pending and approved bookings are
+# both listed; only approved ones block other bookings, so a pending request
+# never locks a slot against everyone else.
+CALENDARS_COLLECTION = "calendars"
+HOLDING_STATUSES = ("pending", "approved")
+
+# Bookings carry a local date and time; this is their zone unless the client
+# sends one
+BOOKING_DEFAULT_TIMEZONE = os.environ.get('BOOKING_DEFAULT_TIMEZONE', 'Asia/Kolkata')
+# Used when a package's free-text duration cannot be parsed
+DEFAULT_BOOKING_DURATION = timedelta(hours=float(os.environ.get('DEFAULT_BOOKING_DURATION_HOURS', '2')))
+# Intervals that ended longer ago than this are pruned from calendars
+CALENDAR_RETENTION = timedelta(days=int(os.environ.get('CALENDAR_RETENTION_DAYS', '30')))
+MAX_AVAILABILITY_WINDOW = timedelta(days=92)
+
+_NAMED_DURATIONS = {"full day": timedelta(hours=10), "half day": timedelta(hours=5)}
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)\s*(days?|d|hours?|hrs?|h|minutes?|mins?|m)\b")
+_UNITS = {"d": timedelta(days=1), "h": timedelta(hours=1), "m": timedelta(minutes=1)}
+
+
+def parse_duration(text: Optional[str]) -> timedelta:
+    """Package duration such as "2 hours", "1 hr 30 min", "Full day" -> timedelta."""
+    text = (text or "").strip().lower()
+    for name, duration in _NAMED_DURATIONS.items():
+        if name in text:
+            return duration
+    total = timedelta()
+    for amount, unit in _DURATION_PART.findall(text):
+        total += float(amount) * _UNITS[unit[0]]
+    return total if total > timedelta() else DEFAULT_BOOKING_DURATION
+
+
+def booking_window(booking_date: str, booking_time: str, tz_name: Optional[str], duration: timedelta) -> Tuple[datetime, datetime]:
+    """UTC start/end instants for a local date ("YYYY-MM-DD") and time ("HH:MM")."""
+    try:
+        zone = ZoneInfo(tz_name or BOOKING_DEFAULT_TIMEZONE)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Unknown timezone: {tz_name}")
+    try:
+        local = datetime.combine(date.fromisoformat(booking_date), time.fromisoformat(booking_time), tzinfo=zone)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="booking_date must be YYYY-MM-DD and booking_time HH:MM")
+    start = local.astimezone(timezone.utc)
+    return start, start + duration
+
+
+def as_utc(value: datetime) -> datetime:
+    """Mongo hands back naive UTC datetimes unless the client is tz_aware."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _overlapping_approved(start: datetime, end: datetime, exclude_booking_id: Optional[str] = None) -> dict:
+    match = {"status": "approved", "start": {"$lt": end}, "end": {"$gt": start}}
+    if exclude_booking_id:
+        match["booking_id"] = {"$ne": exclude_booking_id}
+    return {"$not": {"$elemMatch": match}}
+
+
+def _conflict() -> HTTPException:
+    return HTTPException(status_code=409, detail="The photographer is already booked at that time")
+
+
+async def reserve(db, photographer_id: str, booking_id: str, start: datetime, end: datetime, status: str = "pending") -> None:
+    """Add an interval unless it overlaps an approved one, atomically.
+
+    The filter only matches a calendar without a conflicting interval; when
+    there is one the upsert tries to create a second document with the same
+    _id, and that DuplicateKeyError is the conflict.
+    """
+    try:
+        await db[CALENDARS_COLLECTION].update_one(
+            {"_id": photographer_id, "intervals": _overlapping_approved(start, end)},
+            {"$push": {"intervals": {"booking_id": booking_id, "start": start, "end": end, "status": status}}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        raise _conflict()
+
+
+async def approve(db, photographer_id: str, booking_id: str, start: datetime, end: datetime) -> None:
+    """Promote a booking's interval to approved, or 409 if that would double-book."""
+    result = await db[CALENDARS_COLLECTION].update_one(
+        {
+            "_id": photographer_id,
+            "intervals.booking_id": booking_id,
+            "intervals": _overlapping_approved(start, end, exclude_booking_id=booking_id),
+        },
+        {"$set": {"intervals.$[b].status": "approved"}},
+        array_filters=[{"b.booking_id": booking_id}],
+    )
+    if result.matched_count == 0:
+        held = await db[CALENDARS_COLLECTION].find_one({"_id": photographer_id, "intervals.booking_id": booking_id}, {"_id": 1})
+        if held:
+            raise _conflict()
+        # booking predates the calendar (or its interval was released)
+        await reserve(db, photographer_id, booking_id, start, end, status="approved")
+
+
+async def release(db, photographer_id: str, booking_id: str) -> None:
+    await db[CALENDARS_COLLECTION].update_one({"_id": photographer_id}, {"$pull": {"intervals": {"booking_id": booking_id}}})
+
+
+async def prune(db, photographer_id: str, now: Optional[datetime] = None) -> None:
+    cutoff = (now or datetime.now(timezone.utc)) - CALENDAR_RETENTION
+    await db[CALENDARS_COLLECTION].update_one({"_id": photographer_id}, {"$pull": {"intervals": {"end": {"$lt": cutoff}}}})
+
+
+async def busy_intervals(db, photographer_id: str, start: datetime, end: datetime) -> List[dict]:
+    """Held intervals overlapping [start, end), from the photographer's calendar document only."""
+    doc = await db[CALENDARS_COLLECTION].find_one(
+        {"_id": photographer_id},
+        {"_id": 0, "intervals": {"$filter": {
+            "input": "$intervals",
+            "as": "i",
+            "cond": {"$and": [{"$lt": ["$$i.start", end]}, {"$gt": ["$$i.end", start]}]},
+        }}},
+    )
+    intervals = sorted((doc or {}).get("intervals") or [], key=lambda i: i["start"])
+    return [{"start": as_utc(i["start"]), "end": as_utc(i["end"]), "status": i["status"]} for i in intervals]
+
+
+async def backfill_booking_times(db, batch_size: int = 500) -> Tuple[int, int]:
+    """Derive start_at/end_at for bookings created before they existed.
+
+    Dates are read in BOOKING_DEFAULT_TIMEZONE. Returns (updated, unparseable).
+    """
+    updated = skipped = 0
+    durations = {}
+    cursor = db.bookings.find({"start_at": {"$exists": False}}, {"_id": 0, "id": 1, "package_id": 1, "booking_date": 1, "booking_time": 1})
+    while True:
+        batch = await cursor.to_list(batch_size)
+        if not batch:
+            break
+        missing = list({b.get("package_id") for b in batch} - durations.keys())
+        if missing:
+            packages = await db.packages.find({"id": {"$in": missing}}, {"_id": 0, "id": 1, "duration": 1}).to_list(None)
+            durations.update({p["id"]: parse_duration(p.get("duration")) for p in packages})
+            for package_id in missing:
+                durations.setdefault(package_id, DEFAULT_BOOKING_DURATION)
+        ops = []
+        for booking in batch:
+            duration = durations[booking.get("package_id")]
+            try:
+                start, end = booking_window(booking.get("booking_date", ""), booking.get("booking_time", ""), None, duration)
+                fields = {"start_at": start, "end_at": end, "timezone": BOOKING_DEFAULT_TIMEZONE}
+                updated += 1
+            except HTTPException:
+                # keep it out of the next run's batch without inventing a time
+                fields = {"start_at": None, "end_at": None}
+                skipped += 1
+            ops.append(UpdateOne({"id": booking["id"]}, {"$set": fields}))
+        await db.bookings.bulk_write(ops, ordered=False)
+    return updated, skipped
+
+
+async def rebuild_calendars(db) -> Tuple[int, int]:
+    """Recreate every calendar from bookings that hold a slot.
+
+    Returns (calendars written, photographers with overlapping approved bookings).
+    """
+    pipeline = [
+        {"$match": {"status": {"$in": list(HOLDING_STATUSES)}, "start_at": {"$ne": None}}},
+        {"$sort": {"start_at": 1}},
+        {"$group": {"_id": "$photographer_id", "intervals": {"$push": {
+            "booking_id": "$id", "start": "$start_at", "end": "$end_at", "status": "$status",
+        }}}},
+    ]
+    written = conflicted = 0
+    async for calendar in db.bookings.aggregate(pipeline, allowDiskUse=True):
+        approved = [i for i in calendar["intervals"] if i["status"] == "approved"]
+        if any(a["end"] > b["start"] for a, b in zip(approved, approved[1:])):
+            conflicted += 1
+        await db[CALENDARS_COLLECTION].replace_one({"_id": calendar["_id"]}, calendar, upsert=True)
+        written += 1
+    return written, conflicted
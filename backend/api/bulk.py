@@ -0,0 +1,64 @@
+# api/bulk.py
+import os
+from typing import Any, Dict, List, Tuple, Type
+
+from pydantic import BaseModel, Field, ValidationError
+from pymongo.errors import BulkWriteError
+
+# Items one bulk request may carry; larger imports are split by the client
+BULK_MAX_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', '200'))
+
+CREATED, FAILED = "created", "failed"
+
+
+class BulkCreate(BaseModel):
+    # Raw items, validated one by one so a bad item fails alone
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=BULK_MAX_ITEMS)
+
+
+def describe(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" if e["loc"] else e["msg"] for e in error.errors()
+    )
+
+
+def validate_items(model: Type[BaseModel], items: List[Dict[str, Any]]) -> Tuple[Dict[int, BaseModel], Dict[int, str]]:
+    """({index: parsed item}, {index: error}) for the raw items of a bulk request."""
+    valid, errors = {}, {}
+    for index, raw in enumerate(items):
+        try:
+            valid[index] = model.model_validate(raw)
+        except ValidationError as e:
+            errors[index] = describe(e)
+    return valid, errors
+
+
+async def insert_items(collection, docs: Dict[int, dict]) -> Dict[int, str]:
+    """One unordered insert_many; returns {index: error} for the documents the server rejected.
+
+    Unordered, the server keeps inserting past a failed document, and each
+    entry of BulkWriteError's writeErrors names the position that failed.
+    """
+    if not docs:
+        return {}
+    indexes = list(docs)
+    try:
+        await collection.insert_many([docs[i] for i in indexes], ordered=False)
+    except BulkWriteError as e:
+        errors = {}
+        for write_error in e.details.get("writeErrors", []):
+            index = indexes[write_error["index"]]
+            errors[index] = "Duplicate item" if write_error.get("code") == 11000 else write_error.get("errmsg", "Write failed")
+        return errors
+    return {}
+
+
+def results(count: int, ids: Dict[int, str], errors: Dict[int, str]) -> dict:
+    """The response body: per-item outcome in request order, plus totals."""
+    items = []
+    for index in range(count):
+        if index in errors:
+            items.append({"index": index, "status": FAILED, "error": errors[index]})
+        else:
+            items.append({"index": index, "status": CREATED, "id": ids[index]})
+    return {"created": count - len(errors), "failed": len(errors), "results": items}
@@ -0,0 +1,90 @@
+# api/cascade.py
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from api import admin_stats, http_cache
+from api.auth import invalidate_user
+from api.booking_calendar import CALENDARS_COLLECTION, HOLDING_STATUSES
+from api.database import in_transaction
+from api.http_cache import response_cache
+from api.job_handlers import RATING_RECOMPUTE
+from api.jobs import job_runner
+from api.search_index import search_index
+
+CASCADE_DELETE = "cascade_delete"
+
+
+def cascade_steps(user_id: str, keep_report_id: Optional[str] = None) -> List[Tuple[str, dict]]:
+    """(collection, filter) for everything that belongs to or points at a user.
+
+    Dependents go first and the user last, so a run that stops half way
+    leaves the user in place to be found by the retry. The report that led
+    to the deletion and its notifications are kept as the moderation record.
+    """
+    involving = {"$or": [{"photographer_id": user_id}, {"user_id": user_id}]}
+    reported_or_reporting = [{"photographer_id": user_id}, {"reporter_id": user_id}]
+    return [
+        ("portfolio_items", {"photographer_id": user_id}),
+        ("packages", {"photographer_id": user_id}),
+        ("bookings", involving),
+        ("reviews", involving),
+        ("reports", {"$or": reported_or_reporting, "id": {"$ne": keep_report_id}}),
+        ("notifications", {"$or": reported_or_reporting, "report_id": {"$ne": keep_report_id}}),
+        ("about_me", {"user_id": user_id}),
+        (CALENDARS_COLLECTION, {"_id": user_id}),
+        ("photographer_profiles", {"user_id": user_id}),
+        ("users", {"id": user_id}),
+    ]
+
+
+async def cascade_delete(db, params: Dict[str, Any], progress) -> Dict[str, Any]:
+    """Job handler: delete a user and every document that depends on them.
+
+    On a replica set everything, including the rating recompute jobs for
+    profiles the user reviewed, commits in one transaction. On a standalone
+    server the steps run in order and are safe to retry; only a crash right
+    between deleting the reviews and queueing the recomputes leaves stale
+    rating aggregates (`manage.py backfill-ratings` recomputes them).
+    """
+    user_id = params["user_id"]
+    steps = cascade_steps(user_id, params.get("keep_report_id"))
+
+    # Profiles the user reviewed, and slots they hold in other calendars
+    reviewed = await db.reviews.distinct("photographer_id", {"user_id": user_id, "photographer_id": {"$ne": user_id}})
+    held = await db.bookings.find(
+        {"user_id": user_id, "status": {"$in": list(HOLDING_STATUSES)}}, {"_id": 0, "id": 1, "photographer_id": 1}
+    ).to_list(None)
+    calendar_ops = [
+        UpdateOne({"_id": b["photographer_id"]}, {"$pull": {"intervals": {"booking_id": b["id"]}}}) for b in held
+    ]
+
+    deleted: Counter = Counter()
+
+    async def apply(session=None) -> None:
+        deleted.clear()
+        for collection, query in steps:
+            result = await db[collection].delete_many(query, session=session)
+            deleted[collection] += result.deleted_count
+            if collection == "bookings" and calendar_ops:
+                await db[CALENDARS_COLLECTION].bulk_write(calendar_ops, ordered=False, session=session)
+            if collection == "reviews":
+                for photographer_id in reviewed:
+                    await job_runner.enqueue(db, RATING_RECOMPUTE, {"photographer_id": photographer_id}, session=session)
+
+    await in_transaction(db, apply)
+    job_runner.wake()
+    for collection, _ in steps:
+        await progress(collection, deleted[collection])
+
+    # Process-local and derived state
+    invalidate_user(user_id)
+    search_index.remove(user_id)
+    await response_cache.bump(db, user_id, http_cache.PROFILE, http_cache.PORTFOLIO, http_cache.PACKAGES, http_cache.ABOUT_ME)
+    await admin_stats.refresh(db)
+    return {"deleted": dict(deleted), "ratings_recomputed": len(reviewed), "slots_released": len(calendar_ops)}
+
+
+# Runs at most one at a time per process: each touches many collections
+job_runner.register(CASCADE_DELETE, cascade_delete, concurrency=1)
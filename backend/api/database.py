@@ -0,0 +1,107 @@
+# api/database.py
+import os
+from contextlib import asynccontextmanager
+from datetime import timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+
+from api.metrics import command_timer
+
+ROOT_DIR = Path(__file__).parent.parent
+load_dotenv(ROOT_DIR / '.env')
+
+# The one Motor client (and therefore connection pool) for the whole process.
+# Created by connect() from the FastAPI lifespan and shared by every router.
+client: Optional[AsyncIOMotorClient] = None
+# Whether the deployment can run multi-document transactions, probed once
+_transactions: Optional[bool] = None
+
+T = TypeVar("T")
+
+# env var -> (MongoClient option, parser)
+POOL_SETTINGS = {
+    "MONGO_MAX_POOL_SIZE": ("maxPoolSize", int),
+    "MONGO_MIN_POOL_SIZE": ("minPoolSize", int),
+    "MONGO_MAX_IDLE_TIME_MS": ("maxIdleTimeMS", int),
+    "MONGO_MAX_CONNECTING": ("maxConnecting", int),
+    "MONGO_WAIT_QUEUE_TIMEOUT_MS": ("waitQueueTimeoutMS", int),
+    "MONGO_CONNECT_TIMEOUT_MS": ("connectTimeoutMS", int),
+    "MONGO_SOCKET_TIMEOUT_MS": ("socketTimeoutMS", int),
+    "MONGO_SERVER_SELECTION_TIMEOUT_MS": ("serverSelectionTimeoutMS", int),
+    "MONGO_COMPRESSORS": ("compressors", str),  # e.g. "zstd,snappy,zlib"
+    "MONGO_ZLIB_COMPRESSION_LEVEL": ("zlibCompressionLevel", int),
+}
+
+
+def client_options() -> Dict[str, Any]:
+    """MongoClient keyword options taken from the environment (unset ones use driver defaults)."""
+    options: Dict[str, Any] = {}
+    for env_var, (option, parse) in POOL_SETTINGS.items():
+        value = os.environ.get(env_var)
+        if value not in (None, ""):
+            options[option] = parse(value)
+    return options
+
+
+def connect(**overrides) -> AsyncIOMotorClient:
+    global client
+    if client is None:
+        # Dates are stored as BSON dates and read back as aware UTC datetimes
+        options = {"tz_aware": True, "tzinfo": timezone.utc, "event_listeners": [command_timer], **client_options(), **overrides}
+        client = AsyncIOMotorClient(os.environ['MONGO_URL'], **options)
+    return client
+
+
+def close() -> None:
+    global client, _transactions
+    if client is not None:
+        client.close()
+        client = None
+    _transactions = None
+
+
+async def supports_transactions(db) -> bool:
+    """Multi-document transactions need a replica set or a mongos."""
+    global _transactions
+    if _transactions is None:
+        hello = await db.client.admin.command("hello")
+        _transactions = "setName" in hello or hello.get("msg") == "isdbgrid"
+    return _transactions
+
+
+@asynccontextmanager
+async def transaction(db):
+    """Yield a session inside a transaction, or None on a standalone server.
+
+    Pass the yielded value as `session=` to every write that must commit
+    together; without transactions the writes simply apply one by one.
+    """
+    if not await supports_transactions(db):
+        yield None
+        return
+    async with await db.client.start_session() as session:
+        async with session.start_transaction():
+            yield session
+
+
+async def in_transaction(db, fn: Callable[[Any], Awaitable[T]]) -> T:
+    """Return fn(session) run in a transaction, or fn(None) on a standalone server.
+
+    Unlike transaction(), the driver reruns fn when the transaction hits a
+    transient error such as a write conflict, so fn may be called more than
+    once and must do all its writes through the session it is given.
+    """
+    if not await supports_transactions(db):
+        return await fn(None)
+    async with await db.client.start_session() as session:
+        return await session.with_transaction(fn)
+
+
+def get_db() -> AsyncIOMotorDatabase:
+    """FastAPI dependency returning the application database."""
+    if client is None:
+        raise RuntimeError("MongoDB client is not connected; call api.database.connect() first")
+    return client[os.environ['DB_NAME']]
@@ -0,0 +1,263 @@
+# api/events.py
+import asyncio
+import itertools
+import json
+import logging
+import os
+from collections import deque
+from datetime import datetime
+from typing import AsyncIterator, Deque, Dict, Iterable, List, Optional, Set
+
+from fastapi import APIRouter, Depends, Header, Query
+from fastapi.responses import StreamingResponse
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure, PyMongoError
+
+from api.auth import user_from_token
+from api.database import get_db
+
+logger = logging.getLogger(__name__)
+
+# Events a connection may have queued before it is considered too slow and
+# closed; the client reconnects with Last-Event-ID and catches up.
+EVENTS_QUEUE_SIZE = int(os.environ.get('EVENTS_QUEUE_SIZE', '100'))
+EVENTS_HEARTBEAT_SECONDS = float(os.environ.get('EVENTS_HEARTBEAT_SECONDS', '15'))
+# Without change streams, recent events are kept for reconnect replay
+EVENTS_REPLAY_SIZE = int(os.environ.get('EVENTS_REPLAY_SIZE', '1000'))
+EVENTS_RETRY_MS = 3000
+
+# Changes worth pushing: new notifications, new bookings, booking status moves
+WATCH_PIPELINE = [
+    {"$match": {"$or": [
+        {"ns.coll": "notifications", "operationType": "insert"},
+        {"ns.coll": "bookings", "operationType": "insert"},
+        {"ns.coll": "bookings", "operationType": "update", "updateDescription.updatedFields.status": {"$exists": True}},
+    ]}},
+]
+LOCAL_ID_PREFIX = "L-"
+
+router = APIRouter(prefix="/api/events", tags=["Events"])
+
+
+def _jsonable(doc: dict) -> dict:
+    return {k: (v.isoformat() if isinstance(v, datetime) else v) for k, v in doc.items() if k != "_id"}
+
+
+def event_from_change(change: dict) -> Optional[dict]:
+    """Broker event for a change stream document, or None if nobody should hear of it."""
+    doc = change.get("fullDocument")
+    if not doc:
+        return None
+    collection = change["ns"]["coll"]
+    if collection == "notifications":
+        kind, recipients = "notification", [doc.get("photographer_id"), doc.get("reporter_id")]
+    elif change["operationType"] == "insert":
+        kind, recipients = "booking_created", [doc.get("photographer_id")]
+    else:
+        kind, recipients = "booking_status", [doc.get("user_id"), doc.get("photographer_id")]
+    return {
+        "id": change["_id"]["_data"],
+        "type": kind,
+        "recipients": [r for r in recipients if r],
+        "data": _jsonable(doc),
+    }
+
+
+class Subscription:
+    def __init__(self, user_id: str, maxsize: int):
+        self.user_id = user_id
+        self.queue: "asyncio.Queue[dict]" = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def offer(self, event: dict) -> None:
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Never block the publisher on one slow reader: cut it loose
+            self.overflowed = True
+            self.queue = asyncio.Queue(1)
+            self.queue.put_nowait({"type": "overflow"})
+
+
+class EventBroker:
+    """In-process fan-out of events to the SSE connections of their recipients.
+
+    Fed by a single change stream per process when the deployment supports
+    them (replica set / sharded cluster), so writes from any worker reach
+    every worker. On a standalone mongod it falls back to local mode, where
+    the write paths publish directly and only this process hears them.
+    """
+
+    def __init__(self, queue_size: int = EVENTS_QUEUE_SIZE, replay_size: int = EVENTS_REPLAY_SIZE):
+        self.queue_size = queue_size
+        self.subscribers: Dict[str, Set[Subscription]] = {}
+        self.change_streams = False
+        self._db = None
+        self._task: Optional[asyncio.Task] = None
+        self._recent: Deque[dict] = deque(maxlen=replay_size)
+        self._ids = itertools.count(1)
+
+    # ---------- fan-out ----------
+
+    def subscribe(self, user_id: str) -> Subscription:
+        subscription = Subscription(user_id, self.queue_size)
+        self.subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self.subscribers.get(subscription.user_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self.subscribers[subscription.user_id]
+
+    def dispatch(self, event: dict) -> None:
+        for user_id in set(event["recipients"]):
+            for subscription in list(self.subscribers.get(user_id, ())):
+                subscription.offer(event)
+
+    def publish(self, kind: str, recipients: Iterable[Optional[str]], data: dict) -> None:
+        """Publish from a write path. A no-op when change streams deliver the event instead."""
+        if self.change_streams:
+            return
+        event = {
+            "id": f"{LOCAL_ID_PREFIX}{next(self._ids)}",
+            "type": kind,
+            "recipients": [r for r in recipients if r],
+            "data": _jsonable(data),
+        }
+        self._recent.append(event)
+        self.dispatch(event)
+
+    # ---------- catch-up after reconnect ----------
+
+    async def missed(self, user_id: str, last_event_id: str) -> Optional[List[dict]]:
+        """Events for user_id after last_event_id, or None when they cannot be recovered."""
+        if last_event_id.startswith(LOCAL_ID_PREFIX):
+            if self.change_streams:
+                return None
+            try:
+                after = int(last_event_id[len(LOCAL_ID_PREFIX):])
+            except ValueError:
+                return None
+            recent = list(self._recent)
+            if recent and int(recent[0]["id"][len(LOCAL_ID_PREFIX):]) > after + 1:
+                return None  # the replay buffer has already dropped some of them
+            return [e for e in recent if int(e["id"][len(LOCAL_ID_PREFIX):]) > after and user_id in e["recipients"]]
+
+        if not self.change_streams:
+            return None
+        events = []
+        try:
+            async with self._db.watch(WATCH_PIPELINE, full_document="updateLookup", resume_after={"_data": last_event_id}) as stream:
+                while True:
+                    change = await stream.try_next()
+                    if change is None:
+                        break
+                    event = event_from_change(change)
+                    if event and user_id in event["recipients"]:
+                        events.append(event)
+        except PyMongoError as e:
+            # token from another deployment, or rolled off the oplog
+            logger.info("Cannot resume events after %s: %s", last_event_id, e)
+            return None
+        return events
+
+    # ---------- change stream feed ----------
+
+    async def _watch(self) -> None:
+        resume_token = None
+        delay = 1.0
+        while True:
+            try:
+                async with self._db.watch(WATCH_PIPELINE, full_document="updateLookup", resume_after=resume_token) as stream:
+                    delay = 1.0
+                    async for change in stream:
+                        resume_token = change["_id"]
+                        event = event_from_change(change)
+                        if event:
+                            self.dispatch(event)
+            except asyncio.CancelledError:
+                raise
+            except PyMongoError:
+                logger.exception("Event change stream failed; reopening in %.0fs", delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+
+    async def start(self, db) -> None:
+        self._db = db
+        try:
+            async with db.watch(WATCH_PIPELINE) as stream:
+                await stream.try_next()
+        except OperationFailure as e:
+            logger.info("Change streams unavailable (%s); events are published in-process only", e)
+            self.change_streams = False
+            return
+        self.change_streams = True
+        self._task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+broker = EventBroker()
+
+
+def format_sse(event: dict) -> str:
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+
+async def event_stream(user_id: str, last_event_id: Optional[str]) -> AsyncIterator[str]:
+    # Subscribe before catching up so nothing falls between the two; the
+    # overlap is removed by event id.
+    subscription = broker.subscribe(user_id)
+    try:
+        yield f"retry: {EVENTS_RETRY_MS}\n\n"
+        sent: Set[str] = set()
+        if last_event_id:
+            missed = await broker.missed(user_id, last_event_id)
+            if missed is None:
+                # gap we cannot fill: tell the client to refetch over REST
+                yield "event: resync\ndata: {}\n\n"
+            else:
+                for event in missed:
+                    sent.add(event["id"])
+                    yield format_sse(event)
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if event["type"] == "overflow":
+                return
+            if event["id"] in sent:
+                # each caught-up event is queued at most once more
+                sent.discard(event["id"])
+                continue
+            yield format_sse(event)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+@router.get("/stream")
+async def stream_events(
+    token: str = Query(..., description="Access token; EventSource cannot send an Authorization header"),
+    last_event_id: Optional[str] = Header(None),
+    db: AsyncIOMotorDatabase = Depends(get_db),
+):
+    """Server-Sent Events: notification, booking_created and booking_status for the current user"""
+    user = await user_from_token(token, db)
+    return StreamingResponse(
+        event_stream(user.id, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,53 @@
+# api/full_view.py
+import asyncio
+import os
+from typing import Dict, Optional
+
+from api.loaders import Loaders, pick
+from api.pagination import PageParams, paginate
+
+# Items returned per section of a full view; the rest is reachable through
+# the section's list endpoint with the returned next cursor:
+#   portfolio -> /api/portfolio/photographer/{id}
+#   packages  -> /api/packages/photographer/{id}
+#   reviews   -> /api/reviews/{id}
+#   reports   -> /api/reports/photographer/{id}
+FULL_VIEW_SECTION_LIMIT = int(os.environ.get('FULL_VIEW_SECTION_LIMIT', '20'))
+
+SECTIONS = {
+    "portfolio": "portfolio_items",
+    "packages": "packages",
+    "reviews": "reviews",
+    "reports": "reports",
+}
+
+
+async def load_full_view(db, loaders: Loaders, photographer_id: str, section_limit: int = FULL_VIEW_SECTION_LIMIT) -> dict:
+    """Everything about one photographer, read concurrently.
+
+    The user/profile/about-me lookups and the first page of every section go
+    out at once, then a single batched users query resolves all reviewers and
+    reporters. Latency is the slowest query plus that one follow-up.
+    """
+    page = PageParams(limit=section_limit, cursor=None)
+    user, profile, about_me, *pages = await asyncio.gather(
+        loaders.users.load(photographer_id),
+        loaders.profiles.load(photographer_id),
+        loaders.about_me.load(photographer_id),
+        *(paginate(db[collection], {"photographer_id": photographer_id}, {"_id": 0}, page) for collection in SECTIONS.values()),
+    )
+    view: Dict[str, object] = {"user": user, "profile": profile, "about_me": about_me}
+    next_cursors: Dict[str, Optional[str]] = {}
+    for section, (docs, next_cursor) in zip(SECTIONS, pages):
+        view[section] = docs
+        next_cursors[section] = next_cursor
+    view["next_cursors"] = next_cursors
+
+    people = await loaders.users.load_many(
+        [r.get("user_id") for r in view["reviews"]] + [r.get("reporter_id") for r in view["reports"]]
+    )
+    for review in view["reviews"]:
+        review["reviewer"] = pick(people.get(review.get("user_id")), "id", "full_name", "email")
+    for report in view["reports"]:
+        report["reporter"] = pick(people.get(report.get("reporter_id")), "id", "full_name", "email")
+    return view
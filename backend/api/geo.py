@@ -0,0 +1,92 @@
+# api/geo.py
+import json
+import re
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+GAZETTEER_PATH = Path(__file__).parent / "data" / "gazetteer.json"
+BACKFILL_BATCH_SIZE = 500
+
+_SEPARATORS = re.compile(r"[,/|()\-]+")
+_SPACES = re.compile(r"\s+")
+
+
+def _normalize(text: str) -> str:
+    return _SPACES.sub(" ", text.strip().lower().replace(".", ""))
+
+
+@lru_cache(maxsize=1)
+def gazetteer() -> Dict[str, Tuple[float, float]]:
+    """Normalized place name or alias -> (lng, lat), loaded once from the bundled file."""
+    with open(GAZETTEER_PATH, encoding="utf-8") as f:
+        places = json.load(f)
+    names: Dict[str, Tuple[float, float]] = {}
+    for place in places:
+        coordinates = (place["lng"], place["lat"])
+        for name in [place["name"], *place.get("aliases", [])]:
+            names.setdefault(_normalize(name), coordinates)
+    return names
+
+
+def resolve_location(location: Optional[str]) -> Optional[Tuple[float, float]]:
+    """Resolve free-text like "Koregaon Park, Pune" to (lng, lat), or None.
+
+    Tries the whole string, then each comma-separated part from the most
+    general (last) one, then runs of words inside those parts.
+    """
+    if not location:
+        return None
+    names = gazetteer()
+    whole = _normalize(location)
+    if whole in names:
+        return names[whole]
+
+    parts = [_normalize(p) for p in _SEPARATORS.split(location) if p.strip()]
+    for part in reversed(parts):
+        if part in names:
+            return names[part]
+    for part in reversed(parts):
+        words = part.split(" ")
+        for size in range(len(words) - 1, 0, -1):
+            for start in range(len(words) - size, -1, -1):
+                candidate = " ".join(words[start:start + size])
+                if candidate in names:
+                    return names[candidate]
+    return None
+
+
+def location_point(location: Optional[str]) -> Optional[dict]:
+    """GeoJSON point for a profile location, None when the gazetteer has no match."""
+    resolved = resolve_location(location)
+    if resolved is None:
+        return None
+    return {"type": "Point", "coordinates": list(resolved)}
+
+
+async def backfill_location_points(db) -> Tuple[int, List[Tuple[str, int]]]:
+    """Resolve location_point for every profile.
+
+    Returns how many profiles resolved, and the most common locations that
+    did not, which are the entries worth adding to the gazetteer.
+    """
+    resolved = 0
+    unresolved: Counter = Counter()
+    cursor = db.photographer_profiles.find({}, {"_id": 0, "user_id": 1, "location": 1})
+    while True:
+        batch = await cursor.to_list(BACKFILL_BATCH_SIZE)
+        if not batch:
+            break
+        ops = []
+        for profile in batch:
+            point = location_point(profile.get("location"))
+            if point is None:
+                unresolved[profile.get("location") or ""] += 1
+            else:
+                resolved += 1
+            ops.append(UpdateOne({"user_id": profile["user_id"]}, {"$set": {"location_point": point}}))
+        await db.photographer_profiles.bulk_write(ops, ordered=False)
+    return resolved, unresolved.most_common(20)
@@ -0,0 +1,121 @@
+# api/http_cache.py
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from pymongo import ReturnDocument
+
+# Public photographer pages are versioned per (kind, photographer): every write
+# to a resource bumps its stamp in `resource_versions`, and a rendered response
+# body is reused for as long as the stamp it was rendered at is current.
+VERSIONS_COLLECTION = "resource_versions"
+# Kinds of versioned resources, one stamp per photographer each
+PROFILE = "profile"
+PORTFOLIO = "portfolio"
+PACKAGES = "packages"
+ABOUT_ME = "about_me"
+
+# How long a worker trusts its copy of a stamp before re-reading it. Writes on
+# the same worker are visible at once; other workers see them within this.
+HTTP_CACHE_VERSION_TTL_SECONDS = float(os.environ.get('HTTP_CACHE_VERSION_TTL_SECONDS', '2'))
+HTTP_CACHE_MAX_ENTRIES = int(os.environ.get('HTTP_CACHE_MAX_ENTRIES', '5000'))
+# Browsers/CDNs may reuse a response this long without revalidating. 0 means
+# always revalidate, which is cheap (a 304 with no database work).
+HTTP_CACHE_MAX_AGE = int(os.environ.get('HTTP_CACHE_MAX_AGE', '0'))
+
+Producer = Callable[[], Awaitable[Tuple[Any, Dict[str, str]]]]
+
+
+class CachedBody(NamedTuple):
+    version: int
+    etag: str
+    body: bytes
+    headers: Dict[str, str]
+
+
+class ResponseCache:
+    """Version stamps plus rendered bodies for conditional GETs.
+
+    Both maps are per process and bounded: stamps expire after `ttl` seconds,
+    bodies are evicted least recently used beyond `maxsize`.
+    """
+
+    def __init__(self, maxsize: int = HTTP_CACHE_MAX_ENTRIES, ttl: float = HTTP_CACHE_VERSION_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._versions: Dict[str, Tuple[float, int]] = {}
+        self._bodies: "OrderedDict[Tuple[str, str], CachedBody]" = OrderedDict()
+
+    @staticmethod
+    def _key(kind: str, owner_id: str) -> str:
+        return f"{kind}:{owner_id}"
+
+    async def version(self, db, kind: str, owner_id: str) -> int:
+        key = self._key(kind, owner_id)
+        cached = self._versions.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        doc = await db[VERSIONS_COLLECTION].find_one({"_id": key})
+        version = doc["v"] if doc else 0
+        self._remember(key, version)
+        return version
+
+    def _remember(self, key: str, version: int) -> None:
+        if len(self._versions) >= self.maxsize:
+            now = time.monotonic()
+            self._versions = {k: v for k, v in self._versions.items() if v[0] > now}
+        self._versions[key] = (time.monotonic() + self.ttl, version)
+
+    async def bump(self, db, owner_id: str, *kinds: str) -> None:
+        """Mark resources of a photographer as changed, call after the write."""
+        for kind in kinds:
+            key = self._key(kind, owner_id)
+            doc = await db[VERSIONS_COLLECTION].find_one_and_update(
+                {"_id": key}, {"$inc": {"v": 1}}, upsert=True, return_document=ReturnDocument.AFTER
+            )
+            self._remember(key, doc["v"])
+
+    def clear(self) -> None:
+        self._versions.clear()
+        self._bodies.clear()
+
+    async def respond(self, request: Request, db, kind: str, owner_id: str, produce: Producer) -> Response:
+        """Serve `produce()`'s (content, headers) with a strong ETag, from cache when current.
+
+        Content that is already encoded JSON (bytes) is used as the body.
+        Errors raised by produce (e.g. 404) propagate and are never cached.
+        """
+        version = await self.version(db, kind, owner_id)
+        entry_key = (self._key(kind, owner_id), request.url.query)
+        entry = self._bodies.get(entry_key)
+        if entry is not None and entry.version == version:
+            self._bodies.move_to_end(entry_key)
+        else:
+            content, headers = await produce()
+            body = content if isinstance(content, bytes) else ORJSONResponse(jsonable_encoder(content)).body
+            etag = '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+            entry = CachedBody(version, etag, body, headers)
+            self._bodies[entry_key] = entry
+            if len(self._bodies) > self.maxsize:
+                self._bodies.popitem(last=False)
+
+        headers = {"ETag": entry.etag, "Cache-Control": f"public, max-age={HTTP_CACHE_MAX_AGE}, must-revalidate"}
+        if etag_matches(request.headers.get("if-none-match"), entry.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(entry.body, media_type="application/json", headers={**entry.headers, **headers})
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses the weak comparison: W/ prefixes are ignored."""
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or any(c.removeprefix("W/") == etag for c in candidates)
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,208 @@
+# api/indexes.py
+import logging
+from typing import Any, Dict, List, Optional
+
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# ---------- Index registry ----------
+# Every query path that filters on something other than _id should be backed
+# by an entry here. ensure_indexes() is idempotent, so adding an entry is all
+# it takes to have it built on the next startup.
+#
+# List endpoints page with a keyset on (created_at, id) newest first (see
+# api/pagination.py), so their indexes are <equality fields>, created_at, id.
+NEWEST = [("created_at", DESCENDING), ("id", DESCENDING)]
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("id", ASCENDING)], name="users_id_unique", unique=True),
+        IndexModel([("email", ASCENDING)], name="users_email_unique", unique=True),
+        IndexModel([("role", ASCENDING)], name="users_role"),
+        IndexModel(NEWEST, name="users_newest"),
+        IndexModel([("restricted", ASCENDING)] + NEWEST, name="users_restricted_newest"),
+    ],
+    "photographer_profiles": [
+        IndexModel([("user_id", ASCENDING)], name="profiles_user_id_unique", unique=True),
+        IndexModel([("approval_status", ASCENDING)] + NEWEST, name="profiles_approval_status_newest"),
+        # Photographer search (api/photographer_search.py)
+        IndexModel(
+            [("approval_status", ASCENDING), ("full_name", TEXT), ("specialties", TEXT), ("location", TEXT), ("bio", TEXT)],
+            name="profiles_search_text",
+            weights={"full_name": 10, "specialties": 5, "location": 3, "bio": 1},
+        ),
+        IndexModel(
+            [("approval_status", ASCENDING), ("average_rating", DESCENDING), ("id", DESCENDING)],
+            name="profiles_approval_status_rating",
+        ),
+        IndexModel(
+            [("approval_status", ASCENDING), ("experience_years", DESCENDING), ("id", DESCENDING)],
+            name="profiles_approval_status_experience",
+        ),
+        IndexModel([("approval_status", ASCENDING), ("location_lc", ASCENDING)], name="profiles_approval_status_location"),
+        IndexModel([("specialties", ASCENDING), ("approval_status", ASCENDING)], name="profiles_specialties"),
+        # $geoNear needs exactly one 2dsphere index on the collection
+        IndexModel([("location_point", GEOSPHERE), ("approval_status", ASCENDING)], name="profiles_location_point"),
+    ],
+    "portfolio_items": [
+        IndexModel([("id", ASCENDING)], name="portfolio_id_unique", unique=True),
+        IndexModel([("photographer_id", ASCENDING)] + NEWEST, name="portfolio_photographer_newest"),
+    ],
+    "packages": [
+        IndexModel([("id", ASCENDING)], name="packages_id_unique", unique=True),
+        IndexModel([("photographer_id", ASCENDING)] + NEWEST, name="packages_photographer_newest"),
+        IndexModel([("price", ASCENDING), ("photographer_id", ASCENDING)], name="packages_price_photographer"),
+    ],
+    "bookings": [
+        IndexModel([("id", ASCENDING)], name="bookings_id_unique", unique=True),
+        IndexModel(NEWEST, name="bookings_newest"),
+        IndexModel([("user_id", ASCENDING)] + NEWEST, name="bookings_user_newest"),
+        IndexModel([("photographer_id", ASCENDING)] + NEWEST, name="bookings_photographer_newest"),
+        IndexModel([("status", ASCENDING)], name="bookings_status"),
+        IndexModel([("photographer_id", ASCENDING), ("start_at", ASCENDING)], name="bookings_photographer_start"),
+    ],
+    "reviews": [
+        IndexModel(
+            [("photographer_id", ASCENDING), ("user_id", ASCENDING)],
+            name="reviews_photographer_user_unique",
+            unique=True,
+        ),
+        IndexModel(NEWEST, name="reviews_newest"),
+        IndexModel([("photographer_id", ASCENDING)] + NEWEST, name="reviews_photographer_newest"),
+        # Cascade delete of a reviewer (api/cascade.py)
+        IndexModel([("user_id", ASCENDING)], name="reviews_user"),
+    ],
+    "reports": [
+        IndexModel([("id", ASCENDING)], name="reports_id_unique", unique=True),
+        IndexModel([("status", ASCENDING)] + NEWEST, name="reports_status_newest"),
+        IndexModel([("photographer_id", ASCENDING)] + NEWEST, name="reports_photographer_newest"),
+        IndexModel([("reporter_id", ASCENDING)], name="reports_reporter"),
+    ],
+    "notifications": [
+        # report notification jobs insert by id, so a rerun finds the first insert
+        IndexModel([("id", ASCENDING)], name="notifications_id_unique", unique=True),
+        IndexModel(
+            [("reporter_id", ASCENDING), ("timestamp", DESCENDING), ("id", DESCENDING)],
+            name="notifications_reporter_newest",
+        ),
+        IndexModel(
+            [("photographer_id", ASCENDING), ("timestamp", DESCENDING), ("id", DESCENDING)],
+            name="notifications_photographer_newest",
+        ),
+    ],
+    "about_me": [
+        IndexModel([("user_id", ASCENDING)], name="about_me_user_id_unique", unique=True),
+    ],
+    "jobs": [
+        IndexModel([("id", ASCENDING)], name="jobs_id_unique", unique=True),
+        # JobRunner.claim(): due queued jobs, and running jobs whose lease lapsed
+        IndexModel([("status", ASCENDING), ("run_at", ASCENDING)], name="jobs_status_run_at"),
+        IndexModel([("status", ASCENDING), ("lease_until", ASCENDING)], name="jobs_status_lease"),
+        # admin listing, e.g. the dead letters
+        IndexModel([("status", ASCENDING)] + NEWEST, name="jobs_status_newest"),
+    ],
+}
+
+# ---------- Query shapes audited against the registry ----------
+# (collection, filter, sort) as issued by the routers; values are placeholders.
+PAGE = {"created_at": -1, "id": -1}
+NOTIFICATION_PAGE = {"timestamp": -1, "id": -1}
+
+QUERY_SHAPES: List[Dict[str, Any]] = [
+    {"collection": "users", "filter": {"id": "x"}},
+    {"collection": "users", "filter": {"email": "x@example.com"}},
+    {"collection": "users", "filter": {"id": {"$in": ["x", "y"]}}},
+    {"collection": "users", "filter": {"role": "user"}},
+    {"collection": "users", "filter": {}, "sort": PAGE},
+    {"collection": "users", "filter": {"restricted": True}, "sort": PAGE},
+    {"collection": "photographer_profiles", "filter": {"user_id": "x"}},
+    {"collection": "photographer_profiles", "filter": {"approval_status": "approved"}, "sort": PAGE},
+    {"collection": "photographer_profiles", "filter": {"approval_status": "approved"}, "sort": {"average_rating": -1, "id": -1}},
+    {"collection": "photographer_profiles", "filter": {"approval_status": "approved"}, "sort": {"experience_years": -1, "id": -1}},
+    {"collection": "photographer_profiles", "filter": {"approval_status": "approved", "location_lc": {"$regex": "^x"}}, "sort": PAGE},
+    {"collection": "photographer_profiles", "filter": {"approval_status": "approved", "specialties": "x"}, "sort": PAGE},
+    {"collection": "photographer_profiles", "filter": {
+        "approval_status": "approved",
+        "location_point": {"$nearSphere": {"$geometry": {"type": "Point", "coordinates": [73.86, 18.52]}, "$maxDistance": 25000}},
+    }},
+    {"collection": "portfolio_items", "filter": {"photographer_id": "x"}, "sort": PAGE},
+    {"collection": "packages", "filter": {"id": {"$in": ["x", "y"]}}},
+    {"collection": "packages", "filter": {"photographer_id": "x"}, "sort": PAGE},
+    {"collection": "packages", "filter": {"price": {"$gte": 0, "$lte": 1}}},
+    {"collection": "bookings", "filter": {"id": "x"}},
+    {"collection": "bookings", "filter": {}, "sort": PAGE},
+    {"collection": "bookings", "filter": {"user_id": "x"}, "sort": PAGE},
+    {"collection": "bookings", "filter": {"photographer_id": "x"}, "sort": PAGE},
+    {"collection": "bookings", "filter": {"status": "pending"}},
+    {"collection": "bookings", "filter": {"photographer_id": "x", "start_at": {"$gte": 0}}},
+    {"collection": "reviews", "filter": {"photographer_id": "x", "user_id": "y"}},
+    {"collection": "reviews", "filter": {"photographer_id": "x"}, "sort": PAGE},
+    {"collection": "reviews", "filter": {}, "sort": PAGE},
+    {"collection": "reviews", "filter": {"user_id": "x"}},
+    {"collection": "reports", "filter": {"reporter_id": "x"}},
+    {"collection": "jobs", "filter": {"id": "x"}},
+    {"collection": "jobs", "filter": {"status": "queued", "run_at": {"$lte": 0}}, "sort": {"run_at": 1}},
+    {"collection": "jobs", "filter": {"status": "running", "lease_until": {"$lt": 0}}},
+    {"collection": "jobs", "filter": {"status": "dead"}, "sort": PAGE},
+    {"collection": "reports", "filter": {"id": "x"}},
+    {"collection": "reports", "filter": {"status": "pending"}, "sort": PAGE},
+    {"collection": "reports", "filter": {"photographer_id": "x"}, "sort": PAGE},
+    {"collection": "notifications", "filter": {"id": "x"}},
+    {"collection": "notifications", "filter": {"reporter_id": "x"}, "sort": NOTIFICATION_PAGE},
+    {"collection": "notifications", "filter": {"photographer_id": "x"}, "sort": NOTIFICATION_PAGE},
+    {"collection": "about_me", "filter": {"user_id": "x"}},
+]
+
+
+async def ensure_indexes(db, collections: Optional[List[str]] = None) -> None:
+    """Create every registered index that does not exist yet.
+
+    Indexes are created one at a time so that a failure on one (typically a
+    unique index over data that already holds duplicates) is logged without
+    blocking the rest or the application startup.
+    """
+    for name, models in INDEXES.items():
+        if collections is not None and name not in collections:
+            continue
+        for model in models:
+            try:
+                await db[name].create_indexes([model])
+            except OperationFailure as e:
+                logger.warning("Could not create index %s on %s: %s", model.document["name"], name, e)
+
+
+def plan_stages(plan: Dict[str, Any]) -> List[str]:
+    """Flatten the stage names of an explain() winning plan, outermost first."""
+    stages: List[str] = []
+    pending = [plan]
+    while pending:
+        node = pending.pop(0)
+        if "stage" in node:
+            stages.append(node["stage"])
+        if "inputStage" in node:
+            pending.append(node["inputStage"])
+        pending.extend(node.get("inputStages", []))
+        if "queryPlan" in node:
+            pending.append(node["queryPlan"])
+    return stages
+
+
+async def audit_indexes(db) -> List[Dict[str, Any]]:
+    """Run explain() on each registered query shape and flag any COLLSCAN."""
+    results = []
+    for shape in QUERY_SHAPES:
+        find = {"find": shape["collection"], "filter": shape["filter"]}
+        if shape.get("sort"):
+            find["sort"] = shape["sort"]
+        explain = await db.command({"explain": find, "verbosity": "queryPlanner"})
+        stages = plan_stages(explain["queryPlanner"]["winningPlan"])
+        results.append({
+            "collection": shape["collection"],
+            "filter": shape["filter"],
+            "sort": shape.get("sort"),
+            "stages": stages,
+            "collscan": "COLLSCAN" in stages,
+        })
+    return results
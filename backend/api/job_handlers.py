@@ -0,0 +1,36 @@
+# api/job_handlers.py
+from typing import Any, Dict
+
+from api.jobs import job_runner
+from api.ratings import recompute_rating_aggregates
+
+# Side effects that request handlers hand to the job queue instead of running
+# inline. Each handler may run more than once for the same job.
+#
+# Handlers never publish SSE events: a rerun would push duplicates, and a
+# separate worker process has no subscribers. Change streams pick up the
+# writes they make; in local mode the request path publishes.
+REPORT_NOTIFICATION = "report_notification"
+RATING_RECOMPUTE = "rating_recompute"
+
+
+async def send_report_notification(db, params: Dict[str, Any], progress) -> Dict[str, Any]:
+    """Store the moderation outcome for the photographer and the reporter."""
+    notification = params["notification"]
+    # keyed on the notification id the request generated, so a rerun inserts nothing
+    await db["notifications"].update_one(
+        {"id": notification["id"]}, {"$setOnInsert": notification}, upsert=True
+    )
+    return {"notification_id": notification["id"]}
+
+
+async def recompute_rating(db, params: Dict[str, Any], progress) -> Dict[str, Any]:
+    """Bring a profile's rating aggregates in line with its reviews (the search card follows on its next rebuild)."""
+    fields = await recompute_rating_aggregates(db, params["photographer_id"])
+    return {"average_rating": fields["average_rating"], "rating_count": fields["rating_count"]}
+
+
+job_runner.register(REPORT_NOTIFICATION, send_report_notification)
+# Queued per reviewed profile by a cascade; each reads every review of the profile,
+# so keep a large cascade from hogging the pool
+job_runner.register(RATING_RECOMPUTE, recompute_rating, concurrency=2)
@@ -0,0 +1,331 @@
+# api/jobs.py
+import asyncio
+import logging
+import os
+import random
+import socket
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, ReturnDocument
+
+from api.auth import User, get_current_user
+from api.database import get_db
+from api.pagination import PageParams, page_params, paginate, set_next_cursor
+
+logger = logging.getLogger(__name__)
+
+# The outbox: one document per job, {id, type, params, status, attempts,
+# max_attempts, run_at, lease_until, worker, progress, result, error,
+# created_at, started_at, finished_at}. Request handlers insert jobs next to
+# their own write (in the same transaction where the deployment has them)
+# and workers claim them with a lease. A job whose worker died is claimed
+# again once its lease lapses, so handlers must be idempotent.
+JOBS_COLLECTION = "jobs"
+QUEUED, RUNNING, SUCCEEDED, DEAD = "queued", "running", "succeeded", "dead"
+JOB_STATUSES = (QUEUED, RUNNING, SUCCEEDED, DEAD)
+
+# Worker tasks started inside the API process; 0 leaves jobs to `python -m api.worker`
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '4'))
+# How long a claim lasts without a heartbeat; renewed every third of it while the handler runs
+JOB_LEASE_SECONDS = float(os.environ.get('JOB_LEASE_SECONDS', '60'))
+# Idle workers look for due jobs this often (local enqueues wake them at once)
+JOB_POLL_SECONDS = float(os.environ.get('JOB_POLL_SECONDS', '1'))
+# Retry delay: base * 2^(attempt-1), capped, with jitter
+JOB_BACKOFF_BASE_SECONDS = float(os.environ.get('JOB_BACKOFF_BASE_SECONDS', '2'))
+JOB_BACKOFF_MAX_SECONDS = float(os.environ.get('JOB_BACKOFF_MAX_SECONDS', '600'))
+DEFAULT_MAX_ATTEMPTS = 5
+
+# handler(db, params, progress) -> result; progress(step, count) records how far it got
+Progress = Callable[[str, int], Awaitable[None]]
+Handler = Callable[[Any, Dict[str, Any], Progress], Awaitable[Optional[Dict[str, Any]]]]
+
+router = APIRouter(prefix="/api/admin/jobs", tags=["Jobs"])
+
+
+class JobType(NamedTuple):
+    handler: Handler
+    max_attempts: int
+    # Jobs of this type one process runs at once; None = only the pool size limits it.
+    # The limit is per process: the API and each `python -m api.worker` apply it
+    # separately, so N processes may run up to N * concurrency of a type.
+    concurrency: Optional[int]
+
+
+def backoff_seconds(attempts: int) -> float:
+    delay = min(JOB_BACKOFF_MAX_SECONDS, JOB_BACKOFF_BASE_SECONDS * 2 ** max(attempts - 1, 0))
+    return delay * random.uniform(0.5, 1.0)
+
+
+class JobRunner:
+    """Durable job queue on the jobs collection plus a pool of asyncio workers."""
+
+    def __init__(self):
+        self.types: Dict[str, JobType] = {}
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._running: Counter = Counter()
+        self._workers: List[asyncio.Task] = []
+        self._wake: Optional[asyncio.Event] = None
+
+    def register(self, kind: str, handler: Handler, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 concurrency: Optional[int] = None) -> None:
+        self.types[kind] = JobType(handler, max_attempts, concurrency)
+
+    async def enqueue(self, db, kind: str, params: Dict[str, Any], session=None, delay: float = 0.0) -> dict:
+        """Insert a queued job; pass the session of the write it belongs to.
+
+        Returns the job document. Workers in this process are woken at once,
+        others find the job on their next poll. Inside a transaction the job
+        stays invisible until the commit, so the caller wakes the runner
+        (`job_runner.wake()`) once the transaction has committed.
+        """
+        if kind not in self.types:
+            raise ValueError(f"Unknown job type: {kind}")
+        now = datetime.now(timezone.utc)
+        job = {
+            "id": str(uuid.uuid4()),
+            "type": kind,
+            "params": params,
+            "status": QUEUED,
+            "attempts": 0,
+            "max_attempts": self.types[kind].max_attempts,
+            "run_at": now + timedelta(seconds=delay),
+            "lease_until": None,
+            "worker": None,
+            "progress": {},
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+        }
+        await db[JOBS_COLLECTION].insert_one(dict(job), session=session)
+        if session is None:
+            self.wake()
+        return job
+
+    def wake(self) -> None:
+        if self._wake is not None:
+            self._wake.set()
+
+    def _reserve_types(self) -> List[str]:
+        """Types this process has room for, each holding one reserved slot.
+
+        The slots are taken before the claim is awaited, so pool tasks
+        claiming at the same time cannot overrun a type's limit between them.
+        """
+        kinds = [
+            kind for kind, job_type in self.types.items()
+            if job_type.concurrency is None or self._running[kind] < job_type.concurrency
+        ]
+        for kind in kinds:
+            self._running[kind] += 1
+        return kinds
+
+    def _release(self, kind: str) -> None:
+        self._running[kind] -= 1
+        self.wake()
+
+    async def claim(self, db) -> Optional[dict]:
+        """Lease the oldest due job of a type this process has room for.
+
+        The claimed job keeps its type's slot until execute() finishes it.
+        """
+        kinds = self._reserve_types()
+        if not kinds:
+            return None
+        job = None
+        try:
+            now = datetime.now(timezone.utc)
+            job = await db[JOBS_COLLECTION].find_one_and_update(
+                {
+                    "type": {"$in": kinds},
+                    "$or": [
+                        {"status": QUEUED, "run_at": {"$lte": now}},
+                        # the worker holding it stopped heartbeating
+                        {"status": RUNNING, "lease_until": {"$lt": now}},
+                    ],
+                },
+                {
+                    "$set": {
+                        "status": RUNNING,
+                        "worker": self.worker_id,
+                        "lease_until": now + timedelta(seconds=JOB_LEASE_SECONDS),
+                        "started_at": now,
+                    },
+                    "$inc": {"attempts": 1},
+                },
+                sort=[("run_at", ASCENDING)],
+                projection={"_id": 0},
+                return_document=ReturnDocument.AFTER,
+            )
+            return job
+        finally:
+            for kind in kinds:
+                if job is None or kind != job["type"]:
+                    self._running[kind] -= 1
+
+    async def execute(self, db, job: dict) -> None:
+        """Run a claimed job and record success, a scheduled retry, or a dead letter."""
+        try:
+            await self._execute(db, job)
+        finally:
+            self._release(job["type"])
+
+    async def _execute(self, db, job: dict) -> None:
+        jobs = db[JOBS_COLLECTION]
+        kind = job["type"]
+        # Every write is conditional on still holding the lease
+        owned = {"id": job["id"], "worker": self.worker_id, "status": RUNNING}
+        lease_lost = False
+
+        async def progress(step: str, count: int) -> None:
+            await jobs.update_one(owned, {"$set": {f"progress.{step}": count}})
+
+        async def heartbeat(handler: asyncio.Task) -> None:
+            nonlocal lease_lost
+            while True:
+                await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+                lease_until = datetime.now(timezone.utc) + timedelta(seconds=JOB_LEASE_SECONDS)
+                result = await jobs.update_one(owned, {"$set": {"lease_until": lease_until}})
+                if result.matched_count == 0:
+                    # the lease lapsed and another worker claimed the job (or an
+                    # admin changed it); stop rather than run it twice at once
+                    lease_lost = True
+                    handler.cancel()
+                    return
+
+        job_type = self.types.get(kind)
+        if job_type is None:
+            error = f"Unknown job type: {kind}"
+        elif job["attempts"] > job["max_attempts"]:
+            # crashed its workers on every attempt so far
+            error = job.get("error") or "Lease expired on the final attempt"
+        else:
+            error = None
+
+        if error is None:
+            handler = asyncio.ensure_future(job_type.handler(db, job["params"], progress))
+            beat = asyncio.create_task(heartbeat(handler))
+            try:
+                result = await handler
+            except asyncio.CancelledError:
+                if lease_lost:
+                    logger.warning("Job %s (%s) lost its lease; abandoned to its new worker", job["id"], kind)
+                    return
+                # shutting down: the lease lapses and another worker picks the job up
+                handler.cancel()
+                raise
+            except Exception as e:
+                logger.exception("Job %s (%s) failed on attempt %s", job["id"], kind, job["attempts"])
+                error = f"{type(e).__name__}: {e}"
+            else:
+                await jobs.update_one(owned, {"$set": {
+                    "status": SUCCEEDED, "result": result, "error": None,
+                    "lease_until": None, "finished_at": datetime.now(timezone.utc),
+                }})
+                return
+            finally:
+                beat.cancel()
+
+        now = datetime.now(timezone.utc)
+        if job_type is not None and job["attempts"] < job["max_attempts"]:
+            update = {"status": QUEUED, "run_at": now + timedelta(seconds=backoff_seconds(job["attempts"]))}
+        else:
+            logger.error("Job %s (%s) dead-lettered after %s attempts: %s", job["id"], kind, job["attempts"], error)
+            update = {"status": DEAD, "finished_at": now}
+        await jobs.update_one(owned, {"$set": {**update, "error": error, "lease_until": None, "worker": None}})
+
+    async def run_once(self, db) -> bool:
+        """Claim and run one due job; False when there was none."""
+        job = await self.claim(db)
+        if job is None:
+            return False
+        await self.execute(db, job)
+        return True
+
+    async def _work(self, db) -> None:
+        while True:
+            try:
+                if await self.run_once(db):
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # e.g. the database is unreachable; keep the worker alive
+                logger.exception("Job worker error")
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self, db, workers: int = JOB_WORKERS) -> None:
+        self._wake = asyncio.Event()
+        self._workers = [asyncio.create_task(self._work(db)) for _ in range(workers)]
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._wake = None
+
+    async def retry(self, db, job_id: str) -> bool:
+        """Queue a dead-lettered job again with a fresh set of attempts."""
+        result = await db[JOBS_COLLECTION].update_one(
+            {"id": job_id, "status": DEAD},
+            {"$set": {"status": QUEUED, "attempts": 0, "run_at": datetime.now(timezone.utc), "finished_at": None}},
+        )
+        self.wake()
+        return result.modified_count > 0
+
+
+job_runner = JobRunner()
+
+
+@router.get("", response_model=List[dict])
+async def list_jobs(
+    response: Response,
+    status: Optional[str] = Query(None, description="queued / running / succeeded / dead"),
+    page: PageParams = Depends(page_params),
+    current_user: User = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_db),
+):
+    """Jobs newest first, e.g. ?status=dead for the dead letters"""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    if status is not None and status not in JOB_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of {list(JOB_STATUSES)}")
+    query = {"status": status} if status else {}
+    jobs, next_cursor = await paginate(db[JOBS_COLLECTION], query, {"_id": 0}, page)
+    set_next_cursor(response, next_cursor)
+    return jobs
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
+    """Status, per-step progress, result or error of a background job"""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    job = await db[JOBS_COLLECTION].find_one({"id": job_id}, {"_id": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/{job_id}/retry")
+async def retry_job(job_id: str, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
+    """Queue a dead-lettered job again"""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    job = await db[JOBS_COLLECTION].find_one({"id": job_id}, {"_id": 0, "status": 1})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] != DEAD or not await job_runner.retry(db, job_id):
+        raise HTTPException(status_code=409, detail=f"Only dead jobs can be retried (job is {job['status']})")
+    return {"message": "Job queued", "job_id": job_id}
@@ -0,0 +1,88 @@
+# api/loaders.py
+import asyncio
+from typing import Any, Dict, Hashable, Iterable, List, Optional
+
+from fastapi import Depends
+
+from api.database import get_db
+
+
+class BatchLoader:
+    """Request-scoped loader that coalesces lookups by `key_field` into one `$in` query.
+
+    Every `load()` issued in the same event-loop tick is dispatched together,
+    repeated keys are fetched once, and results are memoized for the lifetime
+    of the loader (i.e. the request). Missing documents resolve to None.
+    """
+
+    def __init__(self, collection, key_field: str, projection: Optional[Dict[str, int]] = None):
+        self.collection = collection
+        self.key_field = key_field
+        self.projection = projection or {"_id": 0}
+        self._futures: Dict[Hashable, asyncio.Future] = {}
+        self._queue: List[Hashable] = []
+
+    def load(self, key: Hashable) -> "asyncio.Future[Optional[dict]]":
+        future = self._futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._futures[key] = future
+            if key is None:
+                future.set_result(None)
+                return future
+            self._queue.append(key)
+            if len(self._queue) == 1:
+                loop.call_soon(lambda: asyncio.ensure_future(self._dispatch()))
+        return future
+
+    async def load_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Optional[dict]]:
+        unique = list(dict.fromkeys(keys))
+        docs = await asyncio.gather(*(self.load(key) for key in unique))
+        return dict(zip(unique, docs))
+
+    def prime(self, key: Hashable, doc: Optional[dict]) -> None:
+        """Seed the cache with a document the caller already has in hand."""
+        if key not in self._futures:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(doc)
+            self._futures[key] = future
+
+    async def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        try:
+            docs = await self.collection.find(
+                {self.key_field: {"$in": keys}}, self.projection
+            ).to_list(None)
+        except Exception as exc:
+            for key in keys:
+                self._futures.pop(key).set_exception(exc)
+            return
+
+        found = {doc.get(self.key_field): doc for doc in docs}
+        for key in keys:
+            future = self._futures[key]
+            if not future.done():
+                future.set_result(found.get(key))
+
+
+class Loaders:
+    """Bundle of the loaders used to enrich bookings, reviews and reports."""
+
+    def __init__(self, db):
+        self.users = BatchLoader(db["users"], "id", {"_id": 0, "password": 0})
+        self.profiles = BatchLoader(db["photographer_profiles"], "user_id")
+        self.packages = BatchLoader(db["packages"], "id")
+        self.about_me = BatchLoader(db["about_me"], "user_id")
+
+
+def get_loaders(db=Depends(get_db)) -> Loaders:
+    """FastAPI dependency: a fresh set of loaders for each request."""
+    return Loaders(db)
+
+
+def pick(doc: Optional[Dict[str, Any]], *fields: str) -> Optional[Dict[str, Any]]:
+    """Return the subset of `doc` limited to `fields` (None passes through)."""
+    if doc is None:
+        return None
+    return {k: doc[k] for k in fields if k in doc}
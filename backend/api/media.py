@@ -0,0 +1,275 @@
+# api/media.py
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterable, Dict, Iterable, Optional, Set, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import FileResponse
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
+
+from api.auth import User, get_current_user
+from api.database import get_db
+
+# Uploaded images are stored by the sha256 of their bytes, so the same file
+# uploaded twice (by anyone) is processed and stored once:
+#   MEDIA_ROOT/ab/abcdef.../original
+#   MEDIA_ROOT/ab/abcdef.../{thumb,card,full}.{webp,jpeg}
+# The `media` collection records which ids exist; its _id is the hash.
+MEDIA_ROOT = Path(os.environ.get('MEDIA_ROOT', str(Path(__file__).resolve().parent.parent / 'media')))
+MEDIA_COLLECTION = "media"
+MEDIA_URL_PREFIX = "/api/media"
+MEDIA_MAX_UPLOAD_BYTES = int(os.environ.get('MEDIA_MAX_UPLOAD_BYTES', str(20 * 1024 * 1024)))
+# Upload bytes buffered before each write to disk
+MEDIA_WRITE_BLOCK_BYTES = 1024 * 1024
+# Decoded size limit, guards against decompression bombs
+MEDIA_MAX_PIXELS = int(os.environ.get('MEDIA_MAX_PIXELS', '50000000'))
+# Resizing is CPU bound and holds the GIL, so it runs in worker processes
+MEDIA_WORKERS = int(os.environ.get('MEDIA_WORKERS', str(min(2, os.cpu_count() or 1))))
+# Uploads allowed to wait for a worker before we shed load with a 503
+MEDIA_MAX_QUEUE = int(os.environ.get('MEDIA_MAX_QUEUE', '16'))
+
+# Longest edge in pixels per variant; images are never upscaled
+VARIANTS = {"thumb": 320, "card": 960, "full": 2048}
+FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+MEDIA_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+ACCEPTED_CONTENT_TYPES = {"image/jpeg", "image/png", "image/webp", "image/gif", "image/bmp", "image/tiff"}
+# Variant URLs change whenever their content does, so they may be cached forever
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+_MEDIA_ID = re.compile(r"^[0-9a-f]{64}$")
+
+router = APIRouter(prefix=MEDIA_URL_PREFIX, tags=["Media"])
+
+
+def media_dir(media_id: str) -> Path:
+    return MEDIA_ROOT / media_id[:2] / media_id
+
+
+def variant_urls(media_id: str) -> Dict[str, Dict[str, str]]:
+    """{"thumb": {"webp": url, "jpeg": url}, "card": {...}, "full": {...}}"""
+    return {
+        variant: {fmt: f"{MEDIA_URL_PREFIX}/{media_id}/{variant}.{fmt}" for fmt in FORMATS}
+        for variant in VARIANTS
+    }
+
+
+def media_id_from_url(url: str) -> Optional[str]:
+    """The id in one of our variant URLs, None for any other URL."""
+    parts = url.split("/")
+    if url.startswith(MEDIA_URL_PREFIX + "/") and len(parts) == 5 and _MEDIA_ID.match(parts[3]):
+        return parts[3]
+    return None
+
+
+def render_variants(source: str, target: str) -> dict:
+    """Write every variant of the image at `source` into directory `target`.
+
+    Runs in a worker process. Raises ValueError for anything Pillow cannot
+    decode or that is too large to decode safely.
+    """
+    from PIL import Image, ImageOps
+
+    Image.MAX_IMAGE_PIXELS = MEDIA_MAX_PIXELS
+    try:
+        with Image.open(source) as opened:
+            # camera orientation is applied here because EXIF is not kept
+            image = ImageOps.exif_transpose(opened)
+            image.load()
+    except (Image.DecompressionBombError, OSError, SyntaxError, ValueError) as e:
+        raise ValueError(f"Not a supported image: {e}")
+
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+    image = image.convert("RGBA" if has_alpha else "RGB")
+    sizes = {}
+    # Largest first, each variant is resized from the previous one
+    for variant, edge in sorted(VARIANTS.items(), key=lambda item: -item[1]):
+        image.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+        sizes[variant] = list(image.size)
+        for fmt, (pil_format, options) in FORMATS.items():
+            out = image.convert("RGB") if pil_format == "JPEG" else image
+            path = os.path.join(target, f"{variant}.{fmt}")
+            out.save(path + ".tmp", pil_format, **options)
+            os.replace(path + ".tmp", path)
+    return {"sizes": sizes}
+
+
+class MediaProcessor:
+    """Runs render_variants in a process pool so the event loop never resizes.
+
+    At most `workers` images are processed at once and at most `max_queue`
+    more may wait; beyond that uploads get a 503.
+    """
+
+    def __init__(self, workers: int = MEDIA_WORKERS, max_queue: int = MEDIA_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    async def render(self, source: Path, target: Path) -> dict:
+        if self.pending >= self.workers + self.max_queue:
+            raise HTTPException(status_code=503, detail="Image processing is busy, please retry", headers={"Retry-After": "2"})
+        if self._executor is None:
+            # spawn: forking a process that runs an event loop and driver threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"), max_tasks_per_child=200
+            )
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, render_variants, str(source), str(target))
+        finally:
+            self.pending -= 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+media_processor = MediaProcessor()
+
+
+def _public(doc: dict) -> dict:
+    return {
+        "id": doc["_id"],
+        "width": doc["width"],
+        "height": doc["height"],
+        "url": variant_urls(doc["_id"])["full"]["jpeg"],
+        "variants": variant_urls(doc["_id"]),
+    }
+
+
+async def store_upload(db, owner_id: str, content_type: str, chunks: AsyncIterable[bytes]) -> dict:
+    """Stream an upload to disk while hashing it, then render its variants once.
+
+    File system calls run in a worker thread so a slow disk never stalls the
+    event loop; chunks are coalesced so each hop writes a sizeable block.
+    """
+    if content_type not in ACCEPTED_CONTENT_TYPES:
+        raise HTTPException(status_code=415, detail=f"Unsupported image type: {content_type or 'unknown'}")
+    tmp_dir = MEDIA_ROOT / "tmp"
+    await asyncio.to_thread(tmp_dir.mkdir, parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, name = await asyncio.to_thread(tempfile.mkstemp, dir=tmp_dir)
+    tmp_path = Path(name)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            pending = bytearray()
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > MEDIA_MAX_UPLOAD_BYTES:
+                    raise HTTPException(status_code=413, detail=f"Images may be at most {MEDIA_MAX_UPLOAD_BYTES // (1024 * 1024)} MB")
+                digest.update(chunk)
+                pending += chunk
+                if len(pending) >= MEDIA_WRITE_BLOCK_BYTES:
+                    await asyncio.to_thread(out.write, bytes(pending))
+                    pending.clear()
+            if pending:
+                await asyncio.to_thread(out.write, bytes(pending))
+        if size == 0:
+            raise HTTPException(status_code=400, detail="Empty upload")
+
+        media_id = digest.hexdigest()
+        existing = await db[MEDIA_COLLECTION].find_one({"_id": media_id})
+        if existing:
+            return _public(existing)
+
+        target = media_dir(media_id)
+        await asyncio.to_thread(target.mkdir, parents=True, exist_ok=True)
+        original = target / "original"
+        await asyncio.to_thread(os.replace, tmp_path, original)
+        try:
+            rendered = await media_processor.render(original, target)
+        except ValueError as e:
+            await asyncio.to_thread(shutil.rmtree, target, True)
+            raise HTTPException(status_code=400, detail=str(e))
+
+        width, height = rendered["sizes"]["full"]
+        doc = {
+            "_id": media_id,
+            "owner_id": owner_id,
+            "content_type": content_type,
+            "bytes": size,
+            "width": width,
+            "height": height,
+            "sizes": rendered["sizes"],
+            "created_at": datetime.now(timezone.utc),
+        }
+        try:
+            await db[MEDIA_COLLECTION].insert_one(doc)
+        except DuplicateKeyError:
+            pass  # the same image finished uploading concurrently
+        return _public(doc)
+    finally:
+        await asyncio.to_thread(tmp_path.unlink, missing_ok=True)
+
+
+async def known_media(db, media_ids: Iterable[str]) -> Set[str]:
+    """Which of `media_ids` are stored uploads, in one query."""
+    wanted = [m for m in set(media_ids) if m and _MEDIA_ID.match(m)]
+    if not wanted:
+        return set()
+    return set(await db[MEDIA_COLLECTION].distinct("_id", {"_id": {"$in": wanted}}))
+
+
+async def attach_images(db, data: dict, fields: Dict[str, Tuple[str, str]], known: Optional[Set[str]] = None) -> dict:
+    """Swap uploaded image ids in `data` for their URLs, in place.
+
+    `fields` maps an id field to the (url field, variants field) it fills.
+    A URL saved without an id keeps its variants if it is one of ours (the
+    form was resubmitted unchanged) and clears them if it is external.
+    Bulk callers pass `known` (from known_media) instead of a lookup per id.
+    """
+    for id_field, (url_field, variants_field) in fields.items():
+        media_id = data.pop(id_field, None)
+        if media_id:
+            if known is not None:
+                found = media_id in known
+            else:
+                found = bool(_MEDIA_ID.match(media_id)) and bool(
+                    await db[MEDIA_COLLECTION].find_one({"_id": media_id}, {"_id": 1})
+                )
+            if not found:
+                raise HTTPException(status_code=400, detail=f"Unknown image: {media_id}")
+            data[url_field] = variant_urls(media_id)["full"]["jpeg"]
+        elif data.get(url_field) is None:
+            continue
+        else:
+            media_id = media_id_from_url(data[url_field])
+        data[variants_field] = variant_urls(media_id) if media_id else None
+    return data
+
+
+@router.post("")
+async def upload_image(request: Request, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
+    """Upload one image as the raw request body (Content-Type: image/*)"""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MEDIA_MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Images may be at most {MEDIA_MAX_UPLOAD_BYTES // (1024 * 1024)} MB")
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    return await store_upload(db, current_user.id, content_type, request.stream())
+
+
+@router.get("/{media_id}/{name}")
+async def get_image(media_id: str, name: str):
+    variant, _, fmt = name.partition(".")
+    if not _MEDIA_ID.match(media_id) or variant not in VARIANTS or fmt not in FORMATS:
+        raise HTTPException(status_code=404, detail="Image not found")
+    path = media_dir(media_id) / name
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="Image not found")
+    # Servers implementing the ASGI pathsend extension send the file with sendfile()
+    return FileResponse(path, media_type=MEDIA_TYPES[fmt], headers={"Cache-Control": IMMUTABLE})
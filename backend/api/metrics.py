@@ -0,0 +1,285 @@
+# api/metrics.py
+import contextvars
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from pymongo import monitoring
+from starlette.routing import Match
+
+# Per-process metrics in the Prometheus text exposition format. With several
+# uvicorn workers every process has its own registry, so scrape each one (or
+# sum them) the way you would any multi-process exporter.
+
+# Adds X-DB-Query-Count to every response, to spot N+1 regressions while developing
+DEBUG = os.environ.get('DEBUG', '').lower() in ('1', 'true', 'yes')
+# When set, /metrics requires "Authorization: Bearer <token>"
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+EXPOSITION_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Requests that matched no route share one label so raw paths never become series
+UNMATCHED_ROUTE = "<unmatched>"
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COMMAND_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+COMMANDS_PER_REQUEST_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Metric:
+    """A labelled metric family; values are updated from request tasks and driver threads."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels: Labels = ()) -> float:
+        return self._values.get(labels, 0)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_number(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: Labels = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets: Sequence[float] = REQUEST_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last is +Inf), sum]
+        self._values: Dict[Labels, list] = {}
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def count(self, labels: Labels = ()) -> int:
+        entry = self._values.get(labels)
+        return sum(entry[0]) if entry else 0
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1])) for k, v in self._values.items())
+        lines = []
+        names = self.labelnames + ("le",)
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(names, labels + (_format_number(bound),))} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_number(total)}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route template and status code.", ("method", "route", "status"),
+))
+http_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests being handled (open SSE streams included).", ("method", "route"),
+))
+http_latency = registry.register(Histogram(
+    "http_request_duration_seconds", "Time to the end of the response body.", ("method", "route"),
+    buckets=REQUEST_BUCKETS,
+))
+http_db_commands = registry.register(Histogram(
+    "http_request_db_commands", "MongoDB commands issued while handling one request.", ("method", "route"),
+    buckets=COMMANDS_PER_REQUEST_BUCKETS,
+))
+db_latency = registry.register(Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command round trips as seen by the driver.", ("collection", "command"),
+    buckets=COMMAND_BUCKETS,
+))
+db_failures = registry.register(Counter(
+    "mongodb_command_failures_total", "MongoDB commands that returned an error.", ("collection", "command"),
+))
+
+
+# ---------- MongoDB commands ----------
+
+class RequestStats:
+    __slots__ = ("db_commands",)
+
+    def __init__(self):
+        self.db_commands = 0
+
+
+# Set by the middleware for the duration of a request. Motor runs driver calls
+# on a thread pool with a copy of the caller's context, so the listener sees
+# the same RequestStats object the request task holds.
+current_request: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar("current_request", default=None)
+
+
+def _collection(command_name: str, command: dict) -> str:
+    if command_name == "getMore":
+        return str(command.get("collection", ""))
+    target = command.get(command_name)
+    # admin and session commands (hello, endSessions, ...) carry no collection
+    return target if isinstance(target, str) else ""
+
+
+class CommandTimer(monitoring.CommandListener):
+    """Times every command by collection and counts them against the current request."""
+
+    def __init__(self):
+        self._pending: Dict[Tuple[object, int], str] = {}
+
+    def started(self, event):
+        self._pending[(event.connection_id, event.request_id)] = _collection(event.command_name, event.command)
+        stats = current_request.get()
+        if stats is not None:
+            stats.db_commands += 1
+
+    def _finish(self, event) -> Labels:
+        collection = self._pending.pop((event.connection_id, event.request_id), "")
+        labels = (collection, event.command_name)
+        db_latency.observe(event.duration_micros / 1e6, labels)
+        return labels
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        db_failures.inc(self._finish(event))
+
+
+command_timer = CommandTimer()
+
+
+# ---------- HTTP requests ----------
+
+def route_template(scope) -> str:
+    """The path template of the route a request will hit, e.g. /api/bookings/{booking_id}."""
+    app = scope.get("app")
+    for route in getattr(getattr(app, "router", None), "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", UNMATCHED_ROUTE)
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no extra task per request, streaming untouched)."""
+
+    def __init__(self, app, debug: Optional[bool] = None):
+        self.app = app
+        self.debug = DEBUG if debug is None else debug
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        labels = (scope["method"], route_template(scope))
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status = "500"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+                if self.debug:
+                    headers = list(message.get("headers", []))
+                    headers.append((QUERY_COUNT_HEADER.lower().encode(), str(stats.db_commands).encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        http_in_flight.inc(labels)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_latency.observe(time.perf_counter() - start, labels)
+            http_requests.inc(labels + (status,))
+            http_db_commands.observe(stats.db_commands, labels)
+            http_in_flight.dec(labels)
+            current_request.reset(token)
+
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Prometheus scrape endpoint"""
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(registry.render(), media_type=EXPOSITION_CONTENT_TYPE)
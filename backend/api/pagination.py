@@ -0,0 +1,131 @@
+# api/pagination.py
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query, Response
+from pymongo import DESCENDING
+
+# Clients that never follow X-Next-Cursor (the dashboards) still get the
+# 1000 rows these lists returned before they were paginated
+DEFAULT_LIMIT = 1000
+MAX_LIMIT = 1000
+
+# Newest first, with the document id as a unique tie-breaker
+DEFAULT_SORT: Sequence[Tuple[str, int]] = (("created_at", DESCENDING), ("id", DESCENDING))
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    def __init__(self, limit: int, cursor: Optional[str]):
+        self.limit = limit
+        self.cursor = cursor
+
+
+def page_params(
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT, description="Page size"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page's X-Next-Cursor header"),
+) -> PageParams:
+    return PageParams(limit=limit, cursor=cursor)
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "$date" in value:
+        return datetime.fromisoformat(value["$date"])
+    return value
+
+
+def encode_cursor(values: List[Any]) -> str:
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list):
+            raise ValueError("cursor must encode a list")
+        return [_decode_value(v) for v in values]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _after(field: str, direction: int, value: Any) -> Optional[dict]:
+    """Condition for `field` strictly after `value`, or None if nothing can be.
+
+    BSON orders values by type before value: null (and a missing key) below
+    strings, strings below dates. $lt / $gt only match their own type, so
+    the other types that follow `value` in sort order are added explicitly.
+    That keeps every document reachable while migrate_timestamps has left a
+    field part ISO strings and part dates.
+    """
+    if value is None:
+        return {field: {"$ne": None}} if direction != DESCENDING else None
+    if direction == DESCENDING:
+        alternatives = [{field: {"$lt": value}}]
+        if isinstance(value, datetime):
+            alternatives.append({field: {"$type": "string"}})
+        alternatives.append({field: None})
+    else:
+        alternatives = [{field: {"$gt": value}}]
+        if isinstance(value, str):
+            alternatives.append({field: {"$type": "date"}})
+    return alternatives[0] if len(alternatives) == 1 else {"$or": alternatives}
+
+
+def keyset_filter(sort: Sequence[Tuple[str, int]], values: List[Any]) -> dict:
+    """Filter matching documents strictly after `values` in `sort` order."""
+    if len(values) != len(sort):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        after = _after(field, direction, values[i])
+        if after is None:
+            continue
+        # equal on the earlier keys ({prev_field: None} also matches a missing one)
+        clause = {prev_field: values[j] for j, (prev_field, _) in enumerate(sort[:i])}
+        clause.update(after)
+        clauses.append(clause)
+    return {"$or": clauses}
+
+
+async def paginate(
+    collection,
+    query: dict,
+    projection: Optional[dict],
+    page: PageParams,
+    sort: Sequence[Tuple[str, int]] = DEFAULT_SORT,
+) -> Tuple[List[dict], Optional[str]]:
+    """Fetch one keyset page and the cursor for the next one (None on the last page).
+
+    The sort keys must be covered by an index starting with the equality
+    fields of `query` so that every page is an index range scan, however deep.
+    """
+    if page.cursor:
+        query = {"$and": [query, keyset_filter(sort, decode_cursor(page.cursor))]}
+
+    docs = await collection.find(query, projection).sort(list(sort)).limit(page.limit + 1).to_list(page.limit + 1)
+
+    next_cursor = None
+    if len(docs) > page.limit:
+        docs = docs[:page.limit]
+        last = docs[-1]
+        next_cursor = encode_cursor([last.get(field) for field, _ in sort])
+    return docs, next_cursor
+
+
+def cursor_headers(next_cursor: Optional[str]) -> Dict[str, str]:
+    return {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    response.headers.update(cursor_headers(next_cursor))
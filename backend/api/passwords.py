@@ -0,0 +1,74 @@
+# api/passwords.py
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+# bcrypt cost factor. Pinning min == max == default makes passlib flag every
+# hash with a different cost as needing an update, so changing BCRYPT_ROUNDS
+# transparently re-hashes users as they log in.
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+# bcrypt releases the GIL, so a small thread pool runs hashes in parallel
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', str(min(4, os.cpu_count() or 1))))
+# Requests allowed to wait for a worker before we shed load with a 503
+PASSWORD_HASH_MAX_QUEUE = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', '64'))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+
+class PasswordHasher:
+    """Runs bcrypt in a dedicated thread pool so it never blocks the event loop.
+
+    At most `workers` hashes run at once and at most `max_queue` more may wait;
+    beyond that callers get a 503 instead of piling up behind the pool.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_queue: int = PASSWORD_HASH_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.pending = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _submit(self, fn, *args):
+        if self.pending >= self.workers + self.max_queue:
+            raise HTTPException(
+                status_code=503,
+                detail="Authentication service is busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        future = asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        self.pending += 1
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _future) -> None:
+        self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(pwd_context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._submit(pwd_context.verify, password, hashed_password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify, returning a replacement hash when the stored one uses an outdated cost."""
+        return await self._submit(pwd_context.verify_and_update, password, hashed_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
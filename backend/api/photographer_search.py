@@ -0,0 +1,213 @@
+# api/photographer_search.py
+import re
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+
+from api.database import get_db
+from api.geo import location_point
+from api.search_index import search_index
+from api.pagination import (
+    PageParams,
+    decode_cursor,
+    encode_cursor,
+    page_params,
+    paginate,
+    set_next_cursor,
+)
+
+BACKFILL_BATCH_SIZE = 500
+
+router = APIRouter(prefix="/api/photographers", tags=["Photographer Search"])
+
+# Keyset orders per sort option; "relevance" (text score) pages by offset instead
+SORTS = {
+    "newest": (("created_at", DESCENDING), ("id", DESCENDING)),
+    "rating": (("average_rating", DESCENDING), ("id", DESCENDING)),
+    "experience": (("experience_years", DESCENDING), ("id", DESCENDING)),
+}
+
+# Only what a listing card renders
+CARD_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "user_id": 1,
+    "full_name": 1,
+    "bio": 1,
+    "specialties": 1,
+    "location": 1,
+    "experience_years": 1,
+    "profile_image": 1,
+    "cover_image": 1,
+    "profile_image_variants": 1,
+    "cover_image_variants": 1,
+    "average_rating": 1,
+    "rating_count": 1,
+    "created_at": 1,
+}
+
+
+def search_fields(full_name: Optional[str] = None, location: Optional[str] = None) -> dict:
+    """Denormalized profile fields the search indexes rely on."""
+    fields = {}
+    if full_name is not None:
+        fields["full_name"] = full_name
+    if location is not None:
+        fields["location_lc"] = location.strip().lower()
+        fields["location_point"] = location_point(location)
+    return fields
+
+
+async def backfill_search_fields(db) -> int:
+    """Denormalize full_name / location_lc onto profiles created before search existed."""
+    updated = 0
+    cursor = db.photographer_profiles.find({}, {"_id": 0, "user_id": 1, "location": 1})
+    while True:
+        batch = await cursor.to_list(BACKFILL_BATCH_SIZE)
+        if not batch:
+            break
+        users = await db.users.find(
+            {"id": {"$in": [p["user_id"] for p in batch]}}, {"_id": 0, "id": 1, "full_name": 1}
+        ).to_list(len(batch))
+        names = {u["id"]: u.get("full_name") for u in users}
+        ops = [
+            UpdateOne({"user_id": p["user_id"]}, {"$set": search_fields(names.get(p["user_id"], ""), p.get("location", ""))})
+            for p in batch
+        ]
+        await db.photographer_profiles.bulk_write(ops, ordered=False)
+        updated += len(ops)
+    return updated
+
+
+def _card(profile: dict) -> dict:
+    full_name = profile.pop("full_name", None)
+    profile.pop("score", None)
+    if "distance_m" in profile:
+        profile["distance_km"] = round(profile.pop("distance_m") / 1000, 2)
+    return {"profile": profile, "user": {"id": profile.get("user_id"), "full_name": full_name}}
+
+
+def _offset(page: PageParams) -> int:
+    """Offset carried by the cursor of orders that have no stable keyset."""
+    if not page.cursor:
+        return 0
+    values = decode_cursor(page.cursor)
+    if len(values) != 1 or not isinstance(values[0], int) or values[0] < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values[0]
+
+
+async def _relevance_page(db, query: dict, page: PageParams):
+    offset = _offset(page)
+    projection = {**CARD_PROJECTION, "score": {"$meta": "textScore"}}
+    docs = await db.photographer_profiles.find(query, projection).sort(
+        [("score", {"$meta": "textScore"}), ("id", ASCENDING)]
+    ).skip(offset).limit(page.limit + 1).to_list(page.limit + 1)
+
+    next_cursor = None
+    if len(docs) > page.limit:
+        docs = docs[:page.limit]
+        next_cursor = encode_cursor([offset + page.limit])
+    return docs, next_cursor
+
+
+@router.get("/search", response_model=List[dict])
+async def search_photographers(
+    response: Response,
+    q: Optional[str] = Query(None, description="Free text over name, bio, specialties and location"),
+    specialty: Optional[str] = Query(None, description="Exact specialty, e.g. Wedding"),
+    location: Optional[str] = Query(None, description="Location prefix, case-insensitive"),
+    min_experience: Optional[int] = Query(None, ge=0),
+    min_price: Optional[float] = Query(None, ge=0, description="Has a package priced at least this"),
+    max_price: Optional[float] = Query(None, ge=0, description="Has a package priced at most this"),
+    sort: Optional[str] = Query(None, description="relevance / rating / experience / newest"),
+    page: PageParams = Depends(page_params),
+    db: AsyncIOMotorDatabase = Depends(get_db),
+):
+    """Search approved photographers, returning listing-card fields only"""
+    q = (q or "").strip()
+    sort = sort or ("relevance" if q else "newest")
+    if sort not in SORTS and sort != "relevance":
+        raise HTTPException(status_code=400, detail=f"Invalid sort. Must be one of {['relevance', *SORTS]}")
+    if sort == "relevance" and not q:
+        raise HTTPException(status_code=400, detail="sort=relevance requires q")
+
+    query: dict = {"approval_status": "approved"}
+    if q:
+        query["$text"] = {"$search": q}
+    if specialty:
+        query["specialties"] = specialty
+    if location and location.strip():
+        query["location_lc"] = {"$regex": "^" + re.escape(location.strip().lower())}
+    if min_experience is not None:
+        query["experience_years"] = {"$gte": min_experience}
+    if min_price is not None or max_price is not None:
+        price = {}
+        if min_price is not None:
+            price["$gte"] = min_price
+        if max_price is not None:
+            price["$lte"] = max_price
+        # covered by the packages (price, photographer_id) index
+        query["user_id"] = {"$in": await db.packages.distinct("photographer_id", {"price": price})}
+
+    if sort == "relevance":
+        docs, next_cursor = await _relevance_page(db, query, page)
+    else:
+        docs, next_cursor = await paginate(db.photographer_profiles, query, CARD_PROJECTION, page, sort=SORTS[sort])
+
+    set_next_cursor(response, next_cursor)
+    return [_card(doc) for doc in docs]
+
+
+def near_pipeline(lng: float, lat: float, radius_km: float, specialty: Optional[str], offset: int, limit: int) -> list:
+    """$geoNear over the profiles' location_point 2dsphere index, nearest first."""
+    query: dict = {"approval_status": "approved"}
+    if specialty:
+        query["specialties"] = specialty
+    return [
+        {"$geoNear": {
+            "near": {"type": "Point", "coordinates": [lng, lat]},
+            "key": "location_point",
+            "distanceField": "distance_m",
+            "maxDistance": radius_km * 1000,
+            "spherical": True,
+            "query": query,
+        }},
+        {"$skip": offset},
+        {"$limit": limit},
+        {"$project": {**CARD_PROJECTION, "distance_m": 1}},
+    ]
+
+
+@router.get("/near", response_model=List[dict])
+async def photographers_near(
+    response: Response,
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(25, gt=0, le=1000),
+    specialty: Optional[str] = Query(None, description="Exact specialty, e.g. Wedding"),
+    page: PageParams = Depends(page_params),
+    db: AsyncIOMotorDatabase = Depends(get_db),
+):
+    """Approved photographers within radius_km of a point, nearest first, with distance_km"""
+    offset = _offset(page)
+    pipeline = near_pipeline(lng, lat, radius_km, specialty, offset, page.limit + 1)
+    docs = await db.photographer_profiles.aggregate(pipeline).to_list(page.limit + 1)
+
+    next_cursor = None
+    if len(docs) > page.limit:
+        docs = docs[:page.limit]
+        next_cursor = encode_cursor([offset + page.limit])
+    set_next_cursor(response, next_cursor)
+    return [_card(doc) for doc in docs]
+
+
+@router.get("/typeahead", response_model=List[dict])
+async def typeahead(
+    q: str = Query(..., min_length=1, description="Partial query, matched by prefix and with typos"),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """Type-ahead suggestions from the in-process search index (no database round trip)"""
+    return search_index.search(q, limit)
@@ -0,0 +1,128 @@
+# api/ratings.py
+from typing import Optional
+
+from pymongo import ReturnDocument, UpdateOne
+
+RATING_VALUES = range(1, 6)
+BACKFILL_BATCH_SIZE = 500
+
+
+def _plus(field: str, delta: int) -> dict:
+    return {"$add": [{"$ifNull": [f"${field}", 0]}, delta]}
+
+
+def rating_delta_pipeline(new_rating: Optional[int], old_rating: Optional[int]) -> list:
+    """Update pipeline applying one review change to a profile's rating aggregates.
+
+    `old_rating` is None for a brand new review and `new_rating` is None for a
+    removed one. Sum, count and the 1-5 histogram are adjusted by deltas and
+    `average_rating` is re-derived in the same atomic write, so concurrent
+    reviews never race each other and nothing is ever re-read.
+    """
+    sum_delta = (new_rating or 0) - (old_rating or 0)
+    count_delta = (new_rating is not None) - (old_rating is not None)
+
+    histogram = {}
+    for rating, delta in ((new_rating, 1), (old_rating, -1)):
+        if rating is not None:
+            histogram[str(rating)] = histogram.get(str(rating), 0) + delta
+
+    fields = {
+        "rating_sum": _plus("rating_sum", sum_delta),
+        "rating_count": _plus("rating_count", count_delta),
+    }
+    for key, delta in histogram.items():
+        fields[f"rating_histogram.{key}"] = _plus(f"rating_histogram.{key}", delta)
+
+    return [
+        {"$set": fields},
+        {"$set": {"average_rating": {"$cond": [
+            {"$gt": ["$rating_count", 0]},
+            {"$round": [{"$divide": ["$rating_sum", "$rating_count"]}, 2]},
+            0,
+        ]}}},
+    ]
+
+
+async def apply_rating_change(db, photographer_id: str, new_rating: Optional[int], old_rating: Optional[int],
+                              session=None) -> float:
+    """Apply a review change to the photographer's profile and return the new average.
+
+    Pass the session of the review write so both commit together.
+    """
+    profile = await db["photographer_profiles"].find_one_and_update(
+        {"user_id": photographer_id},
+        rating_delta_pipeline(new_rating, old_rating),
+        projection={"_id": 0, "average_rating": 1},
+        return_document=ReturnDocument.AFTER,
+        session=session,
+    )
+    return profile.get("average_rating", 0) if profile else 0
+
+
+def _aggregate_pipeline(match: Optional[dict] = None) -> list:
+    group = {"$group": {
+        "_id": "$photographer_id",
+        "rating_sum": {"$sum": "$rating"},
+        "rating_count": {"$sum": 1},
+        **{f"h{r}": {"$sum": {"$cond": [{"$eq": ["$rating", r]}, 1, 0]}} for r in RATING_VALUES},
+    }}
+    return [{"$match": match}, group] if match else [group]
+
+
+def _aggregate_fields(row: Optional[dict]) -> dict:
+    """Profile rating fields for one $group row; None means no reviews."""
+    if row is None:
+        return {
+            "rating_sum": 0,
+            "rating_count": 0,
+            "rating_histogram": {str(r): 0 for r in RATING_VALUES},
+            "average_rating": 0,
+        }
+    return {
+        "rating_sum": row["rating_sum"],
+        "rating_count": row["rating_count"],
+        "rating_histogram": {str(r): row[f"h{r}"] for r in RATING_VALUES},
+        "average_rating": round(row["rating_sum"] / row["rating_count"], 2),
+    }
+
+
+async def recompute_rating_aggregates(db, photographer_id: str) -> dict:
+    """Rebuild one profile's rating aggregates from its reviews.
+
+    Unlike apply_rating_change this reads the reviews instead of applying a
+    delta, so it can run any number of times (as a retried job does) and
+    always converges on the current reviews. Used where the change is not a
+    single review edit, e.g. after a cascade removed a user's reviews.
+    Returns the fields written.
+    """
+    rows = await db["reviews"].aggregate(_aggregate_pipeline({"photographer_id": photographer_id})).to_list(None)
+    fields = _aggregate_fields(rows[0] if rows else None)
+    await db["photographer_profiles"].update_one({"user_id": photographer_id}, {"$set": fields})
+    return fields
+
+
+async def backfill_rating_aggregates(db) -> int:
+    """Recompute every profile's rating aggregates from the reviews collection.
+
+    One-off (and re-runnable) migration for profiles created before the
+    aggregates existed. Returns the number of profiles that have reviews.
+    """
+    updated = 0
+    ops = []
+    async for row in db["reviews"].aggregate(_aggregate_pipeline(), allowDiskUse=True):
+        ops.append(UpdateOne({"user_id": row["_id"]}, {"$set": _aggregate_fields(row)}))
+        if len(ops) >= BACKFILL_BATCH_SIZE:
+            await db["photographer_profiles"].bulk_write(ops, ordered=False)
+            updated += len(ops)
+            ops = []
+    if ops:
+        await db["photographer_profiles"].bulk_write(ops, ordered=False)
+        updated += len(ops)
+
+    # Profiles nobody has reviewed yet start from zero
+    await db["photographer_profiles"].update_many(
+        {"rating_count": {"$exists": False}},
+        {"$set": _aggregate_fields(None)},
+    )
+    return updated
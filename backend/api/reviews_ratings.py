@@ -1,28 +1,29 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pymongo import DESCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime, timezone
-from motor.motor_asyncio import AsyncIOMotorClient
-from dotenv import load_dotenv
-import os
+from motor.motor_asyncio import AsyncIOMotorDatabase
 import uuid
+from api.auth import invalidate_user
+from api.database import get_db, in_transaction, transaction
+from api.loaders import Loaders, get_loaders, pick
+from api.full_view import FULL_VIEW_SECTION_LIMIT, load_full_view
+from api.ratings import apply_rating_change
+from api import admin_stats
+from api.pagination import PageParams, page_params, paginate, set_next_cursor
+from api.cascade import CASCADE_DELETE
+from api.job_handlers import REPORT_NOTIFICATION
+from api.jobs import job_runner
+from api.events import broker
 
 # ---------- Setup ----------
-load_dotenv()
 router = APIRouter(prefix="/api", tags=["Reviews & Reports"])
 
-MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017")
-client = AsyncIOMotorClient(MONGO_URL)
-db = client["test_database"]
+# Notifications carry `timestamp` rather than `created_at`
+NOTIFICATION_SORT = (("timestamp", DESCENDING), ("id", DESCENDING))
 
-# ---------- Collections (Standardized) ----------
-reports_collection = db["reports"]
-reviews_collection = db["reviews"]
-notifications_collection = db["notifications"]
-users_collection = db["users"]
-profiles_collection = db["photographer_profiles"]
-portfolio_collection = db["portfolio_items"]
-packages_collection = db["packages"]
 
 # ---------- Predefined Report Reasons ----------
 REPORT_REASONS = [
@@ -92,9 +93,9 @@ class Notification(BaseModel):
 
 
 # ---------- Helper: Restriction Check ----------
-async def ensure_not_restricted(user_id: str):
+async def ensure_not_restricted(db: AsyncIOMotorDatabase, user_id: str):
     """Reusable guard to block restricted photographers from performing actions."""
-    user = await users_collection.find_one({"id": user_id}, {"_id": 0, "restricted": 1, "restriction_reason": 1})
+    user = await db["users"].find_one({"id": user_id}, {"_id": 0, "restricted": 1, "restriction_reason": 1})
     if user and user.get("restricted"):
         raise HTTPException(
             status_code=403,
@@ -104,57 +105,67 @@ async def ensure_not_restricted(user_id: str):
 
 # ---------- Review Routes ----------
 @router.post("/reviews", response_model=dict)
-async def add_or_update_review(review: ReviewSchema):
+async def add_or_update_review(review: ReviewSchema, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Submit or update a review for a photographer"""
-    existing = await reviews_collection.find_one(
-        {"photographer_id": review.photographer_id, "user_id": review.user_id}
-    )
 
-    if existing:
-        await reviews_collection.update_one(
-            {"_id": existing["_id"]},
+    async def write(session):
+        # Single upsert on the (photographer_id, user_id) unique index; the
+        # pre-image tells us whether this was an edit and what it replaced.
+        previous = await db["reviews"].find_one_and_update(
+            {"photographer_id": review.photographer_id, "user_id": review.user_id},
             {
                 "$set": {
                     "rating": review.rating,
                     "review_text": review.review_text,
                     "created_at": datetime.now(timezone.utc),
-                }
+                },
+                "$setOnInsert": {"id": str(uuid.uuid4())},
             },
+            upsert=True,
+            projection={"_id": 0, "rating": 1},
+            return_document=ReturnDocument.BEFORE,
+            session=session,
         )
-        message = "Review updated successfully"
-    else:
-        new_review = Review(**review.dict())
-        await reviews_collection.insert_one(new_review.model_dump())
-        message = "Review added successfully"
-
-    # Recalculate average rating
-    all_reviews = await reviews_collection.find({"photographer_id": review.photographer_id}).to_list(1000)
-    avg_rating = (
-        round(sum(r.get("rating", 0) for r in all_reviews) / len(all_reviews), 2) if all_reviews else 0
-    )
-
-    await profiles_collection.update_one(
-        {"user_id": review.photographer_id}, {"$set": {"average_rating": avg_rating}}
-    )
+        old_rating = previous.get("rating") if previous is not None else None
+        # Apply the delta to the profile's rating aggregates in the same
+        # transaction (on a standalone server a crash in between leaves them
+        # for `manage.py backfill-ratings`)
+        avg_rating = await apply_rating_change(db, review.photographer_id, review.rating, old_rating, session=session)
+        return previous, avg_rating
 
+    try:
+        previous, avg_rating = await in_transaction(db, write)
+    except DuplicateKeyError:
+        # A concurrent first review by the same user inserted the document
+        # between our match and our insert; run again as an edit of it
+        previous, avg_rating = await in_transaction(db, write)
+    if previous is None:
+        await admin_stats.bump(db, total_reviews=1)
+
+    message = "Review added successfully" if previous is None else "Review updated successfully"
     return {"message": message, "average_rating": avg_rating}
 
 
 @router.get("/reviews/{photographer_id}", response_model=List[dict])
-async def get_reviews(photographer_id: str):
+async def get_reviews(
+    photographer_id: str,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    loaders: Loaders = Depends(get_loaders),
+    db: AsyncIOMotorDatabase = Depends(get_db),
+):
     """Fetch all reviews for a photographer"""
-    reviews = await reviews_collection.find({"photographer_id": photographer_id}).to_list(1000)
+    reviews, next_cursor = await paginate(db["reviews"], {"photographer_id": photographer_id}, None, page)
+    set_next_cursor(response, next_cursor)
+    reviewers = await loaders.users.load_many(r["user_id"] for r in reviews)
     for r in reviews:
-        reviewer = await users_collection.find_one(
-            {"id": r["user_id"]}, {"_id": 0, "full_name": 1, "email": 1}
-        )
-        r["reviewer"] = reviewer or {}
+        r["reviewer"] = pick(reviewers.get(r["user_id"]), "full_name", "email") or {}
     return reviews
 
 
 # ---------- Report Routes ----------
 @router.post("/reports", response_model=dict)
-async def submit_report(report: ReportSchema):
+async def submit_report(report: ReportSchema, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Report a photographer (dropdown reason + optional comment)"""
     if report.reason not in REPORT_REASONS:
         raise HTTPException(status_code=400, detail="Invalid report reason")
@@ -165,7 +176,8 @@ async def submit_report(report: ReportSchema):
         reason=report.reason,
         description=report.description,
     )
-    await reports_collection.insert_one(new_report.model_dump())
+    await db["reports"].insert_one(new_report.model_dump())
+    await admin_stats.bump(db, pending_reports=1)
     return {"message": "Report submitted successfully"}
 
 
@@ -176,9 +188,14 @@ async def get_report_reasons():
 
 
 @router.get("/reports/pending", response_model=List[dict])
-async def get_pending_reports():
+async def get_pending_reports(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: AsyncIOMotorDatabase = Depends(get_db),
+):
     """Admin: Fetch all pending reports"""
-    pending = await reports_collection.find({"status": "pending"}).to_list(1000)
+    pending, next_cursor = await paginate(db["reports"], {"status": "pending"}, None, page)
+    set_next_cursor(response, next_cursor)
     return pending
 
 
@@ -188,6 +205,7 @@ async def moderate_report(
     report_id: str,
     action: str = Query(..., description="restrict / delete / dismiss"),
     admin_id: str = Query(..., description="Admin ID performing the action"),
+    db: AsyncIOMotorDatabase = Depends(get_db),
 ):
     """Admin reviews and takes action on a report"""
 
@@ -195,52 +213,18 @@ async def moderate_report(
     if action not in valid_actions:
         raise HTTPException(status_code=400, detail=f"Invalid action. Must be one of {valid_actions}")
 
-    report = await reports_collection.find_one({"id": report_id})
+    report = await db["reports"].find_one({"id": report_id})
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
 
     photographer_id = report["photographer_id"]
 
-    # 1️⃣ Admin deletes photographer
-    if action == "delete":
-        await users_collection.delete_one({"id": photographer_id})
-        await profiles_collection.delete_one({"user_id": photographer_id})
-        await portfolio_collection.delete_many({"photographer_id": photographer_id})
-        action_message = "Photographer permanently deleted from the platform."
-
-    # 2️⃣ Admin restricts photographer
-    elif action == "restrict":
-        reason_text = report.get("reason", "Policy violation")
-        await users_collection.update_one(
-            {"id": photographer_id},
-            {
-                "$set": {
-                    "restricted": True,
-                    "restriction_reason": reason_text,
-                    "restricted_at": datetime.now(timezone.utc),
-                }
-            },
-        )
-        action_message = f"Photographer temporarily restricted due to: {reason_text}"
-
-    # 3️⃣ Admin dismisses report
-    else:
-        action_message = "Report dismissed with no action taken."
-
-    # Update report document
-    await reports_collection.update_one(
-        {"id": report_id},
-        {
-            "$set": {
-                "status": "reviewed",
-                "admin_action": action,
-                "reviewed_by": admin_id,
-                "reviewed_at": datetime.now(timezone.utc),
-            }
-        },
-    )
-
-    # Create notification for both photographer and reporter
+    reason_text = report.get("reason", "Policy violation")
+    action_message = {
+        "delete": "Photographer permanently deleted from the platform.",
+        "restrict": f"Photographer temporarily restricted due to: {reason_text}",
+        "dismiss": "Report dismissed with no action taken.",
+    }[action]
     notification = Notification(
         report_id=report_id,
         photographer_id=photographer_id,
@@ -248,63 +232,126 @@ async def moderate_report(
         admin_action=action,
         message=action_message,
     )
-    await notifications_collection.insert_one(notification.model_dump())
 
-    return {"message": f"Report reviewed successfully: {action_message}", "notification_sent": True}
+    # The report update and the jobs carrying its side effects commit
+    # together where the deployment supports transactions
+    job = None
+    async with transaction(db) as session:
+        # 1️⃣ Admin deletes photographer: everything they own is removed by a
+        # background job (api/cascade.py), poll /api/admin/jobs/{job_id}.
+        # Marked deleted now so they are locked out before the job runs.
+        if action == "delete":
+            await db["users"].update_one(
+                {"id": photographer_id},
+                {"$set": {"deleted": True, "deleted_at": datetime.now(timezone.utc)}},
+                session=session,
+            )
+            job = await job_runner.enqueue(
+                db, CASCADE_DELETE, {"user_id": photographer_id, "keep_report_id": report_id}, session=session
+            )
+
+        # 2️⃣ Admin restricts photographer
+        elif action == "restrict":
+            await db["users"].update_one(
+                {"id": photographer_id},
+                {
+                    "$set": {
+                        "restricted": True,
+                        "restriction_reason": reason_text,
+                        "restricted_at": datetime.now(timezone.utc),
+                    }
+                },
+                session=session,
+            )
+
+        # 3️⃣ Admin dismisses report: nothing beyond the report itself
+
+        # Update report document
+        await db["reports"].update_one(
+            {"id": report_id},
+            {
+                "$set": {
+                    "status": "reviewed",
+                    "admin_action": action,
+                    "reviewed_by": admin_id,
+                    "reviewed_at": datetime.now(timezone.utc),
+                }
+            },
+            session=session,
+        )
+
+        # Notify both photographer and reporter
+        await job_runner.enqueue(db, REPORT_NOTIFICATION, {"notification": notification.model_dump()}, session=session)
+
+    job_runner.wake()
+    if action in ("restrict", "delete"):
+        invalidate_user(photographer_id)
+    # With change streams the job's insert is pushed to both parties from
+    # whichever process makes it; in local mode only this one can push it
+    broker.publish("notification", [photographer_id, report["reporter_id"]], notification.model_dump())
+    await admin_stats.bump(db, **admin_stats.status_deltas("reports", ("pending",), report.get("status"), "reviewed"))
+
+    result = {"message": f"Report reviewed successfully: {action_message}", "notification_sent": True}
+    if job:
+        result["job_id"] = job["id"]
+    return result
 
 
 # ---------- Notification Routes ----------
 @router.get("/notifications/user/{user_id}")
-async def get_user_notifications(user_id: str):
+async def get_user_notifications(
+    user_id: str,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: AsyncIOMotorDatabase = Depends(get_db),
+):
     """Fetch notifications for a reporting user"""
-    return await notifications_collection.find({"reporter_id": user_id}).to_list(1000)
+    notifications, next_cursor = await paginate(
+        db["notifications"], {"reporter_id": user_id}, None, page, sort=NOTIFICATION_SORT
+    )
+    set_next_cursor(response, next_cursor)
+    return notifications
 
 
 @router.get("/notifications/photographer/{photographer_id}")
-async def get_photographer_notifications(photographer_id: str):
+async def get_photographer_notifications(
+    photographer_id: str,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: AsyncIOMotorDatabase = Depends(get_db),
+):
     """Fetch notifications for a photographer"""
-    return await notifications_collection.find({"photographer_id": photographer_id}).to_list(1000)
+    notifications, next_cursor = await paginate(
+        db["notifications"], {"photographer_id": photographer_id}, None, page, sort=NOTIFICATION_SORT
+    )
+    set_next_cursor(response, next_cursor)
+    return notifications
 
 
 # ---------- Photographer Full Data (Safe Access) ----------
 @router.get("/photographer/full/{photographer_id}", response_model=dict)
-async def get_photographer_full_view(photographer_id: str):
+async def get_photographer_full_view(
+    photographer_id: str,
+    section_limit: int = Query(FULL_VIEW_SECTION_LIMIT, ge=1, le=100),
+    loaders: Loaders = Depends(get_loaders),
+    db: AsyncIOMotorDatabase = Depends(get_db),
+):
     """Fetch full photographer data (profile, portfolio, packages, reviews, and reports)."""
     try:
-        user = await users_collection.find_one(
-            {"id": photographer_id}, {"_id": 0, "full_name": 1, "email": 1, "role": 1}
-        )
-        profile = await profiles_collection.find_one({"user_id": photographer_id}, {"_id": 0})
-        portfolio = await portfolio_collection.find(
-            {"photographer_id": photographer_id}, {"_id": 0}
-        ).to_list(1000)
-        packages = await packages_collection.find(
-            {"photographer_id": photographer_id}, {"_id": 0}
-        ).to_list(1000)
-
-        # Reviews
-        reviews = await reviews_collection.find({"photographer_id": photographer_id}, {"_id": 0}).to_list(1000)
-        for r in reviews:
-            reviewer = await users_collection.find_one(
-                {"id": r["user_id"]}, {"_id": 0, "full_name": 1, "email": 1}
-            )
-            r["reviewer"] = reviewer or {}
-
-        # Reports
-        reports = await reports_collection.find({"photographer_id": photographer_id}, {"_id": 0}).to_list(1000)
-        for rp in reports:
-            reporter = await users_collection.find_one(
-                {"id": rp["reporter_id"]}, {"_id": 0, "full_name": 1, "email": 1}
-            )
-            rp["reporter"] = reporter or {}
+        view = await load_full_view(db, loaders, photographer_id, section_limit)
+        for r in view["reviews"]:
+            r["reviewer"] = pick(r["reviewer"], "full_name", "email") or {}
+        for rp in view["reports"]:
+            rp["reporter"] = pick(rp["reporter"], "full_name", "email") or {}
 
         return {
-            "user": user,
-            "profile": profile,
-            "portfolio": portfolio,
-            "packages": packages,
-            "reviews": reviews,
-            "reports": reports,
+            "user": pick(view["user"], "full_name", "email", "role"),
+            "profile": view["profile"],
+            "portfolio": view["portfolio"],
+            "packages": view["packages"],
+            "reviews": view["reviews"],
+            "reports": view["reports"],
+            "next_cursors": view["next_cursors"],
         }
 
     except Exception as e:
@@ -314,15 +361,20 @@ async def get_photographer_full_view(photographer_id: str):
 
 # ---------- Photographer Reports ----------
 @router.get("/reports/photographer/{photographer_id}", response_model=List[dict])
-async def get_photographer_reports(photographer_id: str):
+async def get_photographer_reports(
+    photographer_id: str,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    loaders: Loaders = Depends(get_loaders),
+    db: AsyncIOMotorDatabase = Depends(get_db),
+):
     """Fetch reports related only to this photographer"""
     try:
-        reports = await reports_collection.find({"photographer_id": photographer_id}).to_list(1000)
+        reports, next_cursor = await paginate(db["reports"], {"photographer_id": photographer_id}, None, page)
+        set_next_cursor(response, next_cursor)
+        reporters = await loaders.users.load_many(r["reporter_id"] for r in reports)
         for r in reports:
-            reporter = await users_collection.find_one(
-                {"id": r["reporter_id"]}, {"_id": 0, "full_name": 1, "email": 1}
-            )
-            r["reporter"] = reporter or {}
+            r["reporter"] = pick(reporters.get(r["reporter_id"]), "full_name", "email") or {}
         return reports
     except Exception as e:
         print("Error fetching photographer reports:", e)
@@ -0,0 +1,350 @@
+# api/search_index.py
+import asyncio
+import heapq
+import logging
+import math
+import os
+import re
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Each worker keeps its own index: writes it handles are applied immediately,
+# writes handled by other workers show up at the next periodic rebuild.
+SEARCH_INDEX_REFRESH_SECONDS = float(os.environ.get('SEARCH_INDEX_REFRESH_SECONDS', '300'))
+SEARCH_INDEX_BUILD_BATCH_SIZE = 1000
+
+# Per-field term frequency weights (a cheap BM25F)
+FIELD_WEIGHTS = {"full_name": 3.0, "specialties": 2.0, "location": 2.0, "bio": 1.0}
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Score multipliers for how a query token matched a term
+PREFIX_FACTOR = 0.8
+FUZZY_FACTOR = 0.5
+# Tokens shorter than this are never typo-matched
+FUZZY_MIN_LENGTH = 4
+# Most terms one prefix may expand to, shortest first
+MAX_PREFIX_EXPANSIONS = 32
+
+CARD_FIELDS = (
+    "user_id", "bio", "specialties", "location", "experience_years",
+    "profile_image", "cover_image", "profile_image_variants", "cover_image_variants",
+    "average_rating", "rating_count",
+)
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+def bounded_levenshtein(a: str, b: str, limit: int) -> Optional[int]:
+    """Edit distance between a and b counting an adjacent swap as one edit
+    (optimal string alignment), or None as soon as it must exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return None
+    before: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit and (i == len(a) or min(previous) > limit):
+            return None
+        before, previous = previous, current
+    return previous[-1] if previous[-1] <= limit else None
+
+
+def _deletes(term: str) -> Iterable[str]:
+    return (term[:i] + term[i + 1:] for i in range(len(term)))
+
+
+class SearchIndex:
+    """Inverted index over approved photographer profiles for type-ahead.
+
+    Query tokens match terms exactly, by prefix (bisect over the sorted
+    vocabulary) and within one edit (symmetric-delete lookup verified with a
+    bounded Levenshtein). Every query token must match; hits are ranked with
+    BM25 over field-weighted term frequencies.
+
+    Each term keeps its postings both as a dict (random access) and as a list
+    sorted by BM25 impact, so a query walks the lists best-first and stops as
+    soon as nothing further down can reach the top `limit` (Fagin's threshold
+    algorithm) instead of scoring every posting. Impacts use the
+    average document length of the last full build, which keeps them stable
+    under incremental updates.
+    """
+
+    def __init__(self, reference_length: float = 0.0):
+        self.reference_length = reference_length
+        self.postings: Dict[str, Dict[str, float]] = {}
+        self.impacts: Dict[str, List[Tuple[float, str]]] = {}
+        self.vocabulary: List[str] = []
+        self.variants: Dict[str, Set[str]] = defaultdict(set)
+        self.doc_terms: Dict[str, Dict[str, float]] = {}
+        self.cards: Dict[str, dict] = {}
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    # ---------- writes ----------
+
+    @staticmethod
+    def _prepare(profile: dict, full_name: Optional[str] = None) -> Tuple[str, Dict[str, float], dict]:
+        """Weighted term frequencies and listing card for one profile."""
+        user_id = profile["user_id"]
+        full_name = full_name if full_name is not None else profile.get("full_name", "")
+        fields = {
+            "full_name": full_name,
+            "specialties": " ".join(profile.get("specialties") or []),
+            "location": profile.get("location", ""),
+            "bio": profile.get("bio", ""),
+        }
+        terms: Dict[str, float] = defaultdict(float)
+        for field, text in fields.items():
+            for token in tokenize(text):
+                terms[token] += FIELD_WEIGHTS[field]
+        card = {
+            "profile": {field: profile.get(field) for field in CARD_FIELDS},
+            "user": {"id": user_id, "full_name": full_name},
+        }
+        return user_id, terms, card
+
+    def _impact(self, tf: float, length: float) -> float:
+        reference = self.reference_length or length
+        return tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / reference))
+
+    def _add_term(self, term: str) -> None:
+        self.postings[term] = {}
+        self.impacts[term] = []
+        insort(self.vocabulary, term)
+        for variant in _deletes(term):
+            self.variants[variant].add(term)
+
+    def _insert(self, user_id: str, terms: Dict[str, float], card: dict, keep_sorted: bool = True) -> None:
+        length = sum(terms.values())
+        impacts = {term: self._impact(tf, length) for term, tf in terms.items()}
+        for term, impact in impacts.items():
+            if term not in self.postings:
+                self._add_term(term)
+            self.postings[term][user_id] = impact
+            if keep_sorted:
+                insort(self.impacts[term], (-impact, user_id))
+            else:
+                self.impacts[term].append((-impact, user_id))
+        self.doc_terms[user_id] = impacts
+        self.cards[user_id] = card
+
+    def upsert(self, profile: dict, full_name: Optional[str] = None) -> None:
+        """Index a profile document, or drop it if it is not approved."""
+        self.remove(profile["user_id"])
+        if profile.get("approval_status") == "approved":
+            self._insert(*self._prepare(profile, full_name))
+
+    def remove(self, user_id: str) -> None:
+        impacts = self.doc_terms.pop(user_id, None)
+        if impacts is None:
+            return
+        for term, impact in impacts.items():
+            del self.postings[term][user_id]
+            ordered = self.impacts[term]
+            del ordered[bisect_left(ordered, (-impact, user_id))]
+            if not ordered:
+                del self.postings[term]
+                del self.impacts[term]
+                del self.vocabulary[bisect_left(self.vocabulary, term)]
+                for variant in _deletes(term):
+                    self.variants[variant].discard(term)
+                    if not self.variants[variant]:
+                        del self.variants[variant]
+        del self.cards[user_id]
+
+    # ---------- reads ----------
+
+    def _expand(self, token: str) -> Dict[str, float]:
+        """Vocabulary terms a query token stands for, with their match factor."""
+        matches: Dict[str, float] = {}
+        start = bisect_left(self.vocabulary, token)
+        for term in self.vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(token):
+                break
+            matches[term] = 1.0 if term == token else PREFIX_FACTOR
+
+        if len(token) >= FUZZY_MIN_LENGTH:
+            candidates = set(self.variants.get(token, ()))
+            for variant in _deletes(token):
+                if variant in self.postings:
+                    candidates.add(variant)
+                candidates |= self.variants.get(variant, set())
+            for term in candidates:
+                if term not in matches and bounded_levenshtein(token, term, 1) is not None:
+                    matches[term] = FUZZY_FACTOR
+        return matches
+
+    def _weighted_terms(self, token: str) -> List[Tuple[float, str]]:
+        """(factor * idf, term) for every term a query token expands to."""
+        n = len(self.cards)
+        weighted = []
+        for term, factor in self._expand(token).items():
+            df = len(self.postings[term])
+            weighted.append((factor * math.log(1 + (n - df + 0.5) / (df + 0.5)), term))
+        return weighted
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or not self.cards:
+            return []
+
+        groups = [self._weighted_terms(token) for token in tokens]
+        if not all(groups):
+            return []
+
+        def scaled(weight, term):
+            return ((negative * weight, user_id) for negative, user_id in self.impacts[term])
+
+        # One best-first stream per query token, walked round-robin. A document
+        # first seen on any stream is scored in full by random access; once the
+        # sum of every stream's current frontier cannot beat the k-th best
+        # score, no unseen document can either.
+        streams = [
+            scaled(*group[0]) if len(group) == 1 else heapq.merge(*(scaled(weight, term) for weight, term in group))
+            for group in groups
+        ]
+        frontier = [max(weight * -self.impacts[term][0][0] for weight, term in group) for group in groups]
+        # Random access checks the rarest token first, it rejects the most
+        lookups = sorted(
+            ([(weight, self.postings[term]) for weight, term in group] for group in groups),
+            key=lambda lookup: sum(len(postings) for _, postings in lookup),
+        )
+        top: List[Tuple[float, str]] = []
+        seen: Set[str] = set()
+        while True:
+            for i, stream in enumerate(streams):
+                entry = next(stream, None)
+                if entry is None:
+                    # every document holding this token has been seen
+                    return [self.cards[user_id] for _, user_id in sorted(top, reverse=True)]
+                negative, user_id = entry
+                frontier[i] = -negative
+                if user_id in seen:
+                    continue
+                seen.add(user_id)
+                score = 0.0
+                for lookup in lookups:
+                    if len(lookup) == 1:
+                        best = lookup[0][0] * lookup[0][1].get(user_id, 0.0)
+                    else:
+                        best = max(weight * postings.get(user_id, 0.0) for weight, postings in lookup)
+                    if not best:
+                        break
+                    score += best
+                else:
+                    if len(top) < limit:
+                        heapq.heappush(top, (score, user_id))
+                    elif (score, user_id) > top[0]:
+                        heapq.heapreplace(top, (score, user_id))
+            if len(top) >= limit and sum(frontier) <= top[0][0]:
+                return [self.cards[user_id] for _, user_id in sorted(top, reverse=True)]
+
+    # ---------- bulk load ----------
+
+    @classmethod
+    def from_prepared(cls, prepared: List[Tuple[str, Dict[str, float], dict]]) -> "SearchIndex":
+        lengths = [sum(terms.values()) for _, terms, _ in prepared]
+        index = cls(reference_length=sum(lengths) / len(lengths) if lengths else 0.0)
+        for user_id, terms, card in prepared:
+            index._insert(user_id, terms, card, keep_sorted=False)
+        for ordered in index.impacts.values():
+            ordered.sort()
+        return index
+
+    @classmethod
+    def from_profiles(cls, profiles: Iterable[dict]) -> "SearchIndex":
+        return cls.from_prepared([
+            cls._prepare(p) for p in profiles if p.get("approval_status") == "approved"
+        ])
+
+    @classmethod
+    async def build(cls, db) -> "SearchIndex":
+        """Index every approved profile, yielding to the event loop between batches."""
+        prepared = []
+        cursor = db.photographer_profiles.find({"approval_status": "approved"}, {"_id": 0})
+        while True:
+            batch = await cursor.to_list(SEARCH_INDEX_BUILD_BATCH_SIZE)
+            if not batch:
+                break
+            missing = [p["user_id"] for p in batch if "full_name" not in p]
+            names = {}
+            if missing:
+                users = await db.users.find({"id": {"$in": missing}}, {"_id": 0, "id": 1, "full_name": 1}).to_list(len(missing))
+                names = {u["id"]: u.get("full_name", "") for u in users}
+            prepared.extend(cls._prepare(profile, names.get(profile["user_id"])) for profile in batch)
+            await asyncio.sleep(0)
+        # Seconds of pure Python at 100k profiles; off the loop thread it at
+        # least has to give the GIL back every switch interval
+        return await asyncio.to_thread(cls.from_prepared, prepared)
+
+
+class SearchIndexHolder:
+    """Process-wide handle so a rebuilt index can be swapped in atomically."""
+
+    def __init__(self):
+        self.index = SearchIndex()
+        self._task: Optional[asyncio.Task] = None
+        # Writes seen while a rebuild is reading the collection, replayed on
+        # the new index before it is swapped in
+        self._journal: Optional[list] = None
+
+    async def rebuild(self, db) -> None:
+        self._journal = []
+        try:
+            index = await SearchIndex.build(db)
+            for method, args in self._journal:
+                getattr(index, method)(*args)
+            self.index = index
+        finally:
+            self._journal = None
+
+    def upsert(self, profile: dict, full_name: Optional[str] = None) -> None:
+        self.index.upsert(profile, full_name)
+        if self._journal is not None:
+            self._journal.append(("upsert", (profile, full_name)))
+
+    def remove(self, user_id: str) -> None:
+        self.index.remove(user_id)
+        if self._journal is not None:
+            self._journal.append(("remove", (user_id,)))
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        return self.index.search(query, limit)
+
+    async def _refresh_forever(self, db) -> None:
+        while True:
+            await asyncio.sleep(SEARCH_INDEX_REFRESH_SECONDS)
+            try:
+                await self.rebuild(db)
+            except Exception:
+                logger.exception("Search index rebuild failed")
+
+    async def start(self, db) -> None:
+        await self.rebuild(db)
+        if SEARCH_INDEX_REFRESH_SECONDS > 0:
+            self._task = asyncio.create_task(self._refresh_forever(db))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+search_index = SearchIndexHolder()
@@ -0,0 +1,34 @@
+# api/serialization.py
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Type
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def dump_list(model: Type[BaseModel], docs: Iterable[Dict[str, Any]]) -> bytes:
+    """Validate raw documents against `model` once and encode them to JSON.
+
+    Both steps run in pydantic-core: ISO date strings are parsed during
+    validation, so callers need no fromisoformat pass, and the encoding skips
+    jsonable_encoder entirely.
+    """
+    adapter = list_adapter(model)
+    return adapter.dump_json(adapter.validate_python(list(docs)))
+
+
+def list_response(model: Type[BaseModel], docs: Iterable[Dict[str, Any]], headers: Optional[Dict[str, str]] = None) -> Response:
+    """A ready JSON response for a list endpoint.
+
+    FastAPI passes a returned Response through untouched, so keep the
+    route's response_model for the schema only; headers set on an injected
+    `response` are not merged in and must be passed here.
+    """
+    return Response(dump_list(model, docs), media_type=JSON_MEDIA_TYPE, headers=headers)
@@ -0,0 +1,96 @@
+# api/timestamps.py
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from pymongo import UpdateOne
+
+# Timestamps are stored as native BSON dates (UTC) and the client is tz_aware,
+# so reads hand back aware datetimes. Older documents written by server.py
+# hold isoformat() strings instead; migrate_timestamps converts them.
+TIMESTAMP_FIELDS = {
+    "users": ("created_at", "restricted_at"),
+    "photographer_profiles": ("created_at",),
+    "portfolio_items": ("created_at",),
+    "packages": ("created_at",),
+    "bookings": ("created_at",),
+    "reviews": ("created_at",),
+    "reports": ("created_at", "reviewed_at"),
+    "notifications": ("timestamp",),
+    "media": ("created_at",),
+}
+
+# Progress of each (collection, field) pass, so an interrupted run resumes
+MIGRATIONS_COLLECTION = "migrations"
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """An ISO 8601 string as an aware UTC datetime; naive strings are taken as UTC."""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+async def migrate_field(db, collection: str, field: str, batch_size: int = 500, pause: float = 0.0, restart: bool = False) -> Tuple[int, int]:
+    """Convert string values of one field to dates, in _id order and in batches.
+
+    Each update is conditional on the field still holding the string that was
+    read, so it is safe while the application keeps writing. The last _id
+    handled is checkpointed after every batch. Returns (converted, unparseable).
+    """
+    key = f"timestamps:{collection}.{field}"
+    checkpoint = None if restart else await db[MIGRATIONS_COLLECTION].find_one({"_id": key})
+    last_id = checkpoint.get("last_id") if checkpoint else None
+    converted = checkpoint.get("converted", 0) if checkpoint else 0
+    unparseable = checkpoint.get("unparseable", 0) if checkpoint else 0
+
+    while True:
+        query: Dict[str, Any] = {field: {"$type": "string"}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        batch = await db[collection].find(query, {field: 1}).sort([("_id", 1)]).limit(batch_size).to_list(None)
+        if not batch:
+            break
+        ops = []
+        for doc in batch:
+            parsed = parse_timestamp(doc[field])
+            if parsed is None:
+                unparseable += 1
+                continue
+            ops.append(UpdateOne({"_id": doc["_id"], field: doc[field]}, {"$set": {field: parsed}}))
+        if ops:
+            result = await db[collection].bulk_write(ops, ordered=False)
+            converted += result.modified_count
+        last_id = batch[-1]["_id"]
+        await db[MIGRATIONS_COLLECTION].update_one(
+            {"_id": key},
+            {"$set": {"last_id": last_id, "converted": converted, "unparseable": unparseable,
+                      "updated_at": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+        if pause:
+            # leave room for application traffic between batches
+            await asyncio.sleep(pause)
+    return converted, unparseable
+
+
+async def migrate_timestamps(
+    db,
+    batch_size: int = 500,
+    pause: float = 0.0,
+    restart: bool = False,
+    report: Optional[Callable[[str, str, int, int], None]] = None,
+) -> Dict[str, Tuple[int, int]]:
+    """Run migrate_field over every TIMESTAMP_FIELDS entry; {"collection.field": (converted, unparseable)}."""
+    results = {}
+    for collection, fields in TIMESTAMP_FIELDS.items():
+        for field in fields:
+            converted, unparseable = await migrate_field(db, collection, field, batch_size, pause, restart)
+            results[f"{collection}.{field}"] = (converted, unparseable)
+            if report:
+                report(collection, field, converted, unparseable)
+    return results
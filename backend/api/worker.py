@@ -0,0 +1,57 @@
+"""Standalone job worker: runs the outbox (api/jobs.py) outside the API process.
+
+Usage (from backend/):
+    python -m api.worker [--workers N]
+
+Run the API with JOB_WORKERS=0 to leave every job to these processes, or
+keep both; leases make sure each job runs in one place at a time. Per-type
+concurrency limits (e.g. one cascade delete at a time) hold per process, so
+each worker process adds its own allowance. Job handlers publish no SSE
+events themselves; change streams pick up their writes (replica set), and
+on a standalone server the API publishes from the request.
+"""
+import argparse
+import asyncio
+import logging
+import signal
+import sys
+
+from api import database
+from api.jobs import JOB_WORKERS, job_runner
+
+# Registering handlers is a side effect of importing their modules
+import api.cascade  # noqa: F401
+import api.job_handlers  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+
+async def run(workers: int) -> None:
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    job_runner.start(database.get_db(), workers)
+    logger.info("Job worker %s running %s tasks for %s", job_runner.worker_id, workers, sorted(job_runner.types))
+    await stopping.wait()
+    # in-flight jobs are cancelled; their leases lapse and another worker takes them
+    await job_runner.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=JOB_WORKERS or 4, help="concurrent jobs in this process")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    database.connect()
+    try:
+        asyncio.run(run(args.workers))
+    finally:
+        database.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
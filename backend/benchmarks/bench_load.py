@@ -0,0 +1,279 @@
+"""Load test: concurrent HTTP clients against the real app on seeded data.
+
+Seeds --db with benchmarks.seed (unless --no-seed), then runs each scenario
+with --concurrency clients until --requests operations have completed:
+
+  directory             the public browse path: listing page, then one
+                        photographer's profile, portfolio, packages, reviews
+  photographer_dashboard  what PhotographerDashboard loads, in parallel
+  user_dashboard        what UserDashboard loads, in parallel
+  login_burst           POST /api/auth/login (bcrypt bound)
+  admin_listings        the admin dashboard lists and counters
+
+By default the app runs in this process behind httpx's ASGI transport, with
+DEBUG on so every response reports its MongoDB command count; client and
+server then share one event loop, so compare such runs with each other,
+not with production numbers. --base-url targets a running server instead
+(start it with DEBUG=1 for query counts, same SECRET_KEY for the tokens).
+
+Usage (from backend/):
+    python -m benchmarks.bench_load --concurrency 16 --requests 300 --out before.json
+    python -m benchmarks.bench_load --no-seed --out after.json --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from api import metrics
+from benchmarks.seed import ADMIN_EMAIL, PASSWORD, add_volume_arguments, check_target, seed, volumes_from
+
+QUERY_COUNT_HEADER = "x-db-query-count"
+
+# A scenario issues one operation: one or more requests, awaited together
+Operation = Callable[[httpx.AsyncClient, "Context", random.Random], Awaitable[List[httpx.Response]]]
+
+
+class Context:
+    """Ids and tokens the scenarios draw from, loaded from the seeded database."""
+
+    def __init__(self, db, create_token):
+        self.db = db
+        self.create_token = create_token
+        self.approved: List[str] = []
+        self.photographers: List[dict] = []
+        self.customers: List[dict] = []
+        self.admin: Optional[dict] = None
+
+    async def load(self) -> "Context":
+        self.approved = await self.db.photographer_profiles.distinct("user_id", {"approval_status": "approved"})
+        users = await self.db.users.find({}, {"_id": 0, "id": 1, "email": 1, "role": 1}).to_list(None)
+        self.photographers = [u for u in users if u["role"] == "photographer" and u["id"] in set(self.approved)]
+        self.customers = [u for u in users if u["role"] == "user"]
+        self.admin = next((u for u in users if u["email"] == ADMIN_EMAIL), None)
+        if not (self.approved and self.customers and self.admin):
+            raise SystemExit("The database holds no seeded data; run without --no-seed first")
+        return self
+
+    def auth(self, user: dict) -> dict:
+        return {"Authorization": f"Bearer {self.create_token({'sub': user['id'], 'role': user['role']})}"}
+
+
+def _gather(client: httpx.AsyncClient, *requests) -> Awaitable[List[httpx.Response]]:
+    return asyncio.gather(*(client.request(method, url, **kwargs) for method, url, kwargs in requests))
+
+
+async def directory(client, ctx: Context, rng: random.Random):
+    listing = await client.get("/api/photographers", params={"limit": 20})
+    photographer_id = rng.choice(ctx.approved)
+    detail = await _gather(
+        client,
+        ("GET", f"/api/photographer/profile/{photographer_id}", {}),
+        ("GET", f"/api/portfolio/photographer/{photographer_id}", {}),
+        ("GET", f"/api/packages/photographer/{photographer_id}", {}),
+        ("GET", f"/api/reviews/{photographer_id}", {}),
+    )
+    return [listing, *detail]
+
+
+async def photographer_dashboard(client, ctx: Context, rng: random.Random):
+    user = rng.choice(ctx.photographers)
+    headers = ctx.auth(user)
+    return await _gather(
+        client,
+        ("GET", "/api/photographer/profile/me", {"headers": headers}),
+        ("GET", "/api/portfolio/my", {"headers": headers}),
+        ("GET", "/api/packages/my", {"headers": headers}),
+        ("GET", "/api/bookings/my", {"headers": headers}),
+        ("GET", f"/api/notifications/photographer/{user['id']}", {}),
+    )
+
+
+async def user_dashboard(client, ctx: Context, rng: random.Random):
+    user = rng.choice(ctx.customers)
+    return await _gather(
+        client,
+        ("GET", "/api/photographers", {"params": {"limit": 20}}),
+        ("GET", "/api/bookings/my", {"headers": ctx.auth(user)}),
+        ("GET", f"/api/notifications/user/{user['id']}", {}),
+    )
+
+
+async def login_burst(client, ctx: Context, rng: random.Random):
+    user = rng.choice(ctx.customers)
+    return [await client.post("/api/auth/login", json={"email": user["email"], "password": PASSWORD})]
+
+
+async def admin_listings(client, ctx: Context, rng: random.Random):
+    headers = ctx.auth(ctx.admin)
+    return await _gather(
+        client,
+        ("GET", "/api/admin/stats", {"headers": headers}),
+        ("GET", "/api/admin/photographers/pending", {"headers": headers}),
+        ("GET", "/api/admin/bookings", {"headers": headers}),
+        ("GET", "/api/admin/users", {"headers": headers}),
+        ("GET", "/api/admin/reports/pending", {"headers": headers}),
+        ("GET", "/api/admin/reviews", {"headers": headers}),
+    )
+
+
+SCENARIOS: Dict[str, Operation] = {
+    "directory": directory,
+    "photographer_dashboard": photographer_dashboard,
+    "user_dashboard": user_dashboard,
+    "login_burst": login_burst,
+    "admin_listings": admin_listings,
+}
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if len(values) < 2:
+        value = values[0] if values else 0.0
+        return {"p50": value, "p95": value, "p99": value}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {"p50": round(cuts[49], 2), "p95": round(cuts[94], 2), "p99": round(cuts[98], 2)}
+
+
+async def run_scenario(client, ctx: Context, operation: Operation, requests: int, concurrency: int,
+                       warmup: int, seed_value: int) -> dict:
+    rng = random.Random(seed_value)
+    for _ in range(warmup):
+        await operation(client, ctx, rng)
+
+    latencies: List[float] = []
+    query_counts: List[int] = []
+    statuses: Dict[str, int] = {}
+    remaining = requests
+
+    async def client_loop():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            responses = await operation(client, ctx, rng)
+            latencies.append((time.perf_counter() - start) * 1000)
+            counts = [r.headers.get(QUERY_COUNT_HEADER) for r in responses]
+            if all(c is not None for c in counts):
+                query_counts.append(sum(int(c) for c in counts))
+            for r in responses:
+                statuses[str(r.status_code)] = statuses.get(str(r.status_code), 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "operations": len(latencies),
+        "seconds": round(elapsed, 3),
+        "throughput_ops": round(len(latencies) / elapsed, 1),
+        "latency_ms": percentiles(latencies),
+        # None when the server does not send X-DB-Query-Count (DEBUG off)
+        "db_commands_per_op": round(statistics.mean(query_counts), 1) if query_counts else None,
+        "statuses": statuses,
+    }
+
+
+def compare(previous: dict, current: dict) -> Dict[str, dict]:
+    """Per-scenario change against an earlier report; negative latency deltas are improvements."""
+    changes = {}
+    for name, now in current["scenarios"].items():
+        before = previous.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        changes[name] = {
+            f"{p}_ms_delta": round(now["latency_ms"][p] - before["latency_ms"][p], 2) for p in ("p50", "p95", "p99")
+        }
+        changes[name]["throughput_ratio"] = round(now["throughput_ops"] / before["throughput_ops"], 2)
+        if now["db_commands_per_op"] is not None and before.get("db_commands_per_op") is not None:
+            changes[name]["db_commands_delta"] = round(now["db_commands_per_op"] - before["db_commands_per_op"], 1)
+    return changes
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args, report: dict) -> None:
+    # imported late so the settings main() made are in place first
+    import server
+    from api import database
+
+    database.connect()
+    db = database.client[args.db]
+    try:
+        if not args.no_seed:
+            report["documents"] = await seed(db, volumes_from(args), args.seed)
+        ctx = await Context(db, server.create_access_token).load()
+
+        if args.base_url:
+            client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+            lifespan = None
+        else:
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://bench", timeout=60)
+            lifespan = server.lifespan(server.app)
+            await lifespan.__aenter__()
+        try:
+            async with client:
+                for name in args.scenarios:
+                    report["scenarios"][name] = await run_scenario(
+                        client, ctx, SCENARIOS[name], args.requests, args.concurrency, args.warmup, args.seed,
+                    )
+        finally:
+            if lifespan is not None:
+                await lifespan.__aexit__(None, None, None)
+    finally:
+        database.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_volume_arguments(parser)
+    parser.add_argument("--no-seed", action="store_true", help="reuse the data already in --db")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients per scenario")
+    parser.add_argument("--requests", type=int, default=300, help="operations per scenario")
+    parser.add_argument("--warmup", type=int, default=10, help="untimed operations before each scenario")
+    parser.add_argument("--base-url", help="benchmark a running server instead of the app in-process")
+    parser.add_argument("--out", help="also write the JSON report here")
+    parser.add_argument("--compare", help="earlier report to diff against")
+    args = parser.parse_args(argv)
+    check_target(parser, args)
+
+    # the app reads DB_NAME per request; DEBUG turns on X-DB-Query-Count
+    os.environ['DB_NAME'] = args.db
+    metrics.DEBUG = True
+
+    report = {
+        "revision": git_revision(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "target": args.base_url or "in-process",
+        "volumes": volumes_from(args),
+        "seed": args.seed,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "scenarios": {},
+    }
+    asyncio.run(run(args, report))
+    if args.compare:
+        with open(args.compare) as f:
+            report["compared_to"] = {"file": args.compare, "changes": compare(json.load(f), report)}
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Event-loop latency under a burst of concurrent logins, before and after.
+
+"before" verifies bcrypt inline in the coroutine, as login used to;
+"after" goes through api.passwords.password_hasher. A ticker coroutine
+measures how late the loop wakes it up while the logins run.
+
+Usage (from backend/):
+    python -m benchmarks.bench_password_hashing --logins 32 --rounds 12
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from api import passwords
+
+TICK_SECONDS = 0.005
+
+
+async def _ticker(stop: asyncio.Event, lags: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append((time.perf_counter() - start - TICK_SECONDS) * 1000)
+
+
+async def _inline_login(password, hashed):
+    return passwords.pwd_context.verify(password, hashed)
+
+
+async def _pooled_login(password, hashed):
+    return await passwords.password_hasher.verify(password, hashed)
+
+
+async def _run(mode: str, logins: int, hashed: str) -> dict:
+    login = _inline_login if mode == "before" else _pooled_login
+    lags: list = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(stop, lags))
+    await asyncio.sleep(TICK_SECONDS * 2)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(login("correct horse", hashed) for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await ticker
+    lags.sort()
+    return {
+        "mode": mode,
+        "logins": logins,
+        "wall_seconds": round(elapsed, 3),
+        "loop_lag_ms_p50": round(statistics.median(lags), 2),
+        "loop_lag_ms_p99": round(lags[min(len(lags) - 1, int(len(lags) * 0.99))], 2),
+        "loop_lag_ms_max": round(lags[-1], 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=passwords.BCRYPT_ROUNDS)
+    args = parser.parse_args(argv)
+
+    hashed = passwords.pwd_context.hash("correct horse", rounds=args.rounds)
+    results = [asyncio.run(_run(mode, args.logins, hashed)) for mode in ("before", "after")]
+    passwords.password_hasher.shutdown()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
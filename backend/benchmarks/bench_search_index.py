@@ -0,0 +1,81 @@
+"""Type-ahead query latency of api.search_index at directory scale.
+
+Builds an index over synthetic approved profiles (names, specialties,
+cities and bios drawn from small vocabularies, like the real directory)
+and times a mix of exact, prefix, typo and multi-word queries.
+
+Usage (from backend/):
+    python -m benchmarks.bench_search_index --profiles 100000
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+from api.search_index import SearchIndex
+
+FIRST_NAMES = ["asha", "ben", "chitra", "dev", "esha", "farhan", "gita", "harish", "isha", "jai",
+               "kavya", "lokesh", "meera", "nikhil", "omkar", "priya", "rahul", "sana", "tara", "vikram"]
+LAST_NAMES = ["rao", "das", "iyer", "shah", "patel", "mehta", "khan", "nair", "joshi", "singh",
+              "kapoor", "menon", "reddy", "gupta", "bose", "verma", "pillai", "sethi", "malik", "roy"]
+SPECIALTIES = ["Wedding", "Portrait", "Fashion", "Event", "Product", "Wildlife", "Food", "Travel", "Newborn", "Sports"]
+CITIES = ["Pune", "Mumbai", "Delhi", "Bengaluru", "Chennai", "Hyderabad", "Kolkata", "Jaipur", "Goa", "Kochi",
+          "Ahmedabad", "Lucknow", "Indore", "Chandigarh", "Mysuru", "Nagpur", "Surat", "Bhopal", "Udaipur", "Shimla"]
+BIO_WORDS = ["candid", "storyteller", "natural", "light", "moments", "studio", "outdoor", "cinematic", "award",
+             "winning", "documentary", "editorial", "timeless", "vibrant", "creative", "passionate", "drone",
+             "aerial", "destination", "intimate", "colour", "film", "digital", "classic", "modern"]
+
+QUERIES = ["kariton", "karitn", "wedding", "wed", "weddign", "pune", "pu", "portrait mumbai", "candid wed pune",
+           "priya", "pri", "priay", "vikram singh", "drone goa", "cinematic", "cinem", "newborn studio"]
+
+
+def _profiles(n: int, seed: int):
+    rng = random.Random(seed)
+    # Studio names and the like, so the vocabulary is not just the lists above
+    syllables = ["ka", "ri", "to", "mu", "sa", "ne", "lo", "vi", "da", "pe", "zo", "ha", "ju", "bo", "fi"]
+    rare_words = ["".join(rng.choices(syllables, k=rng.randint(2, 4))) for _ in range(20_000)]
+    for i in range(n):
+        yield {
+            "user_id": f"user-{i}",
+            "full_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}".title(),
+            "specialties": rng.sample(SPECIALTIES, rng.randint(1, 3)),
+            "location": rng.choice(CITIES),
+            "bio": " ".join(rng.choices(BIO_WORDS, k=rng.randint(8, 25)) + rng.choices(rare_words, k=2)),
+            "experience_years": rng.randint(0, 25),
+            "approval_status": "approved",
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    index = SearchIndex.from_profiles(_profiles(args.profiles, args.seed))
+    build_seconds = time.perf_counter() - start
+
+    timings = {q: [] for q in QUERIES}
+    for _ in range(args.repeat):
+        for q in QUERIES:
+            start = time.perf_counter()
+            index.search(q, 10)
+            timings[q].append((time.perf_counter() - start) * 1000)
+
+    every = sorted(t for ts in timings.values() for t in ts)
+    print(json.dumps({
+        "profiles": len(index),
+        "vocabulary": len(index.vocabulary),
+        "build_seconds": round(build_seconds, 2),
+        "query_ms_p50": round(statistics.median(every), 3),
+        "query_ms_p95": round(every[int(len(every) * 0.95)], 3),
+        "query_ms_max": round(every[-1], 3),
+        "per_query_ms_p50": {q: round(statistics.median(ts), 3) for q, ts in timings.items()},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Per-item cost of turning a page of Mongo documents into a JSON body.
+
+Compares, for 1000-item list responses:
+  legacy    fromisoformat pass, Model(**doc) per item, FastAPI's
+            response_model re-validation, jsonable_encoder + json.dumps
+  orjson    the same, rendered with ORJSONResponse (the new default class)
+  adapter   api.serialization.dump_list: one TypeAdapter validate + dump_json
+
+Usage (from backend/):
+    python -m benchmarks.bench_serialization --items 1000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from api.serialization import dump_list
+from server import Package, PortfolioItem, User
+
+
+def _docs(model, n: int):
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for i in range(n):
+        created = (start + timedelta(minutes=i)).isoformat()
+        if model is PortfolioItem:
+            yield {"id": f"item-{i}", "photographer_id": "p1", "category": "Wedding", "title": f"Shot {i}",
+                   "description": "Golden hour portraits by the lake, " * 3, "image_url": f"https://img.example/{i}.jpg",
+                   "created_at": created}
+        elif model is Package:
+            yield {"id": f"pkg-{i}", "photographer_id": "p1", "name": f"Package {i}", "type": "custom",
+                   "category": "Wedding", "description": "Full coverage with edits", "price": 15000.0 + i,
+                   "duration": "Full day", "deliverables": ["300 photos", "Album", "Drone"], "created_at": created}
+        else:
+            yield {"id": f"user-{i}", "email": f"user{i}@example.com", "full_name": f"User {i}", "role": "user",
+                   "created_at": created}
+
+
+def _legacy(model, docs, response_class):
+    field = create_response_field("Response", List[model])
+    for doc in docs:
+        if isinstance(doc.get("created_at"), str):
+            doc["created_at"] = datetime.fromisoformat(doc["created_at"])
+    items = [model(**doc) for doc in docs]
+    content = asyncio.run(serialize_response(field=field, response_content=items))
+    return response_class(content).body
+
+
+PATHS = {
+    "legacy": lambda model, docs: _legacy(model, docs, JSONResponse),
+    "orjson": lambda model, docs: _legacy(model, docs, ORJSONResponse),
+    "adapter": dump_list,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args(argv)
+
+    report = {"items": args.items, "per_item_us_p50": {}}
+    for model in (PortfolioItem, Package, User):
+        source = list(_docs(model, args.items))
+        bodies = {}
+        results = {}
+        for name, path in PATHS.items():
+            timings = []
+            for _ in range(args.repeat):
+                docs = [dict(d) for d in source]  # legacy mutates in place, like the endpoints did
+                start = time.perf_counter()
+                bodies[name] = path(model, docs)
+                timings.append((time.perf_counter() - start) * 1e6 / args.items)
+            results[name] = round(statistics.median(timings), 2)
+        # same items whatever the path; only the datetime spelling differs
+        assert len(json.loads(bodies["adapter"])) == len(json.loads(bodies["legacy"])) == args.items
+        results["speedup_vs_legacy"] = round(results["legacy"] / results["adapter"], 1)
+        report["per_item_us_p50"][model.__name__] = results
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""Seed a database with synthetic, reproducible data for the load benchmarks.
+
+Every collection the endpoints read is filled with bulk insert_many calls,
+then the derived state is rebuilt the way manage.py would: rating
+aggregates, booking calendars and the admin counters. The same --seed
+always produces the same documents, so reports from different commits
+compare like with like.
+
+Usage (from backend/; the database is dropped first):
+    python -m benchmarks.seed --db photographer_bench --users 2000 --photographers 400
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List
+
+from api import admin_stats, database
+from api.booking_calendar import BOOKING_DEFAULT_TIMEZONE, booking_window, parse_duration, rebuild_calendars
+from api.geo import gazetteer
+from api.indexes import ensure_indexes
+from api.passwords import pwd_context
+from api.photographer_search import search_fields
+from api.ratings import backfill_rating_aggregates
+from api.reviews_ratings import REPORT_REASONS
+
+# Every seeded account logs in with this password
+PASSWORD = "bench-password"
+ADMIN_EMAIL = "admin@bench.example"
+INSERT_BATCH_SIZE = 1000
+
+DEFAULT_VOLUMES = {
+    "users": 2000,
+    "photographers": 400,
+    "pending_ratio": 0.2,
+    "portfolio_per_photographer": 12,
+    "packages_per_photographer": 4,
+    "bookings": 5000,
+    "reviews": 4000,
+    "reports": 200,
+}
+
+CATEGORIES = ["Wedding", "Portrait", "Event", "Commercial", "Nature", "Fashion"]
+DURATIONS = ["2 hours", "4 hours", "Half day", "Full day"]
+BOOKING_STATUSES = ["pending", "approved", "approved", "rejected", "cancelled"]
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def user_email(role: str, n: int) -> str:
+    return f"{role}{n}@bench.example"
+
+
+def build_dataset(volumes: Dict[str, float], seed: int = 1, password_hash: str = "") -> Dict[str, List[dict]]:
+    """All documents to insert, by collection; deterministic for a given seed."""
+    rng = random.Random(seed)
+    # sorted, so the seed alone decides which city each profile gets
+    cities = sorted(name.title() for name in gazetteer())
+
+    def new_id() -> str:
+        return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+    def created(n: int) -> datetime:
+        return EPOCH + timedelta(minutes=n)
+
+    data: Dict[str, List[dict]] = {name: [] for name in (
+        "users", "photographer_profiles", "portfolio_items", "packages", "bookings", "reviews", "reports",
+    )}
+    users = data["users"]
+    users.append({"id": new_id(), "email": ADMIN_EMAIL, "full_name": "Bench Admin", "role": "admin",
+                  "created_at": EPOCH, "password": password_hash})
+    for n in range(int(volumes["users"])):
+        users.append({"id": new_id(), "email": user_email("user", n), "full_name": f"User {n}", "role": "user",
+                      "created_at": created(n), "password": password_hash})
+    customers = [u["id"] for u in users if u["role"] == "user"]
+
+    approved: List[str] = []
+    packages_by_photographer: Dict[str, List[dict]] = {}
+    for n in range(int(volumes["photographers"])):
+        user_id = new_id()
+        full_name = f"Photographer {n}"
+        location = rng.choice(cities)
+        status = "pending" if rng.random() < volumes["pending_ratio"] else "approved"
+        users.append({"id": user_id, "email": user_email("photographer", n), "full_name": full_name,
+                      "role": "photographer", "created_at": created(n), "password": password_hash})
+        data["photographer_profiles"].append({
+            "id": new_id(), "user_id": user_id, "bio": f"{full_name} shoots across {location}.",
+            "specialties": rng.sample(CATEGORIES, 2), "experience_years": rng.randint(1, 25),
+            "phone": f"+91 90000 {n:05d}", "location": location, "approval_status": status,
+            "created_at": created(n), **search_fields(full_name, location),
+        })
+        if status == "approved":
+            approved.append(user_id)
+        for i in range(int(volumes["portfolio_per_photographer"])):
+            data["portfolio_items"].append({
+                "id": new_id(), "photographer_id": user_id, "category": rng.choice(CATEGORIES),
+                "title": f"Shot {i}", "description": "Golden hour portraits by the lake",
+                "image_url": f"https://img.example/{user_id}/{i}.jpg", "created_at": created(n * 100 + i),
+            })
+        packages = packages_by_photographer[user_id] = []
+        for i in range(int(volumes["packages_per_photographer"])):
+            packages.append({
+                "id": new_id(), "photographer_id": user_id, "name": f"Package {i}", "type": "custom",
+                "category": rng.choice(CATEGORIES), "description": "Coverage with edited photos",
+                "price": float(rng.randrange(5000, 100000, 500)), "duration": rng.choice(DURATIONS),
+                "deliverables": ["Edited photos", "Online gallery"], "created_at": created(n * 100 + i),
+            })
+        data["packages"].extend(packages)
+
+    if approved and customers:
+        # one booking per photographer per day, so approved slots never overlap
+        next_day: Dict[str, int] = {}
+        for n in range(int(volumes["bookings"])):
+            photographer_id = rng.choice(approved)
+            package = rng.choice(packages_by_photographer[photographer_id])
+            day = next_day[photographer_id] = next_day.get(photographer_id, 0) + 1
+            booking_date = (date(2026, 1, 1) + timedelta(days=day)).isoformat()
+            start, end = booking_window(booking_date, "10:00", BOOKING_DEFAULT_TIMEZONE, parse_duration(package["duration"]))
+            data["bookings"].append({
+                "id": new_id(), "user_id": rng.choice(customers), "photographer_id": photographer_id,
+                "package_id": package["id"], "booking_date": booking_date, "booking_time": "10:00",
+                "location": rng.choice(cities), "message": "Looking forward to it",
+                "status": rng.choice(BOOKING_STATUSES), "start_at": start, "end_at": end,
+                "timezone": BOOKING_DEFAULT_TIMEZONE, "created_at": created(n),
+            })
+
+        # (photographer, user) is unique in reviews
+        pairs = set()
+        target = min(int(volumes["reviews"]), len(approved) * len(customers))
+        while len(pairs) < target:
+            pairs.add((rng.choice(approved), rng.choice(customers)))
+        for n, (photographer_id, user_id) in enumerate(sorted(pairs)):
+            data["reviews"].append({
+                "id": new_id(), "photographer_id": photographer_id, "user_id": user_id,
+                "rating": rng.randint(1, 5), "review_text": "Great experience", "created_at": created(n),
+            })
+
+        for n in range(int(volumes["reports"])):
+            data["reports"].append({
+                "id": new_id(), "reporter_id": rng.choice(customers), "photographer_id": rng.choice(approved),
+                "reason": rng.choice(REPORT_REASONS), "description": None,
+                "status": "pending" if n % 2 else "reviewed", "admin_action": None, "reviewed_by": None,
+                "reviewed_at": None, "created_at": created(n),
+            })
+    return data
+
+
+async def seed(db, volumes: Dict[str, float], seed_value: int = 1) -> Dict[str, int]:
+    """Drop and refill every seeded collection; returns document counts."""
+    # one real hash shared by every account: seeding stays fast, login still pays full bcrypt cost
+    data = build_dataset(volumes, seed_value, pwd_context.hash(PASSWORD))
+    for name in await db.list_collection_names():
+        await db.drop_collection(name)
+    await ensure_indexes(db)
+    for collection, docs in data.items():
+        for start in range(0, len(docs), INSERT_BATCH_SIZE):
+            await db[collection].insert_many(docs[start:start + INSERT_BATCH_SIZE], ordered=False)
+    await backfill_rating_aggregates(db)
+    await rebuild_calendars(db)
+    await admin_stats.refresh(db)
+    return {collection: len(docs) for collection, docs in data.items()}
+
+
+def add_volume_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--db", default="photographer_bench", help="database to (re)create; never your real one")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for the synthetic data")
+    for name, default in DEFAULT_VOLUMES.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(default), default=default)
+
+
+def check_target(parser: argparse.ArgumentParser, args) -> None:
+    # seeding drops the whole database first
+    if args.db == os.environ.get('DB_NAME'):
+        parser.error(f"--db {args.db} is the application database (DB_NAME); pick a scratch database")
+
+
+def volumes_from(args) -> Dict[str, float]:
+    return {name: getattr(args, name) for name in DEFAULT_VOLUMES}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_volume_arguments(parser)
+    args = parser.parse_args(argv)
+    check_target(parser, args)
+
+    database.connect()
+    try:
+        start = time.perf_counter()
+        counts = asyncio.run(seed(database.client[args.db], volumes_from(args), args.seed))
+    finally:
+        database.close()
+    print(json.dumps({"db": args.db, "seconds": round(time.perf_counter() - start, 2), "documents": counts}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
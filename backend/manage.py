@@ -0,0 +1,124 @@
+"""Maintenance commands for the photographer backend.
+
+Usage:
+    python manage.py ensure-indexes
+    python manage.py audit-indexes
+    python manage.py backfill-ratings
+    python manage.py backfill-search-fields
+    python manage.py backfill-locations
+    python manage.py backfill-bookings
+    python manage.py migrate-timestamps [--batch-size N] [--pause-ms MS] [--restart]
+    python manage.py copy-about-me [--batch-size N]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+from api import database
+from api.about_me import LEGACY_DB_NAME, copy_legacy_about_me
+from api.booking_calendar import backfill_booking_times, rebuild_calendars
+from api.geo import backfill_location_points
+from api.indexes import audit_indexes, ensure_indexes
+from api.photographer_search import backfill_search_fields
+from api.ratings import backfill_rating_aggregates
+from api.timestamps import migrate_timestamps
+
+
+async def cmd_ensure_indexes(db, args):
+    await ensure_indexes(db)
+    print("Indexes ensured.")
+    return 0
+
+
+async def cmd_audit_indexes(db, args):
+    results = await audit_indexes(db)
+    for r in results:
+        flag = "COLLSCAN" if r["collscan"] else "ok"
+        print(f"{flag:8} {r['collection']:22} {json.dumps(r['filter'], default=str)} -> {' > '.join(r['stages'])}")
+    # non-zero exit so the audit can gate CI
+    return 1 if any(r["collscan"] for r in results) else 0
+
+
+async def cmd_backfill_ratings(db, args):
+    updated = await backfill_rating_aggregates(db)
+    print(f"Rating aggregates rebuilt for {updated} reviewed photographers.")
+    return 0
+
+
+async def cmd_backfill_search_fields(db, args):
+    updated = await backfill_search_fields(db)
+    print(f"Search fields denormalized onto {updated} photographer profiles.")
+    return 0
+
+
+async def cmd_backfill_locations(db, args):
+    resolved, unresolved = await backfill_location_points(db)
+    print(f"Resolved coordinates for {resolved} photographer profiles.")
+    if unresolved:
+        print("Most common unresolved locations (candidates for api/data/gazetteer.json):")
+        for location, count in unresolved:
+            print(f"  {count:6} {location!r}")
+    return 0
+
+
+async def cmd_backfill_bookings(db, args):
+    updated, skipped = await backfill_booking_times(db)
+    print(f"Derived start/end times for {updated} bookings ({skipped} with unparseable date/time left unscheduled).")
+    written, conflicted = await rebuild_calendars(db)
+    print(f"Rebuilt {written} photographer calendars.")
+    if conflicted:
+        print(f"{conflicted} photographers already have overlapping approved bookings; they are kept as-is.")
+    return 0
+
+
+async def cmd_migrate_timestamps(db, args):
+    def report(collection, field, converted, unparseable):
+        note = f" ({unparseable} unparseable, left as strings)" if unparseable else ""
+        print(f"{collection}.{field}: {converted} converted{note}")
+
+    # Resumes from the last checkpoint unless --restart; safe to run while serving
+    await migrate_timestamps(db, batch_size=args.batch_size, pause=args.pause_ms / 1000, restart=args.restart, report=report)
+    return 0
+
+
+async def cmd_copy_about_me(db, args):
+    if LEGACY_DB_NAME == os.environ['DB_NAME']:
+        print(f"About Me already lives in {LEGACY_DB_NAME}; nothing to copy.")
+        return 0
+    # Existing documents win, so this is safe to rerun after the switch
+    copied, skipped = await copy_legacy_about_me(db.client[LEGACY_DB_NAME].about_me, db.about_me, batch_size=args.batch_size)
+    print(f"Copied {copied} About Me profiles from {LEGACY_DB_NAME} ({skipped} already present).")
+    return 0
+
+
+COMMANDS = {
+    "ensure-indexes": cmd_ensure_indexes,
+    "audit-indexes": cmd_audit_indexes,
+    "backfill-ratings": cmd_backfill_ratings,
+    "backfill-search-fields": cmd_backfill_search_fields,
+    "backfill-locations": cmd_backfill_locations,
+    "backfill-bookings": cmd_backfill_bookings,
+    "migrate-timestamps": cmd_migrate_timestamps,
+    "copy-about-me": cmd_copy_about_me,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    parser.add_argument("--batch-size", type=int, default=500, help="migrate-timestamps, copy-about-me: documents per batch")
+    parser.add_argument("--pause-ms", type=int, default=0, help="migrate-timestamps: sleep between batches")
+    parser.add_argument("--restart", action="store_true", help="migrate-timestamps: ignore saved checkpoints")
+    args = parser.parse_args(argv)
+
+    database.connect()
+    try:
+        return asyncio.run(COMMANDS[args.command](database.get_db(), args))
+    finally:
+        database.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,44 +1,83 @@
 #  Imports 
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from contextlib import asynccontextmanager
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional
+from typing import Dict, List, Optional
 import uuid
 from datetime import datetime, timezone, timedelta
 import jwt
-from passlib.context import CryptContext
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from api.about_me import router as about_me_router
 from fastapi.middleware.cors import CORSMiddleware
 from api.reviews_ratings import router as reviews_ratings_router
 from api.admin_insights import router as admin_insights_router
+from api.admin_export import router as admin_export_router
+from api.photographer_search import router as photographer_search_router, search_fields
+from api.search_index import search_index
+from api.media import attach_images, known_media, media_processor, router as media_router
+from api import bulk
+from api.bulk import BulkCreate
+from api.events import broker, router as events_router
+from api.jobs import JOB_WORKERS, job_runner, router as jobs_router
+from api.metrics import QUERY_COUNT_HEADER, MetricsMiddleware, router as metrics_router
+from api import http_cache
+from api.http_cache import response_cache
+from api.loaders import Loaders, get_loaders
+from api.auth import ALGORITHM, SECRET_KEY, User, get_current_user, invalidate_user
+from api.passwords import password_hasher
+from api import admin_stats
+from api import booking_calendar
+from api.database import get_db
+from api import database
+from api.indexes import ensure_indexes
+from api.serialization import dump_list, list_response
+from api.pagination import NEXT_CURSOR_HEADER, PageParams, cursor_headers, page_params, paginate, set_next_cursor
+import asyncio
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
-
 # Security
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-security = HTTPBearer()
-SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your-secret-key-change-in-production')
-ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 1440  # 24 hours
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One shared client/pool for every router, see api/database.py
+    database.connect()
+    await ensure_indexes(database.get_db())
+    await search_index.start(database.get_db())
+    await broker.start(database.get_db())
+    # JOB_WORKERS=0 leaves the outbox to separate `python -m api.worker` processes
+    job_runner.start(database.get_db(), JOB_WORKERS)
+    yield
+    await job_runner.stop()
+    await broker.stop()
+    await search_index.stop()
+    password_hasher.shutdown()
+    media_processor.shutdown()
+    database.close()
+    print("MongoDB connection closed.")
+
 # Create the main app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 api_router = APIRouter(prefix="/api")
 app.include_router(about_me_router)
 app.include_router(reviews_ratings_router)
 app.include_router(admin_insights_router)
+app.include_router(admin_export_router)
+app.include_router(photographer_search_router)
+app.include_router(events_router)
+app.include_router(media_router)
+app.include_router(jobs_router)
+app.include_router(metrics_router)
 
 app.add_middleware(
     CORSMiddleware,
@@ -46,17 +85,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, QUERY_COUNT_HEADER],
 )
 
 # Models
-class User(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    email: EmailStr
-    full_name: str
-    role: str  # user, photographer, admin
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-
 class UserCreate(BaseModel):
     email: EmailStr
     password: str
@@ -83,6 +115,9 @@ class PhotographerProfile(BaseModel):
     location: str
     profile_image: Optional[str] = None
     cover_image: Optional[str] = None
+    # Resized copies when the image was uploaded: {"thumb"|"card"|"full": {"webp"|"jpeg": url}}
+    profile_image_variants: Optional[Dict[str, Dict[str, str]]] = None
+    cover_image_variants: Optional[Dict[str, Dict[str, str]]] = None
     approval_status: str = "pending"  # pending, approved, rejected
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
@@ -94,6 +129,9 @@ class PhotographerProfileCreate(BaseModel):
     location: str
     profile_image: Optional[str] = None
     cover_image: Optional[str] = None
+    # Ids returned by POST /api/media, used instead of the URLs above
+    profile_image_id: Optional[str] = None
+    cover_image_id: Optional[str] = None
 
 class PhotographerProfileUpdate(BaseModel):
     bio: Optional[str] = None
@@ -103,6 +141,12 @@ class PhotographerProfileUpdate(BaseModel):
     location: Optional[str] = None
     profile_image: Optional[str] = None
     cover_image: Optional[str] = None
+    profile_image_id: Optional[str] = None
+    cover_image_id: Optional[str] = None
+
+class PhotographerListing(BaseModel):
+    profile: PhotographerProfile
+    user: User
 
 class PortfolioItem(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -112,13 +156,16 @@ class PortfolioItem(BaseModel):
     title: str
     description: str
     image_url: str
+    image_variants: Optional[Dict[str, Dict[str, str]]] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class PortfolioItemCreate(BaseModel):
     category: str
     title: str
     description: str
-    image_url: str
+    # Either an external URL or the id of an image uploaded to POST /api/media
+    image_url: Optional[str] = None
+    image_id: Optional[str] = None
 
 class Package(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -153,15 +200,20 @@ class Booking(BaseModel):
     location: str
     message: str
     status: str = "pending"  # pending, approved, rejected, cancelled
+    # UTC instants derived from booking_date/booking_time and the package duration
+    start_at: Optional[datetime] = None
+    end_at: Optional[datetime] = None
+    timezone: Optional[str] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class BookingCreate(BaseModel):
     photographer_id: str
     package_id: str
-    booking_date: str
-    booking_time: str
+    booking_date: str  # YYYY-MM-DD, local to `timezone`
+    booking_time: str  # HH:MM, local to `timezone`
     location: str
     message: str
+    timezone: Optional[str] = None  # IANA name, defaults to BOOKING_DEFAULT_TIMEZONE
 
 class BookingStatusUpdate(BaseModel):
     status: str
@@ -173,12 +225,6 @@ class RatingSchema(BaseModel):
     user_id: str
     rating: int
 # Helper functions
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -186,37 +232,42 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    token = credentials.credentials
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Invalid token")
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+async def enrich_bookings(bookings: List[dict], loaders: Loaders, include_profile: bool = False) -> List[dict]:
+    photographer_ids = [booking['photographer_id'] for booking in bookings]
+    user_ids = photographer_ids + [booking['user_id'] for booking in bookings]
+    package_ids = [booking['package_id'] for booking in bookings]
     
-    user_doc = await db.users.find_one({"id": user_id}, {"_id": 0})
-    if user_doc is None:
-        raise HTTPException(status_code=401, detail="User not found")
+    # One $in query per collection for the whole page, shared across rows
+    users, profiles, packages = await asyncio.gather(
+        loaders.users.load_many(user_ids),
+        loaders.profiles.load_many(photographer_ids if include_profile else []),
+        loaders.packages.load_many(package_ids),
+    )
     
-    if isinstance(user_doc.get('created_at'), str):
-        user_doc['created_at'] = datetime.fromisoformat(user_doc['created_at'])
+    result = []
+    for booking in bookings:
+        row = {
+            "booking": booking,
+            "photographer": users.get(booking['photographer_id']),
+        }
+        if include_profile:
+            row["photographer_profile"] = profiles.get(booking['photographer_id'])
+        row["user"] = users.get(booking['user_id'])
+        row["package"] = packages.get(booking['package_id'])
+        result.append(row)
     
-    return User(**user_doc)
+    return result
 
 # Auth routes
 @api_router.post("/auth/register", response_model=Token)
-async def register(user_input: UserCreate):
+async def register(user_input: UserCreate, db: AsyncIOMotorDatabase = Depends(get_db)):
     # Check if user exists
     existing_user = await db.users.find_one({"email": user_input.email})
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    # Hash password
-    hashed_password = hash_password(user_input.password)
+    # Hash password (in the bcrypt pool, off the event loop)
+    hashed_password = await password_hasher.hash(user_input.password)
     
     # Create user
     user_dict = user_input.model_dump(exclude={"password"})
@@ -224,10 +275,13 @@ async def register(user_input: UserCreate):
     
     # Store user with hashed password
     doc = user_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
     doc['password'] = hashed_password
     
-    await db.users.insert_one(doc)
+    try:
+        await db.users.insert_one(doc)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    await admin_stats.bump(db, total_users=int(user_obj.role == "user"), total_photographers=int(user_obj.role == "photographer"))
     
     # Create token
     access_token = create_access_token(data={"sub": user_obj.id, "role": user_obj.role})
@@ -236,17 +290,18 @@ async def register(user_input: UserCreate):
 
 @api_router.post("/auth/login")
 @api_router.post("/auth/login")
-async def login(credentials: UserLogin):
-    user_doc = await db.users.find_one({"email": credentials.email}, {"_id": 0})
+async def login(credentials: UserLogin, db: AsyncIOMotorDatabase = Depends(get_db)):
+    user_doc = await db.users.find_one({"email": credentials.email, "deleted": {"$ne": True}}, {"_id": 0})
     if not user_doc:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    if not verify_password(credentials.password, user_doc["password"]):
+    verified, new_hash = await password_hasher.verify_and_update(credentials.password, user_doc["password"])
+    if not verified:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    # Convert timestamps
-    if isinstance(user_doc.get("created_at"), str):
-        user_doc["created_at"] = datetime.fromisoformat(user_doc["created_at"])
+    # Stored hash uses an outdated cost factor; upgrade it while we have the plaintext
+    if new_hash:
+        await db.users.update_one({"id": user_doc["id"]}, {"$set": {"password": new_hash}})
 
     # ✅ Check if restricted
     if user_doc.get("restricted"):
@@ -272,9 +327,16 @@ async def login(credentials: UserLogin):
 async def get_me(current_user: User = Depends(get_current_user)):
     return current_user
 
+# Uploaded image id field -> (URL field, variants field) it fills, see api/media.py
+PROFILE_IMAGE_FIELDS = {
+    "profile_image_id": ("profile_image", "profile_image_variants"),
+    "cover_image_id": ("cover_image", "cover_image_variants"),
+}
+PORTFOLIO_IMAGE_FIELDS = {"image_id": ("image_url", "image_variants")}
+
 # Photographer Profile routes
 @api_router.post("/photographer/profile", response_model=PhotographerProfile)
-async def create_photographer_profile(profile_input: PhotographerProfileCreate, current_user: User = Depends(get_current_user)):
+async def create_photographer_profile(profile_input: PhotographerProfileCreate, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
     if current_user.role != "photographer":
         raise HTTPException(status_code=403, detail="Only photographers can create profiles")
     
@@ -283,86 +345,82 @@ async def create_photographer_profile(profile_input: PhotographerProfileCreate,
     if existing_profile:
         raise HTTPException(status_code=400, detail="Profile already exists")
     
-    profile_dict = profile_input.model_dump()
+    profile_dict = await attach_images(db, profile_input.model_dump(), PROFILE_IMAGE_FIELDS)
     profile_dict['user_id'] = current_user.id
     profile_obj = PhotographerProfile(**profile_dict)
     
     doc = profile_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
+    doc.update(search_fields(full_name=current_user.full_name, location=profile_obj.location))
+    doc.update(rating_sum=0, rating_count=0, average_rating=0)
     
     await db.photographer_profiles.insert_one(doc)
+    await admin_stats.bump(db, **admin_stats.status_deltas("photographers", ("pending", "approved"), None, profile_obj.approval_status))
+    search_index.upsert(doc)
+    await response_cache.bump(db, current_user.id, http_cache.PROFILE)
     return profile_obj
 
 @api_router.get("/photographer/profile/me", response_model=PhotographerProfile)
-async def get_my_profile(current_user: User = Depends(get_current_user)):
+async def get_my_profile(current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
     profile_doc = await db.photographer_profiles.find_one({"user_id": current_user.id}, {"_id": 0})
     if not profile_doc:
         raise HTTPException(status_code=404, detail="Profile not found")
     
-    if isinstance(profile_doc.get('created_at'), str):
-        profile_doc['created_at'] = datetime.fromisoformat(profile_doc['created_at'])
-    
     return PhotographerProfile(**profile_doc)
 
 @api_router.put("/photographer/profile", response_model=PhotographerProfile)
-async def update_photographer_profile(profile_input: PhotographerProfileUpdate, current_user: User = Depends(get_current_user)):
+async def update_photographer_profile(profile_input: PhotographerProfileUpdate, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
     if current_user.role != "photographer":
         raise HTTPException(status_code=403, detail="Only photographers can update profiles")
     
     update_data = {k: v for k, v in profile_input.model_dump().items() if v is not None}
     if not update_data:
         raise HTTPException(status_code=400, detail="No update data provided")
+    await attach_images(db, update_data, PROFILE_IMAGE_FIELDS)
     
     result = await db.photographer_profiles.find_one_and_update(
         {"user_id": current_user.id},
-        {"$set": update_data},
+        {"$set": {**update_data, **search_fields(location=update_data.get('location'))}},
         return_document=True,
         projection={"_id": 0}
     )
     
     if not result:
         raise HTTPException(status_code=404, detail="Profile not found")
-    
-    if isinstance(result.get('created_at'), str):
-        result['created_at'] = datetime.fromisoformat(result['created_at'])
+    search_index.upsert(result)
+    await response_cache.bump(db, current_user.id, http_cache.PROFILE)
     
     return PhotographerProfile(**result)
 
 @api_router.get("/photographer/profile/{photographer_id}", response_model=PhotographerProfile)
-async def get_photographer_profile(photographer_id: str):
-    profile_doc = await db.photographer_profiles.find_one({"user_id": photographer_id}, {"_id": 0})
-    if not profile_doc:
-        raise HTTPException(status_code=404, detail="Profile not found")
-    
-    if isinstance(profile_doc.get('created_at'), str):
-        profile_doc['created_at'] = datetime.fromisoformat(profile_doc['created_at'])
+async def get_photographer_profile(photographer_id: str, request: Request, db: AsyncIOMotorDatabase = Depends(get_db)):
+    async def load():
+        profile_doc = await db.photographer_profiles.find_one({"user_id": photographer_id}, {"_id": 0})
+        if not profile_doc:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        
+        return PhotographerProfile(**profile_doc), {}
     
-    return PhotographerProfile(**profile_doc)
+    return await response_cache.respond(request, db, http_cache.PROFILE, photographer_id, load)
 
-@api_router.get("/photographers", response_model=List[dict])
-async def get_all_photographers():
+@api_router.get("/photographers", response_model=List[PhotographerListing])
+async def get_all_photographers(page: PageParams = Depends(page_params), db: AsyncIOMotorDatabase = Depends(get_db)):
     # Get approved photographers with their user info
-    profiles = await db.photographer_profiles.find({"approval_status": "approved"}, {"_id": 0}).to_list(1000)
+    profiles, next_cursor = await paginate(db.photographer_profiles, {"approval_status": "approved"}, {"_id": 0}, page)
     
-    result = []
-    for profile in profiles:
-        user_doc = await db.users.find_one({"id": profile['user_id']}, {"_id": 0, "password": 0})
-        if user_doc:
-            if isinstance(profile.get('created_at'), str):
-                profile['created_at'] = datetime.fromisoformat(profile['created_at'])
-            if isinstance(user_doc.get('created_at'), str):
-                user_doc['created_at'] = datetime.fromisoformat(user_doc['created_at'])
-            
-            result.append({
-                "profile": PhotographerProfile(**profile).model_dump(),
-                "user": User(**user_doc).model_dump()
-            })
+    # Fetch every owner in one round trip instead of one find_one per profile
+    user_ids = list({profile['user_id'] for profile in profiles})
+    users = await db.users.find({"id": {"$in": user_ids}}, {"_id": 0, "password": 0}).to_list(None)
+    users_by_id = {user['id']: user for user in users}
     
-    return result
+    listings = [
+        {"profile": profile, "user": users_by_id[profile['user_id']]}
+        for profile in profiles if profile['user_id'] in users_by_id
+    ]
+    return list_response(PhotographerListing, listings, cursor_headers(next_cursor))
 
 # Portfolio routes
 @api_router.post("/portfolio", response_model=PortfolioItem)
-async def create_portfolio_item(item_input: PortfolioItemCreate, current_user: User = Depends(get_current_user)):
+async def create_portfolio_item(item_input: PortfolioItemCreate, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
     if current_user.role != "photographer":
         raise HTTPException(status_code=403, detail="Only photographers can create portfolio items")
     
@@ -371,50 +429,78 @@ async def create_portfolio_item(item_input: PortfolioItemCreate, current_user: U
     if not profile or profile['approval_status'] != "approved":
         raise HTTPException(status_code=403, detail="Photographer profile not approved")
     
-    item_dict = item_input.model_dump()
+    item_dict = await attach_images(db, item_input.model_dump(), PORTFOLIO_IMAGE_FIELDS)
+    if not item_dict.get('image_url'):
+        raise HTTPException(status_code=400, detail="Provide image_url or image_id")
     item_dict['photographer_id'] = current_user.id
     item_obj = PortfolioItem(**item_dict)
     
     doc = item_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
     
     await db.portfolio_items.insert_one(doc)
+    await response_cache.bump(db, current_user.id, http_cache.PORTFOLIO)
     return item_obj
 
-@api_router.get("/portfolio/my", response_model=List[PortfolioItem])
-async def get_my_portfolio(current_user: User = Depends(get_current_user)):
-    items = await db.portfolio_items.find({"photographer_id": current_user.id}, {"_id": 0}).to_list(1000)
+@api_router.post("/portfolio/bulk")
+async def create_portfolio_items_bulk(payload: BulkCreate, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
+    """Create up to BULK_MAX_ITEMS portfolio items at once; each gets its own result"""
+    if current_user.role != "photographer":
+        raise HTTPException(status_code=403, detail="Only photographers can create portfolio items")
     
-    for item in items:
-        if isinstance(item.get('created_at'), str):
-            item['created_at'] = datetime.fromisoformat(item['created_at'])
+    # Checked once for the whole batch
+    profile = await db.photographer_profiles.find_one({"user_id": current_user.id}, {"approval_status": 1})
+    if not profile or profile['approval_status'] != "approved":
+        raise HTTPException(status_code=403, detail="Photographer profile not approved")
     
-    return [PortfolioItem(**item) for item in items]
+    valid, errors = bulk.validate_items(PortfolioItemCreate, payload.items)
+    # One media lookup for every uploaded image in the batch
+    known = await known_media(db, (item.image_id for item in valid.values()))
+    docs = {}
+    for index, item_input in valid.items():
+        try:
+            item_dict = await attach_images(db, item_input.model_dump(), PORTFOLIO_IMAGE_FIELDS, known)
+        except HTTPException as e:
+            errors[index] = e.detail
+            continue
+        if not item_dict.get('image_url'):
+            errors[index] = "Provide image_url or image_id"
+            continue
+        item_dict['photographer_id'] = current_user.id
+        docs[index] = PortfolioItem(**item_dict).model_dump()
+    
+    errors.update(await bulk.insert_items(db.portfolio_items, docs))
+    if len(errors) < len(payload.items):
+        await response_cache.bump(db, current_user.id, http_cache.PORTFOLIO)
+    return bulk.results(len(payload.items), {index: doc['id'] for index, doc in docs.items()}, errors)
+
+@api_router.get("/portfolio/my", response_model=List[PortfolioItem])
+async def get_my_portfolio(page: PageParams = Depends(page_params), current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
+    items, next_cursor = await paginate(db.portfolio_items, {"photographer_id": current_user.id}, {"_id": 0}, page)
+    return list_response(PortfolioItem, items, cursor_headers(next_cursor))
 
 @api_router.get("/portfolio/photographer/{photographer_id}", response_model=List[PortfolioItem])
-async def get_photographer_portfolio(photographer_id: str):
-    items = await db.portfolio_items.find({"photographer_id": photographer_id}, {"_id": 0}).to_list(1000)
-    
-    for item in items:
-        if isinstance(item.get('created_at'), str):
-            item['created_at'] = datetime.fromisoformat(item['created_at'])
+async def get_photographer_portfolio(photographer_id: str, request: Request, page: PageParams = Depends(page_params), db: AsyncIOMotorDatabase = Depends(get_db)):
+    async def load():
+        items, next_cursor = await paginate(db.portfolio_items, {"photographer_id": photographer_id}, {"_id": 0}, page)
+        return dump_list(PortfolioItem, items), cursor_headers(next_cursor)
     
-    return [PortfolioItem(**item) for item in items]
+    return await response_cache.respond(request, db, http_cache.PORTFOLIO, photographer_id, load)
 
 @api_router.delete("/portfolio/{item_id}")
-async def delete_portfolio_item(item_id: str, current_user: User = Depends(get_current_user)):
+async def delete_portfolio_item(item_id: str, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
     if current_user.role != "photographer":
         raise HTTPException(status_code=403, detail="Only photographers can delete portfolio items")
     
     result = await db.portfolio_items.delete_one({"id": item_id, "photographer_id": current_user.id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Portfolio item not found")
+    await response_cache.bump(db, current_user.id, http_cache.PORTFOLIO)
     
     return {"message": "Portfolio item deleted"}
 
 # Package routes
 @api_router.post("/packages", response_model=Package)
-async def create_package(package_input: PackageCreate, current_user: User = Depends(get_current_user)):
+async def create_package(package_input: PackageCreate, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
     if current_user.role != "photographer":
         raise HTTPException(status_code=403, detail="Only photographers can create packages")
     
@@ -423,97 +509,109 @@ async def create_package(package_input: PackageCreate, current_user: User = Depe
     package_obj = Package(**package_dict)
     
     doc = package_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
     
     await db.packages.insert_one(doc)
+    await response_cache.bump(db, current_user.id, http_cache.PACKAGES)
     return package_obj
 
-@api_router.get("/packages/my", response_model=List[Package])
-async def get_my_packages(current_user: User = Depends(get_current_user)):
-    packages = await db.packages.find({"photographer_id": current_user.id}, {"_id": 0}).to_list(1000)
+@api_router.post("/packages/bulk")
+async def create_packages_bulk(payload: BulkCreate, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
+    """Create up to BULK_MAX_ITEMS packages at once; each gets its own result"""
+    if current_user.role != "photographer":
+        raise HTTPException(status_code=403, detail="Only photographers can create packages")
     
-    for package in packages:
-        if isinstance(package.get('created_at'), str):
-            package['created_at'] = datetime.fromisoformat(package['created_at'])
+    valid, errors = bulk.validate_items(PackageCreate, payload.items)
+    docs = {}
+    for index, package_input in valid.items():
+        package_dict = package_input.model_dump()
+        package_dict['photographer_id'] = current_user.id
+        docs[index] = Package(**package_dict).model_dump()
     
-    return [Package(**package) for package in packages]
+    errors.update(await bulk.insert_items(db.packages, docs))
+    if len(errors) < len(payload.items):
+        await response_cache.bump(db, current_user.id, http_cache.PACKAGES)
+    return bulk.results(len(payload.items), {index: doc['id'] for index, doc in docs.items()}, errors)
+
+@api_router.get("/packages/my", response_model=List[Package])
+async def get_my_packages(page: PageParams = Depends(page_params), current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
+    packages, next_cursor = await paginate(db.packages, {"photographer_id": current_user.id}, {"_id": 0}, page)
+    return list_response(Package, packages, cursor_headers(next_cursor))
 
 @api_router.get("/packages/photographer/{photographer_id}", response_model=List[Package])
-async def get_photographer_packages(photographer_id: str):
-    packages = await db.packages.find({"photographer_id": photographer_id}, {"_id": 0}).to_list(1000)
-    
-    for package in packages:
-        if isinstance(package.get('created_at'), str):
-            package['created_at'] = datetime.fromisoformat(package['created_at'])
+async def get_photographer_packages(photographer_id: str, request: Request, page: PageParams = Depends(page_params), db: AsyncIOMotorDatabase = Depends(get_db)):
+    async def load():
+        packages, next_cursor = await paginate(db.packages, {"photographer_id": photographer_id}, {"_id": 0}, page)
+        return dump_list(Package, packages), cursor_headers(next_cursor)
     
-    return [Package(**package) for package in packages]
+    return await response_cache.respond(request, db, http_cache.PACKAGES, photographer_id, load)
 
 @api_router.delete("/packages/{package_id}")
-async def delete_package(package_id: str, current_user: User = Depends(get_current_user)):
+async def delete_package(package_id: str, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
     if current_user.role != "photographer":
         raise HTTPException(status_code=403, detail="Only photographers can delete packages")
     
     result = await db.packages.delete_one({"id": package_id, "photographer_id": current_user.id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Package not found")
+    await response_cache.bump(db, current_user.id, http_cache.PACKAGES)
     
     return {"message": "Package deleted"}
 
 # Booking routes
 @api_router.post("/bookings", response_model=Booking)
-async def create_booking(booking_input: BookingCreate, current_user: User = Depends(get_current_user)):
+async def create_booking(booking_input: BookingCreate, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
     if current_user.role != "user":
         raise HTTPException(status_code=403, detail="Only users can create bookings")
     
+    package = await db.packages.find_one(
+        {"id": booking_input.package_id, "photographer_id": booking_input.photographer_id}, {"_id": 0, "duration": 1}
+    )
+    if not package:
+        raise HTTPException(status_code=404, detail="Package not found")
+    
     booking_dict = booking_input.model_dump()
     booking_dict['user_id'] = current_user.id
+    booking_dict['timezone'] = booking_input.timezone or booking_calendar.BOOKING_DEFAULT_TIMEZONE
+    booking_dict['start_at'], booking_dict['end_at'] = booking_calendar.booking_window(
+        booking_input.booking_date, booking_input.booking_time, booking_dict['timezone'],
+        booking_calendar.parse_duration(package.get('duration')),
+    )
+    if booking_dict['start_at'] <= datetime.now(timezone.utc):
+        raise HTTPException(status_code=400, detail="Booking time must be in the future")
     booking_obj = Booking(**booking_dict)
     
     doc = booking_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
     
-    await db.bookings.insert_one(doc)
+    # Claim the slot first; 409 if an approved booking already holds it
+    await booking_calendar.reserve(db, booking_obj.photographer_id, booking_obj.id, booking_obj.start_at, booking_obj.end_at)
+    try:
+        await db.bookings.insert_one(doc)
+    except Exception:
+        await booking_calendar.release(db, booking_obj.photographer_id, booking_obj.id)
+        raise
+    await booking_calendar.prune(db, booking_obj.photographer_id)
+    broker.publish("booking_created", [booking_obj.photographer_id], doc)
+    await admin_stats.bump(db, total_bookings=1, pending_bookings=int(booking_obj.status == "pending"))
     return booking_obj
 
 @api_router.get("/bookings/my", response_model=List[dict])
-async def get_my_bookings(current_user: User = Depends(get_current_user)):
+async def get_my_bookings(response: Response, page: PageParams = Depends(page_params), current_user: User = Depends(get_current_user), loaders: Loaders = Depends(get_loaders), db: AsyncIOMotorDatabase = Depends(get_db)):
     if current_user.role == "user":
-        bookings = await db.bookings.find({"user_id": current_user.id}, {"_id": 0}).to_list(1000)
+        query = {"user_id": current_user.id}
     elif current_user.role == "photographer":
-        bookings = await db.bookings.find({"photographer_id": current_user.id}, {"_id": 0}).to_list(1000)
+        query = {"photographer_id": current_user.id}
     else:
         raise HTTPException(status_code=403, detail="Invalid role for this endpoint")
     
-    result = []
-    for booking in bookings:
-        if isinstance(booking.get('created_at'), str):
-            booking['created_at'] = datetime.fromisoformat(booking['created_at'])
-        
-        # Get photographer info
-        photographer = await db.users.find_one({"id": booking['photographer_id']}, {"_id": 0, "password": 0})
-        photographer_profile = await db.photographer_profiles.find_one({"user_id": booking['photographer_id']}, {"_id": 0})
-        
-        # Get user info
-        user = await db.users.find_one({"id": booking['user_id']}, {"_id": 0, "password": 0})
-        
-        # Get package info
-        package = await db.packages.find_one({"id": booking['package_id']}, {"_id": 0})
-        
-        result.append({
-            "booking": booking,
-            "photographer": photographer,
-            "photographer_profile": photographer_profile,
-            "user": user,
-            "package": package
-        })
-    
-    return result
+    bookings, next_cursor = await paginate(db.bookings, query, {"_id": 0}, page)
+    set_next_cursor(response, next_cursor)
+    return await enrich_bookings(bookings, loaders, include_profile=True)
 
 
 
 
 @api_router.put("/bookings/{booking_id}/status", response_model=Booking)
-async def update_booking_status(booking_id: str, status_update: BookingStatusUpdate, current_user: User = Depends(get_current_user)):
+async def update_booking_status(booking_id: str, status_update: BookingStatusUpdate, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
     booking = await db.bookings.find_one({"id": booking_id}, {"_id": 0})
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
@@ -524,35 +622,52 @@ async def update_booking_status(booking_id: str, status_update: BookingStatusUpd
     if current_user.role == "user" and booking['user_id'] != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
     
+    if booking.get('start_at') is not None:
+        if status_update.status == "approved":
+            await booking_calendar.approve(db, booking['photographer_id'], booking_id, booking['start_at'], booking['end_at'])
+        elif status_update.status not in booking_calendar.HOLDING_STATUSES:
+            await booking_calendar.release(db, booking['photographer_id'], booking_id)
+    
     result = await db.bookings.find_one_and_update(
         {"id": booking_id},
         {"$set": {"status": status_update.status}},
         return_document=True,
         projection={"_id": 0}
     )
-    
-    if isinstance(result.get('created_at'), str):
-        result['created_at'] = datetime.fromisoformat(result['created_at'])
+    await admin_stats.bump(db, **admin_stats.status_deltas("bookings", ("pending",), booking.get('status'), status_update.status))
+    broker.publish("booking_status", [result.get("user_id"), result.get("photographer_id")], result)
     
     return Booking(**result)
 
+@api_router.get("/photographers/{photographer_id}/availability")
+async def get_photographer_availability(
+    photographer_id: str,
+    start: datetime = Query(..., alias="from", description="Window start (ISO 8601, UTC if no offset)"),
+    end: datetime = Query(..., alias="to", description="Window end (ISO 8601, UTC if no offset)"),
+    db: AsyncIOMotorDatabase = Depends(get_db),
+):
+    start, end = booking_calendar.as_utc(start), booking_calendar.as_utc(end)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="'to' must be after 'from'")
+    if end - start > booking_calendar.MAX_AVAILABILITY_WINDOW:
+        raise HTTPException(status_code=400, detail="Availability window is limited to 92 days")
+    
+    busy = await booking_calendar.busy_intervals(db, photographer_id, start, end)
+    return {"photographer_id": photographer_id, "from": start, "to": end, "busy": busy}
+
 # Admin routes
 @api_router.get("/admin/photographers/pending", response_model=List[dict])
-async def get_pending_photographers(current_user: User = Depends(get_current_user)):
+async def get_pending_photographers(response: Response, page: PageParams = Depends(page_params), current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    profiles = await db.photographer_profiles.find({"approval_status": "pending"}, {"_id": 0}).to_list(1000)
+    profiles, next_cursor = await paginate(db.photographer_profiles, {"approval_status": "pending"}, {"_id": 0}, page)
+    set_next_cursor(response, next_cursor)
     
     result = []
     for profile in profiles:
         user_doc = await db.users.find_one({"id": profile['user_id']}, {"_id": 0, "password": 0})
         if user_doc:
-            if isinstance(profile.get('created_at'), str):
-                profile['created_at'] = datetime.fromisoformat(profile['created_at'])
-            if isinstance(user_doc.get('created_at'), str):
-                user_doc['created_at'] = datetime.fromisoformat(user_doc['created_at'])
-            
             result.append({
                 "profile": profile,
                 "user": user_doc
@@ -561,109 +676,69 @@ async def get_pending_photographers(current_user: User = Depends(get_current_use
     return result
 
 @api_router.put("/admin/photographers/{photographer_id}/approval", response_model=PhotographerProfile)
-async def update_photographer_approval(photographer_id: str, approval: ApprovalUpdate, current_user: User = Depends(get_current_user)):
+async def update_photographer_approval(photographer_id: str, approval: ApprovalUpdate, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
     result = await db.photographer_profiles.find_one_and_update(
         {"user_id": photographer_id},
         {"$set": {"approval_status": approval.approval_status}},
-        return_document=True,
+        return_document=ReturnDocument.BEFORE,
         projection={"_id": 0}
     )
     
     if not result:
         raise HTTPException(status_code=404, detail="Photographer not found")
     
-    if isinstance(result.get('created_at'), str):
-        result['created_at'] = datetime.fromisoformat(result['created_at'])
+    previous_status = result.get('approval_status')
+    result['approval_status'] = approval.approval_status
+    await admin_stats.bump(db, **admin_stats.status_deltas("photographers", ("pending", "approved"), previous_status, approval.approval_status))
+    search_index.upsert(result)
+    await response_cache.bump(db, photographer_id, http_cache.PROFILE)
     
     return PhotographerProfile(**result)
 
 @api_router.get("/admin/stats")
-async def get_admin_stats(current_user: User = Depends(get_current_user)):
+async def get_admin_stats(fresh: bool = False, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    total_users = await db.users.count_documents({"role": "user"})
-    total_photographers = await db.users.count_documents({"role": "photographer"})
-    pending_photographers = await db.photographer_profiles.count_documents({"approval_status": "pending"})
-    approved_photographers = await db.photographer_profiles.count_documents({"approval_status": "approved"})
-    total_bookings = await db.bookings.count_documents({})
-    pending_bookings = await db.bookings.count_documents({"status": "pending"})
-    pending_reports = await db.reports.count_documents({"status": "pending"})
-    total_reviews = await db.reviews.count_documents({})
-
-    
-    return {
-        "total_users": total_users,
-        "total_photographers": total_photographers,
-        "pending_photographers": pending_photographers,
-        "approved_photographers": approved_photographers,
-        "total_bookings": total_bookings,
-        "pending_bookings": pending_bookings,
-        "pending_reports": pending_reports,
-        "total_reviews": total_reviews,
-    }
+    # Cached snapshot of the materialized counters; ?fresh=1 forces an exact recount
+    return await admin_stats.get_stats(db, fresh=fresh)
 
 @api_router.get("/admin/bookings", response_model=List[dict])
-async def get_all_bookings(current_user: User = Depends(get_current_user)):
+async def get_all_bookings(response: Response, page: PageParams = Depends(page_params), current_user: User = Depends(get_current_user), loaders: Loaders = Depends(get_loaders), db: AsyncIOMotorDatabase = Depends(get_db)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    bookings = await db.bookings.find({}, {"_id": 0}).to_list(1000)
-    
-    result = []
-    for booking in bookings:
-        if isinstance(booking.get('created_at'), str):
-            booking['created_at'] = datetime.fromisoformat(booking['created_at'])
-        
-        photographer = await db.users.find_one({"id": booking['photographer_id']}, {"_id": 0, "password": 0})
-        user = await db.users.find_one({"id": booking['user_id']}, {"_id": 0, "password": 0})
-        package = await db.packages.find_one({"id": booking['package_id']}, {"_id": 0})
-        
-        result.append({
-            "booking": booking,
-            "photographer": photographer,
-            "user": user,
-            "package": package
-        })
+    bookings, next_cursor = await paginate(db.bookings, {}, {"_id": 0}, page)
+    set_next_cursor(response, next_cursor)
     
-    return result
+    return await enrich_bookings(bookings, loaders)
 
 @api_router.get("/admin/users", response_model=List[User])
-async def get_all_users(current_user: User = Depends(get_current_user)):
+async def get_all_users(page: PageParams = Depends(page_params), current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    users = await db.users.find({}, {"_id": 0, "password": 0}).to_list(1000)
-    
-    for user in users:
-        if isinstance(user.get('created_at'), str):
-            user['created_at'] = datetime.fromisoformat(user['created_at'])
-    
-    return [User(**user) for user in users]
+    users, next_cursor = await paginate(db.users, {}, {"_id": 0, "password": 0}, page)
+    return list_response(User, users, cursor_headers(next_cursor))
 @api_router.get("/admin/restricted-users", response_model=list[dict])
-async def get_restricted_users(current_user: User = Depends(get_current_user)):
+async def get_restricted_users(response: Response, page: PageParams = Depends(page_params), current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
 
-    users = await db.users.find(
+    users, next_cursor = await paginate(
+        db.users,
         {"restricted": True},
-        {"_id": 0, "password": 0}
-    ).to_list(1000)
-
-    for u in users:
-        if isinstance(u.get("created_at"), str):
-            u["created_at"] = datetime.fromisoformat(u["created_at"])
-        if isinstance(u.get("restricted_at"), str):
-            try:
-                u["restricted_at"] = datetime.fromisoformat(u["restricted_at"])
-            except Exception:
-                pass
+        {"_id": 0, "password": 0},
+        page,
+    )
+    set_next_cursor(response, next_cursor)
+
     return users
 @api_router.put("/admin/unrestrict/{user_id}", response_model=dict)
-async def unrestrict_user(user_id: str, current_user: User = Depends(get_current_user)):
+async def unrestrict_user(user_id: str, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
 
@@ -675,6 +750,7 @@ async def unrestrict_user(user_id: str, current_user: User = Depends(get_current
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="No restricted user found with this ID")
 
+    invalidate_user(user_id)
     return {"message": "User unrestricted successfully"}
 
 # Include router
@@ -686,18 +762,13 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, QUERY_COUNT_HEADER],
 )
+# Outermost, so the timings include every other middleware
+app.add_middleware(MetricsMiddleware)
 
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
-    print("MongoDB connection closed.")
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
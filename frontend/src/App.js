@@ -139,5 +139,5 @@ function App() {
   );
 }
 
-export { API, toast };
+export { API, BACKEND_URL, toast };
 export default App;
@@ -0,0 +1,32 @@
+import { useEffect, useRef } from "react";
+import { API } from "@/App";
+
+// Subscribes to /api/events/stream (Server-Sent Events) while mounted.
+// `handlers` maps event names (notification, booking_created, booking_status,
+// resync) to callbacks receiving the parsed payload. EventSource reconnects
+// on its own and sends Last-Event-ID, so missed events are replayed.
+export function useEventStream(handlers) {
+  const handlersRef = useRef(handlers);
+  handlersRef.current = handlers;
+
+  useEffect(() => {
+    const token = localStorage.getItem("access_token");
+    if (!token || typeof EventSource === "undefined") return undefined;
+
+    const source = new EventSource(`${API}/events/stream?token=${encodeURIComponent(token)}`);
+    const names = ["notification", "booking_created", "booking_status", "resync"];
+    const listeners = names.map((name) => {
+      const listener = (event) => {
+        const handler = handlersRef.current[name];
+        if (handler) handler(event.data ? JSON.parse(event.data) : {});
+      };
+      source.addEventListener(name, listener);
+      return [name, listener];
+    });
+
+    return () => {
+      listeners.forEach(([name, listener]) => source.removeEventListener(name, listener));
+      source.close();
+    };
+  }, []);
+}
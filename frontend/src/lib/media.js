@@ -0,0 +1,21 @@
+import axios from "axios";
+import { API, BACKEND_URL } from "@/App";
+
+// Uploads the file as the raw request body; the server answers with
+// { id, url, width, height, variants }. Pass `id` back as image_id /
+// profile_image_id / cover_image_id when saving.
+export async function uploadImage(file) {
+  const response = await axios.post(`${API}/media`, file, {
+    headers: { "Content-Type": file.type },
+  });
+  return response.data;
+}
+
+// Uploaded images are served by the backend under root-relative URLs
+const absolute = (url) => (url && url.startsWith("/") ? `${BACKEND_URL}${url}` : url);
+
+// Smallest resized copy that fits `size` ("thumb", "card", "full"), falling
+// back to the original URL for images that were linked rather than uploaded.
+export function imageSrc(url, variants, size = "card") {
+  return absolute(variants?.[size]?.webp || url);
+}
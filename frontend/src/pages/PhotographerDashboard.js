@@ -2,6 +2,8 @@ import { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import axios from 'axios';
 import { API, toast } from '@/App';
+import { useEventStream } from '@/hooks/use-event-stream';
+import { imageSrc, uploadImage } from '@/lib/media';
 import { Button } from '@/components/ui/button';
 import { Input } from '@/components/ui/input';
 import { Camera, LogOut, Plus, Trash2, Loader2, AlertCircle, CheckCircle, Clock, MapPin, Globe, User } from 'lucide-react';
@@ -47,8 +49,24 @@ const [notifications, setNotifications] = useState([]);
     category: '',
     title: '',
     description: '',
-    image_url: ''
+    image_url: '',
+    image_id: ''
   });
+  const [uploading, setUploading] = useState(false);
+
+  // Upload a picked file and remember its id under `idField` of the form
+  const handleImageUpload = async (file, setForm, urlField, idField) => {
+    if (!file) return;
+    setUploading(true);
+    try {
+      const uploaded = await uploadImage(file);
+      setForm((prev) => ({ ...prev, [urlField]: uploaded.url, [idField]: uploaded.id }));
+    } catch (error) {
+      toast.error(error.response?.data?.detail || 'Image upload failed');
+    } finally {
+      setUploading(false);
+    }
+  };
 
   const [packageForm, setPackageForm] = useState({
     name: '',
@@ -101,6 +119,17 @@ const [notifications, setNotifications] = useState([]);
   const [specialtyInput, setSpecialtyInput] = useState('');
   const [deliverableInput, setDeliverableInput] = useState('');
 
+  // Pushed by the server instead of refetching on a timer
+  useEventStream({
+    notification: (n) => setNotifications((prev) => [n, ...prev.filter((p) => p.id !== n.id)]),
+    booking_created: () => fetchBookings(),
+    booking_status: () => fetchBookings(),
+    resync: () => {
+      fetchBookings();
+      if (user) fetchFeedback(user.id);
+    },
+  });
+
   useEffect(() => {
   const userData = localStorage.getItem('user');
   if (userData) {
@@ -255,7 +284,8 @@ const fetchFeedback = async (photographerId) => {
         category: '',
         title: '',
         description: '',
-        image_url: ''
+        image_url: '',
+        image_id: ''
       });
       fetchPortfolio();
     } catch (error) {
@@ -616,8 +646,9 @@ const fetchFeedback = async (photographerId) => {
                           >
                             <div className="aspect-square overflow-hidden">
                               <img
-                                src={item.image_url}
+                                src={imageSrc(item.image_url, item.image_variants)}
                                 alt={item.title}
+                                loading="lazy"
                                 className="w-full h-full object-cover group-hover:scale-105 transition-transform"
                               />
                             </div>
@@ -1070,12 +1101,20 @@ const fetchFeedback = async (photographerId) => {
               <Input
                 id="profile_image"
                 data-testid="profile-image-input"
-                type="url"
+                type="text"
                 value={profileForm.profile_image}
-                onChange={(e) => setProfileForm({ ...profileForm, profile_image: e.target.value })}
+                onChange={(e) => setProfileForm({ ...profileForm, profile_image: e.target.value, profile_image_id: '' })}
                 className="mt-1"
                 placeholder="https://..."
               />
+              <Input
+                data-testid="profile-image-file"
+                type="file"
+                accept="image/*"
+                disabled={uploading}
+                onChange={(e) => handleImageUpload(e.target.files[0], setProfileForm, 'profile_image', 'profile_image_id')}
+                className="mt-2"
+              />
             </div>
 
             <div>
@@ -1083,12 +1122,20 @@ const fetchFeedback = async (photographerId) => {
               <Input
                 id="cover_image"
                 data-testid="profile-cover-input"
-                type="url"
+                type="text"
                 value={profileForm.cover_image}
-                onChange={(e) => setProfileForm({ ...profileForm, cover_image: e.target.value })}
+                onChange={(e) => setProfileForm({ ...profileForm, cover_image: e.target.value, cover_image_id: '' })}
                 className="mt-1"
                 placeholder="https://..."
               />
+              <Input
+                data-testid="profile-cover-file"
+                type="file"
+                accept="image/*"
+                disabled={uploading}
+                onChange={(e) => handleImageUpload(e.target.files[0], setProfileForm, 'cover_image', 'cover_image_id')}
+                className="mt-2"
+              />
             </div>
 
             <div>
@@ -1208,13 +1255,21 @@ const fetchFeedback = async (photographerId) => {
               <Input
                 id="image_url"
                 data-testid="portfolio-image-input"
-                type="url"
+                type="text"
                 value={portfolioForm.image_url}
-                onChange={(e) => setPortfolioForm({ ...portfolioForm, image_url: e.target.value })}
+                onChange={(e) => setPortfolioForm({ ...portfolioForm, image_url: e.target.value, image_id: '' })}
                 required
                 className="mt-1"
                 placeholder="https://..."
               />
+              <Input
+                data-testid="portfolio-image-file"
+                type="file"
+                accept="image/*"
+                disabled={uploading}
+                onChange={(e) => handleImageUpload(e.target.files[0], setPortfolioForm, 'image_url', 'image_id')}
+                className="mt-2"
+              />
             </div>
 
             <div className="flex gap-2 pt-4">
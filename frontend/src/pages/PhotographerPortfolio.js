@@ -2,6 +2,7 @@ import { useState, useEffect } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import axios from 'axios';
 import { API } from '@/App';
+import { imageSrc } from '@/lib/media';
 import { Button } from '@/components/ui/button';
 import { Camera, ArrowLeft } from 'lucide-react';
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs';
@@ -97,8 +98,9 @@ const PhotographerPortfolio = () => {
                     >
                       <div className="aspect-square overflow-hidden">
                         <img
-                          src={item.image_url}
+                          src={imageSrc(item.image_url, item.image_variants)}
                           alt={item.title}
+                          loading="lazy"
                           className="w-full h-full object-cover group-hover:scale-110 transition-transform duration-300"
                         />
                       </div>
@@ -126,7 +128,7 @@ const PhotographerPortfolio = () => {
         >
           <div className="max-w-5xl w-full">
             <img
-              src={selectedImage.image_url}
+              src={imageSrc(selectedImage.image_url, selectedImage.image_variants, 'full')}
               alt={selectedImage.title}
               className="w-full h-auto max-h-[85vh] object-contain rounded-lg"
             />
@@ -2,6 +2,8 @@ import { useState, useEffect } from "react";
 import { useNavigate } from "react-router-dom";
 import axios from "axios";
 import { API, toast } from "@/App";
+import { useEventStream } from "@/hooks/use-event-stream";
+import { imageSrc } from "@/lib/media";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import {
@@ -77,14 +79,30 @@ const UserDashboard = () => {
     const userData = localStorage.getItem("user");
     if (userData) {
       setUser(JSON.parse(userData));
-      fetchPhotographers();
       fetchMyBookings();
     }
   }, []);
 
-  const fetchPhotographers = async () => {
+  // Photographers' approvals and rejections arrive over the event stream
+  useEventStream({
+    booking_status: () => fetchMyBookings(),
+    resync: () => fetchMyBookings(),
+  });
+
+  // Search runs server-side; wait for the user to pause typing
+  useEffect(() => {
+    const timer = setTimeout(() => fetchPhotographers(searchQuery), 150);
+    return () => clearTimeout(timer);
+  }, [searchQuery]);
+
+  const fetchPhotographers = async (query = "") => {
     try {
-      const response = await axios.get(`${API}/photographers`);
+      // Type-ahead index handles partial words and typos; plain listing otherwise
+      const response = query.trim()
+        ? await axios.get(`${API}/photographers/typeahead`, {
+            params: { q: query.trim(), limit: 50 },
+          })
+        : await axios.get(`${API}/photographers/search`);
       setPhotographers(response.data || []);
     } catch (error) {
       toast.error("Failed to load photographers");
@@ -127,6 +145,7 @@ const UserDashboard = () => {
       const bookingData = {
         ...bookingForm,
         photographer_id: selectedPhotographer.user.id,
+        timezone: Intl.DateTimeFormat().resolvedOptions().timeZone,
       };
       await axios.post(`${API}/bookings`, bookingData);
       toast.success("Booking request sent successfully!");
@@ -241,20 +260,6 @@ const UserDashboard = () => {
     }
   };
 
-  const filteredPhotographers = photographers.filter((p) => {
-    const nameMatch = p?.user?.full_name
-      ?.toLowerCase()
-      ?.includes(searchQuery.toLowerCase());
-    const specialties = p?.profile?.specialties || [];
-    const specMatch = specialties.some((s) =>
-      s?.toLowerCase()?.includes(searchQuery.toLowerCase())
-    );
-    const locMatch = p?.profile?.location
-      ?.toLowerCase()
-      ?.includes(searchQuery.toLowerCase());
-    return Boolean(nameMatch || specMatch || locMatch);
-  });
-
   const getStatusColor = (status) => {
     switch (status) {
       case "approved":
@@ -309,7 +314,7 @@ const UserDashboard = () => {
             </div>
 
             <div className="grid md:grid-cols-2 lg:grid-cols-3 gap-6">
-              {filteredPhotographers.map((photographer) => (
+              {photographers.map((photographer) => (
                 <div
                   key={photographer?.user?.id}
                   className="bg-white rounded-xl shadow-sm border overflow-hidden hover:shadow-md transition-shadow"
@@ -320,7 +325,7 @@ const UserDashboard = () => {
                   >
                     <img
                       src={
-                        photographer?.profile?.cover_image ||
+                        imageSrc(photographer?.profile?.cover_image, photographer?.profile?.cover_image_variants) ||
                         "https://images.unsplash.com/photo-1542038784456-1ea8e935640e?w=600&q=80"
                       }
                       alt={photographer?.user?.full_name || "Cover"}
@@ -332,7 +337,7 @@ const UserDashboard = () => {
                     <div className="flex items-start gap-4 mb-4">
                       <img
                         src={
-                          photographer?.profile?.profile_image ||
+                          imageSrc(photographer?.profile?.profile_image, photographer?.profile?.profile_image_variants, "thumb") ||
                           `https://ui-avatars.com/api/?name=${encodeURIComponent(
                             photographer?.user?.full_name || "User"
                           )}&background=6366f1&color=fff`
@@ -395,7 +400,7 @@ const UserDashboard = () => {
               ))}
             </div>
 
-            {filteredPhotographers.length === 0 && (
+            {photographers.length === 0 && (
               <div className="text-center py-12">
                 <p className="text-gray-500">No photographers found</p>
               </div>
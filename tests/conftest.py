@@ -0,0 +1,14 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from tests.fake_mongo import FakeDatabase  # noqa: E402
+
+
+@pytest.fixture
+def fake_db():
+    return FakeDatabase()
@@ -0,0 +1,399 @@
+"""Tiny in-memory stand-in for a Motor database that counts issued commands.
+
+Only the query operators the backend actually uses are implemented; the point
+is to assert how many round trips an endpoint makes, not to emulate MongoDB.
+"""
+import re
+from datetime import datetime
+
+from pymongo.errors import DuplicateKeyError
+
+# BSON sorts values by type first; these are the types the backend stores
+_TYPE_ORDER = ((type(None), 0), (bool, 5), ((int, float), 1), (str, 2), (dict, 3), (list, 4), (datetime, 6))
+
+
+def _type_rank(value):
+    return next(rank for types, rank in _TYPE_ORDER if isinstance(value, types))
+
+
+def _sort_key(value):
+    return _type_rank(value), value
+
+
+def _comparable(value, arg):
+    # $lt / $gt and friends only match values of the argument's type
+    return value is not None and _type_rank(value) == _type_rank(arg)
+
+
+def _resolve(doc, path):
+    """Value at a dotted path; through an array, the list of its items' values."""
+    value = doc
+    for key in path.split("."):
+        if isinstance(value, list):
+            value = [item.get(key) for item in value if isinstance(item, dict)]
+        elif isinstance(value, dict):
+            value = value.get(key)
+        else:
+            return None
+    return value
+
+
+def _is_operator(cond):
+    return isinstance(cond, dict) and bool(cond) and all(k.startswith("$") for k in cond)
+
+
+def _satisfies(value, cond):
+    for op, arg in cond.items():
+        if op == "$in" and value not in arg:
+            return False
+        if op == "$ne" and value == arg:
+            return False
+        if op == "$lt" and not (_comparable(value, arg) and value < arg):
+            return False
+        if op == "$gt" and not (_comparable(value, arg) and value > arg):
+            return False
+        if op == "$gte" and not (_comparable(value, arg) and value >= arg):
+            return False
+        if op == "$lte" and not (_comparable(value, arg) and value <= arg):
+            return False
+        if op == "$regex" and not (isinstance(value, str) and re.search(arg, value)):
+            return False
+        if op == "$type" and type(value) is not {"string": str, "date": datetime}[arg]:
+            return False
+        if op == "$elemMatch" and not (isinstance(value, list) and any(_matches(item, arg) for item in value)):
+            return False
+        if op == "$not" and _satisfies(value, arg):
+            return False
+    return True
+
+
+def _matches(doc, query):
+    for field, cond in query.items():
+        if field == "$and":
+            if not all(_matches(doc, sub) for sub in cond):
+                return False
+            continue
+        if field == "$or":
+            if not any(_matches(doc, sub) for sub in cond):
+                return False
+            continue
+        value = _resolve(doc, field)
+        if isinstance(cond, dict):
+            if not _satisfies(value, cond):
+                return False
+        elif isinstance(value, list):
+            if cond not in value:
+                return False
+        elif value != cond:
+            return False
+    return True
+
+
+def _project(doc, projection):
+    if not projection:
+        return dict(doc)
+    excluded = {k for k, v in projection.items() if not v}
+    included = {k for k, v in projection.items() if v and k != "_id"}
+    if included:
+        if projection.get("_id", 1):
+            included.add("_id")  # like MongoDB, _id comes along unless excluded
+        projected = {k: v for k, v in doc.items() if k in included}
+        # computed fields, e.g. {"intervals": {"$filter": ...}}
+        projected.update({k: _evaluate(doc, v) for k, v in projection.items() if isinstance(v, dict)})
+        return projected
+    return {k: v for k, v in doc.items() if k not in excluded}
+
+
+class FakeCursor:
+    def __init__(self, collection, query, projection):
+        self._collection = collection
+        self._query = query
+        self._projection = projection
+        self._sort = []
+        self._limit = None
+        self._consumed = 0
+
+    def sort(self, keys, direction=None):
+        self._sort = [(keys, direction)] if isinstance(keys, str) else list(keys)
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    def limit(self, n):
+        self._limit = n
+        return self
+
+    async def to_list(self, length=None):
+        self._collection.database.commands.append(("find", self._collection.name))
+        docs = [d for d in self._collection.docs if _matches(d, self._query)]
+        for field, direction in reversed(self._sort):
+            docs.sort(key=lambda d: _sort_key(d.get(field)), reverse=direction < 0)
+        docs = [_project(d, self._projection) for d in docs]
+        if self._limit:
+            docs = docs[:self._limit]
+        # like a real cursor, repeated to_list() calls continue where the last stopped
+        docs = docs[self._consumed:]
+        if length:
+            docs = docs[:length]
+        self._consumed += len(docs)
+        return docs
+
+    async def __aiter__(self):
+        for doc in await self.to_list():
+            yield doc
+
+
+class FakeAggregateCursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    async def to_list(self, length=None):
+        return self._docs[:length] if length else list(self._docs)
+
+    async def __aiter__(self):
+        for doc in self._docs:
+            yield doc
+
+
+class FakeWriteResult:
+    def __init__(self, modified=0, deleted=0):
+        self.matched_count = self.modified_count = modified
+        self.deleted_count = deleted
+
+
+def _set_path(target, parts, value, array_filters):
+    key, rest = parts[0], parts[1:]
+    if key.startswith("$[") and key.endswith("]"):
+        # filtered positional operator: every item the named array filter matches
+        name = key[2:-1] + "."
+        spec = {k[len(name):]: v for f in array_filters for k, v in f.items() if k.startswith(name)}
+        for index, item in enumerate(target):
+            if _matches(item, spec):
+                if rest:
+                    _set_path(item, rest, value, array_filters)
+                else:
+                    target[index] = value
+        return
+    if not rest:
+        target[key] = value
+        return
+    _set_path(target.setdefault(key, {}), rest, value, array_filters)
+
+
+def _set(doc, fields, array_filters=()):
+    for path, value in fields.items():
+        _set_path(doc, path.split("."), value, array_filters)
+
+
+def _get(doc, path):
+    for key in path.split("."):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(key)
+    return doc
+
+
+def _evaluate(doc, expr, variables=None):
+    """The aggregation expressions the backend uses in update pipelines and projections."""
+    if isinstance(expr, str) and expr.startswith("$$"):
+        name, _, path = expr[2:].partition(".")
+        value = variables[name]
+        return _get(value, path) if path else value
+    if isinstance(expr, str) and expr.startswith("$"):
+        return _get(doc, expr[1:])
+    if not isinstance(expr, dict):
+        return expr
+    (op, args), = expr.items()
+    if op == "$filter":
+        items = _evaluate(doc, args["input"], variables) or []
+        return [item for item in items if _evaluate(doc, args["cond"], {**(variables or {}), args["as"]: item})]
+    if op == "$cond":
+        # only the branch taken is evaluated, as in MongoDB
+        condition, then, otherwise = args
+        return _evaluate(doc, then if _evaluate(doc, condition, variables) else otherwise, variables)
+    values = [_evaluate(doc, arg, variables) for arg in args]
+    if op == "$add":
+        return sum(values)
+    if op == "$ifNull":
+        return values[1] if values[0] is None else values[0]
+    if op == "$and":
+        return all(values)
+    if op == "$gt":
+        return values[0] > values[1]
+    if op == "$lt":
+        return values[0] < values[1]
+    if op == "$round":
+        return round(values[0], values[1])
+    if op == "$divide":
+        return values[0] / values[1]
+    raise NotImplementedError(op)
+
+
+def _apply_update(doc, update, array_filters=()):
+    """An update document ($set / $inc / $push / $pull) or a pipeline of $set stages."""
+    if isinstance(update, list):
+        for stage in update:
+            _set(doc, {path: _evaluate(doc, expr) for path, expr in stage["$set"].items()})
+        return
+    _set(doc, update.get("$set", {}), array_filters)
+    for field, delta in update.get("$inc", {}).items():
+        doc[field] = doc.get(field, 0) + delta
+    for field, value in update.get("$push", {}).items():
+        doc.setdefault(field, []).append(value)
+    for field, cond in update.get("$pull", {}).items():
+        doc[field] = [item for item in doc.get(field, []) if not _matches(item, cond)]
+
+
+def _upserted(query):
+    """The document an upsert creates: the query's equality fields."""
+    return {k: v for k, v in query.items() if not k.startswith("$") and not _is_operator(v)}
+
+
+def _summand(doc, expr):
+    if isinstance(expr, str):
+        return doc.get(expr[1:], 0)
+    if isinstance(expr, dict):
+        (field, value), then, otherwise = expr["$cond"][0]["$eq"], expr["$cond"][1], expr["$cond"][2]
+        return then if doc.get(field[1:]) == value else otherwise
+    return expr
+
+
+def _group(docs, spec):
+    groups = {}
+    for doc in docs:
+        key = doc.get(spec["_id"][1:])
+        row = groups.setdefault(key, {"_id": key, **{f: 0 for f in spec if f != "_id"}})
+        for field, acc in spec.items():
+            if field != "_id":
+                row[field] += _summand(doc, acc["$sum"])
+    return list(groups.values())
+
+
+class FakeCollection:
+    def __init__(self, database, name):
+        self.database = database
+        self.name = name
+        self.docs = []
+
+    def find(self, query=None, projection=None):
+        return FakeCursor(self, query or {}, projection)
+
+    async def find_one(self, query=None, projection=None):
+        self.database.commands.append(("find", self.name))
+        for doc in self.docs:
+            if _matches(doc, query or {}):
+                return _project(doc, projection)
+        return None
+
+    async def find_one_and_update(self, query, update, upsert=False, return_document=False, projection=None, sort=None,
+                                  session=None):
+        """$set / $inc / $setOnInsert or a $set pipeline; return_document as in pymongo (False = BEFORE)."""
+        self.database.commands.append(("findAndModify", self.name))
+        docs = [d for d in self.docs if _matches(d, query)]
+        for field, direction in reversed(sort or []):
+            docs.sort(key=lambda d: _sort_key(d.get(field)), reverse=direction < 0)
+        doc = docs[0] if docs else None
+        if doc is None:
+            if not upsert:
+                return None
+            doc = _upserted(query)
+            if isinstance(update, dict):
+                _set(doc, update.get("$setOnInsert", {}))
+            before = None
+            self.docs.append(doc)
+        else:
+            before = _project(doc, projection)
+        _apply_update(doc, update)
+        return _project(doc, projection) if return_document else before
+
+    async def distinct(self, key, query=None):
+        self.database.commands.append(("distinct", self.name))
+        values = []
+        for doc in self.docs:
+            if _matches(doc, query or {}) and doc.get(key) not in values:
+                values.append(doc.get(key))
+        return values
+
+    async def update_one(self, query, update, upsert=False, session=None, array_filters=()):
+        self.database.commands.append(("update", self.name))
+        doc = next((d for d in self.docs if _matches(d, query)), None)
+        if doc is None:
+            if not upsert:
+                return FakeWriteResult(0)
+            doc = _upserted(query)
+            if "_id" in doc and any(d.get("_id") == doc["_id"] for d in self.docs):
+                # the filter missed an existing document, so the upsert collides with it
+                raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} dup key: {{_id: {doc['_id']!r}}}")
+            _set(doc, update.get("$setOnInsert", {}))
+            self.docs.append(doc)
+        _apply_update(doc, update, array_filters)
+        return FakeWriteResult(1)
+
+    async def bulk_write(self, ops, ordered=True, session=None):
+        """UpdateOne; $set is applied, other updates (pipelines, $pull) only counted."""
+        self.database.commands.append(("bulkWrite", self.name))
+        modified = 0
+        for op in ops:
+            doc = next((d for d in self.docs if _matches(d, op._filter)), None)
+            if doc is not None:
+                if isinstance(op._doc, dict):
+                    _set(doc, op._doc.get("$set", {}))
+                modified += 1
+        return FakeWriteResult(modified)
+
+    async def delete_many(self, query, session=None):
+        self.database.commands.append(("delete", self.name))
+        kept = [d for d in self.docs if not _matches(d, query)]
+        deleted = len(self.docs) - len(kept)
+        self.docs = kept
+        return FakeWriteResult(deleted=deleted)
+
+    async def count_documents(self, query):
+        self.database.commands.append(("count", self.name))
+        return sum(1 for d in self.docs if _matches(d, query))
+
+    async def estimated_document_count(self):
+        self.database.commands.append(("count", self.name))
+        return len(self.docs)
+
+    async def replace_one(self, query, doc, upsert=False):
+        self.database.commands.append(("update", self.name))
+        self.docs = [d for d in self.docs if not _matches(d, query)]
+        self.docs.append({**{k: v for k, v in query.items() if not k.startswith("$")}, **doc})
+        return FakeWriteResult(1)
+
+    async def insert_one(self, doc, session=None):
+        self.database.commands.append(("insert", self.name))
+        self.docs.append(dict(doc))
+
+    def aggregate(self, pipeline, **kwargs):
+        """$match, and $group whose accumulators are $sum of a field, a constant or an $eq $cond."""
+        self.database.commands.append(("aggregate", self.name))
+        docs = list(self.docs)
+        for stage in pipeline:
+            if "$match" in stage:
+                docs = [d for d in docs if _matches(d, stage["$match"])]
+            elif "$group" in stage:
+                docs = _group(docs, stage["$group"])
+        return FakeAggregateCursor(docs)
+
+    async def insert_many(self, docs, ordered=True):
+        self.database.commands.append(("insert", self.name))
+        self.docs.extend(dict(d) for d in docs)
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.commands = []
+        self._collections = {}
+
+    def __getitem__(self, name):
+        if name not in self._collections:
+            self._collections[name] = FakeCollection(self, name)
+        return self._collections[name]
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
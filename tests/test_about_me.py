@@ -0,0 +1,37 @@
+import asyncio
+
+from api.about_me import copy_legacy_about_me
+from tests.fake_mongo import FakeDatabase
+
+
+def test_copy_from_the_legacy_database_keeps_existing_profiles(fake_db):
+    legacy = FakeDatabase()
+    legacy.about_me.docs = [
+        {"id": "a1", "user_id": "u1", "about": "old u1"},
+        {"id": "a2", "user_id": "u2", "about": "old u2"},
+        {"id": "a3", "user_id": "u3", "about": "old u3"},
+    ]
+    fake_db.about_me.docs = [{"id": "n2", "user_id": "u2", "about": "new u2"}]
+
+    first = asyncio.run(copy_legacy_about_me(legacy.about_me, fake_db.about_me, batch_size=2))
+    again = asyncio.run(copy_legacy_about_me(legacy.about_me, fake_db.about_me, batch_size=2))
+
+    assert first == (2, 1)
+    assert again == (0, 3)
+    by_user = {d["user_id"]: d["about"] for d in fake_db.about_me.docs}
+    assert by_user == {"u1": "old u1", "u2": "new u2", "u3": "old u3"}
+
+
+def test_copy_keeps_the_first_of_duplicated_legacy_profiles(fake_db):
+    legacy = FakeDatabase()
+    legacy.about_me.docs = [
+        {"_id": 1, "id": "a1", "user_id": "u1", "about": "first"},
+        {"_id": 2, "id": "a2", "user_id": "u2", "about": "u2"},
+        {"_id": 3, "id": "a3", "user_id": "u1", "about": "same batch"},
+        {"_id": 4, "id": "a4", "user_id": "u1", "about": "later batch"},
+    ]
+
+    copied = asyncio.run(copy_legacy_about_me(legacy.about_me, fake_db.about_me, batch_size=3))
+
+    assert copied == (2, 2)
+    assert sorted((d["user_id"], d["about"]) for d in fake_db.about_me.docs) == [("u1", "first"), ("u2", "u2")]
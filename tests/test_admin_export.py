@@ -0,0 +1,81 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from api import admin_export
+from api.admin_export import COLUMNS, export_collection
+from api.auth import User
+
+ADMIN = User(email="admin@example.com", full_name="Admin", role="admin")
+
+
+def _seed(db, n):
+    db.users.docs = [{"id": f"u{i}", "email": f"u{i}@example.com", "full_name": f"User {i}", "password": "hash"}
+                     for i in range(10)]
+    db.packages.docs = [{"id": f"pkg{i}", "name": f"Package {i}", "price": 100.0 * i} for i in range(3)]
+    db.bookings.docs = [
+        {"_id": i, "id": f"b{i}", "status": "pending", "user_id": f"u{i % 5}", "photographer_id": f"u{5 + i % 5}",
+         "package_id": f"pkg{i % 3}", "created_at": datetime(2025, 1, 1, tzinfo=timezone.utc)}
+        for i in range(n)
+    ]
+
+
+def _export(db, kind, fmt, user=ADMIN):
+    async def go():
+        response = await export_collection(kind, format=fmt, current_user=user, db=db)
+        chunks = [chunk async for chunk in response.body_iterator]
+        return response, b"".join(chunks).decode()
+
+    return asyncio.run(go())
+
+
+def test_ndjson_rows_are_enriched_with_a_bounded_number_of_queries(fake_db, monkeypatch):
+    monkeypatch.setattr(admin_export, "EXPORT_BATCH_SIZE", 10)
+    _seed(fake_db, 25)
+
+    response, body = _export(fake_db, "bookings", "ndjson")
+
+    rows = [json.loads(line) for line in body.splitlines()]
+    assert response.media_type == "application/x-ndjson"
+    assert len(rows) == 25
+    assert list(rows[7]) == COLUMNS["bookings"]
+    assert rows[7]["user_name"] == "User 2"
+    assert rows[7]["photographer_name"] == "User 7"
+    assert (rows[7]["package_name"], rows[7]["package_price"]) == ("Package 1", 100.0)
+    assert rows[7]["created_at"] == "2025-01-01T00:00:00+00:00"
+    # one bookings scan plus one users and one packages query per batch of 10, not per row
+    assert sorted(fake_db.commands) == [("find", "bookings")] + [("find", "packages")] * 3 + [("find", "users")] * 3
+
+
+def test_csv_has_a_header_and_one_line_per_document(fake_db):
+    _seed(fake_db, 3)
+
+    response, body = _export(fake_db, "users", "csv")
+
+    rows = list(csv.reader(io.StringIO(body)))
+    assert response.media_type == "text/csv"
+    assert response.headers["content-disposition"] == 'attachment; filename="users.csv"'
+    assert rows[0] == COLUMNS["users"]
+    assert len(rows) == 11
+    assert rows[1][:3] == ["u0", "u0@example.com", "User 0"]
+    assert "hash" not in body
+
+
+def test_unknown_format_is_rejected(fake_db):
+    with pytest.raises(HTTPException) as exc:
+        _export(fake_db, "users", "xlsx")
+    assert exc.value.status_code == 400
+
+
+def test_exports_are_admin_only(fake_db):
+    photographer = User(email="p@example.com", full_name="P", role="photographer")
+
+    with pytest.raises(HTTPException) as exc:
+        _export(fake_db, "users", "ndjson", user=photographer)
+    assert exc.value.status_code == 403
+    assert fake_db.commands == []
@@ -0,0 +1,36 @@
+import asyncio
+
+from api.admin_stats import COUNTERS_COLLECTION, get_stats, status_deltas
+
+
+def test_status_transition_moves_one_between_tracked_buckets():
+    assert status_deltas("photographers", ("pending", "approved"), "pending", "approved") == {
+        "pending_photographers": -1,
+        "approved_photographers": 1,
+    }
+
+
+def test_untracked_statuses_produce_no_deltas():
+    assert status_deltas("bookings", ("pending",), "approved", "cancelled") == {}
+    assert status_deltas("bookings", ("pending",), "pending", "pending") == {}
+
+
+def test_insert_and_delete():
+    assert status_deltas("reports", ("pending",), None, "pending") == {"pending_reports": 1}
+    assert status_deltas("photographers", ("pending", "approved"), "approved", None) == {"approved_photographers": -1}
+
+
+def test_fresh_stats_count_totals_exactly(fake_db, monkeypatch):
+    fake_db.bookings.docs = [{"id": "b1", "status": "pending"}, {"id": "b2", "status": "approved"}]
+    fake_db.reviews.docs = [{"id": "r1"}]
+
+    async def estimated():
+        raise AssertionError("fresh stats must not use collection metadata")
+
+    monkeypatch.setattr(fake_db.bookings, "estimated_document_count", estimated)
+    monkeypatch.setattr(fake_db.reviews, "estimated_document_count", estimated)
+
+    stats = asyncio.run(get_stats(fake_db, fresh=True))
+
+    assert (stats["total_bookings"], stats["pending_bookings"], stats["total_reviews"]) == (2, 1, 1)
+    assert fake_db[COUNTERS_COLLECTION].docs[0]["total_bookings"] == 2
@@ -0,0 +1,46 @@
+from collections import Counter
+
+from benchmarks.bench_load import compare, percentiles
+from benchmarks.seed import DEFAULT_VOLUMES, build_dataset
+
+VOLUMES = {**DEFAULT_VOLUMES, "users": 50, "photographers": 10, "bookings": 60, "reviews": 40, "reports": 6}
+
+
+def test_dataset_is_reproducible_and_consistent():
+    data = build_dataset(VOLUMES, seed=7)
+
+    assert data == build_dataset(VOLUMES, seed=7)
+    assert data != build_dataset(VOLUMES, seed=8)
+    assert len(data["users"]) == 1 + 50 + 10
+    assert len(data["portfolio_items"]) == 10 * VOLUMES["portfolio_per_photographer"]
+
+    approved = {p["user_id"] for p in data["photographer_profiles"] if p["approval_status"] == "approved"}
+    packages = {p["id"]: p["photographer_id"] for p in data["packages"]}
+    assert all(b["photographer_id"] in approved for b in data["bookings"])
+    assert all(packages[b["package_id"]] == b["photographer_id"] for b in data["bookings"])
+    # unique like the reviews index, and no photographer double-booked on a day
+    assert len({(r["photographer_id"], r["user_id"]) for r in data["reviews"]}) == 40
+    days = Counter((b["photographer_id"], b["booking_date"]) for b in data["bookings"])
+    assert max(days.values()) == 1
+    assert all(p["location_point"] for p in data["photographer_profiles"])
+
+
+def test_percentiles():
+    result = percentiles([float(n) for n in range(1, 101)])
+
+    assert result == {"p50": 50.5, "p95": 95.05, "p99": 99.01}
+    assert percentiles([3.0]) == {"p50": 3.0, "p95": 3.0, "p99": 3.0}
+
+
+def test_compare_reports_deltas_per_scenario():
+    before = {"scenarios": {"directory": {"latency_ms": {"p50": 10, "p95": 30, "p99": 50},
+                                          "throughput_ops": 100, "db_commands_per_op": 9}}}
+    after = {"scenarios": {
+        "directory": {"latency_ms": {"p50": 8, "p95": 20, "p99": 45}, "throughput_ops": 150, "db_commands_per_op": 5},
+        "login_burst": {"latency_ms": {"p50": 1, "p95": 1, "p99": 1}, "throughput_ops": 1, "db_commands_per_op": None},
+    }}
+
+    assert compare(before, after) == {"directory": {
+        "p50_ms_delta": -2, "p95_ms_delta": -10, "p99_ms_delta": -5,
+        "throughput_ratio": 1.5, "db_commands_delta": -4,
+    }}
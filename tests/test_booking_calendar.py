@@ -0,0 +1,134 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+import server
+from api import booking_calendar
+from api.booking_calendar import CALENDARS_COLLECTION, DEFAULT_BOOKING_DURATION, as_utc, booking_window, parse_duration
+
+NOON = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2 hours", timedelta(hours=2)),
+    ("1 hr 30 mins", timedelta(hours=1, minutes=30)),
+    ("1.5h", timedelta(hours=1, minutes=30)),
+    ("45 minutes", timedelta(minutes=45)),
+    ("Full day", timedelta(hours=10)),
+    ("Half Day coverage", timedelta(hours=5)),
+    ("2 days", timedelta(days=2)),
+    ("as long as needed", DEFAULT_BOOKING_DURATION),
+    (None, DEFAULT_BOOKING_DURATION),
+])
+def test_parse_duration(text, expected):
+    assert parse_duration(text) == expected
+
+
+def test_booking_window_converts_local_time_to_utc():
+    start, end = booking_window("2025-03-01", "18:30", "Asia/Kolkata", timedelta(hours=2))
+
+    assert start == datetime(2025, 3, 1, 13, 0, tzinfo=timezone.utc)
+    assert end - start == timedelta(hours=2)
+
+
+def test_booking_window_follows_dst():
+    winter, _ = booking_window("2025-01-15", "10:00", "Europe/Berlin", timedelta(hours=1))
+    summer, _ = booking_window("2025-07-15", "10:00", "Europe/Berlin", timedelta(hours=1))
+
+    assert (winter.hour, summer.hour) == (9, 8)
+
+
+@pytest.mark.parametrize("date, time, tz", [("15/01/2025", "10:00", None), ("2025-01-15", "noon", None), ("2025-01-15", "10:00", "Mars/Olympus")])
+def test_booking_window_rejects_bad_input(date, time, tz):
+    with pytest.raises(HTTPException) as exc:
+        booking_window(date, time, tz, timedelta(hours=1))
+    assert exc.value.status_code == 400
+
+
+def test_as_utc_treats_naive_values_as_utc():
+    assert as_utc(datetime(2025, 1, 1, 12)) == datetime(2025, 1, 1, 12, tzinfo=timezone.utc)
+
+
+def _slot(hour, hours=2):
+    start = NOON.replace(hour=hour)
+    return start, start + timedelta(hours=hours)
+
+
+def _intervals(db, photographer_id="p1"):
+    calendar = next(d for d in db[CALENDARS_COLLECTION].docs if d["_id"] == photographer_id)
+    return {i["booking_id"]: i["status"] for i in calendar["intervals"]}
+
+
+def test_pending_requests_share_a_slot_until_one_is_approved(fake_db):
+    async def go():
+        await booking_calendar.reserve(fake_db, "p1", "b1", *_slot(12))
+        await booking_calendar.reserve(fake_db, "p1", "b2", *_slot(13))
+        await booking_calendar.approve(fake_db, "p1", "b1", *_slot(12))
+        with pytest.raises(HTTPException) as overlapping:
+            await booking_calendar.reserve(fake_db, "p1", "b3", *_slot(13))
+        # touching the approved slot is not an overlap
+        await booking_calendar.reserve(fake_db, "p1", "b4", *_slot(14))
+        return overlapping.value
+
+    error = asyncio.run(go())
+
+    assert error.status_code == 409
+    assert _intervals(fake_db) == {"b1": "approved", "b2": "pending", "b4": "pending"}
+
+
+def test_approve_promotes_only_its_interval_and_refuses_double_booking(fake_db):
+    async def go():
+        for booking_id in ("b1", "b2"):
+            await booking_calendar.reserve(fake_db, "p1", booking_id, *_slot(12))
+        await booking_calendar.approve(fake_db, "p1", "b2", *_slot(12))
+        with pytest.raises(HTTPException) as conflict:
+            await booking_calendar.approve(fake_db, "p1", "b1", *_slot(12))
+        return conflict.value
+
+    error = asyncio.run(go())
+
+    assert error.status_code == 409
+    assert _intervals(fake_db) == {"b1": "pending", "b2": "approved"}
+
+
+def test_approve_reserves_bookings_that_predate_the_calendar(fake_db):
+    asyncio.run(booking_calendar.approve(fake_db, "p1", "old", *_slot(9)))
+
+    assert _intervals(fake_db) == {"old": "approved"}
+
+
+def test_release_frees_the_slot(fake_db):
+    async def go():
+        await booking_calendar.reserve(fake_db, "p1", "b1", *_slot(12), status="approved")
+        await booking_calendar.release(fake_db, "p1", "b1")
+        await booking_calendar.reserve(fake_db, "p1", "b2", *_slot(12))
+        await booking_calendar.approve(fake_db, "p1", "b2", *_slot(12))
+
+    asyncio.run(go())
+
+    assert _intervals(fake_db) == {"b2": "approved"}
+
+
+def test_availability_lists_busy_intervals_in_the_window(fake_db):
+    async def go():
+        await booking_calendar.reserve(fake_db, "p1", "late", *_slot(16))
+        await booking_calendar.reserve(fake_db, "p1", "early", *_slot(10), status="approved")
+        await booking_calendar.reserve(fake_db, "p1", "next-day", NOON + timedelta(days=1), NOON + timedelta(days=1, hours=2))
+        return await server.get_photographer_availability("p1", start=NOON.replace(hour=11), end=NOON.replace(hour=17), db=fake_db)
+
+    result = asyncio.run(go())
+
+    assert result["busy"] == [
+        {"start": NOON.replace(hour=10), "end": NOON.replace(hour=12), "status": "approved"},
+        {"start": NOON.replace(hour=16), "end": NOON.replace(hour=18), "status": "pending"},
+    ]
+    assert (result["from"], result["to"]) == (NOON.replace(hour=11), NOON.replace(hour=17))
+
+
+@pytest.mark.parametrize("days", [0, 93])
+def test_availability_rejects_empty_or_oversized_windows(fake_db, days):
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(server.get_photographer_availability("p1", start=NOON, end=NOON + timedelta(days=days), db=fake_db))
+    assert exc.value.status_code == 400
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+import server
+from api import bulk
+from api.auth import User
+from api.bulk import BulkCreate
+from api.media import variant_urls
+
+MEDIA_ID = "a" * 64
+PHOTOGRAPHER = User(id="p1", email="p1@example.com", full_name="P One", role="photographer")
+
+
+def _item(n, **extra):
+    return {"category": "Wedding", "title": f"Shot {n}", "description": "d", "image_url": f"https://img.example/{n}.jpg", **extra}
+
+
+def _package(n, **extra):
+    return {"name": f"Package {n}", "category": "Wedding", "description": "d", "price": 1000 + n,
+            "duration": "2 hours", "deliverables": ["Photos"], **extra}
+
+
+@pytest.fixture
+def approved(fake_db):
+    fake_db.photographer_profiles.docs = [{"user_id": "p1", "approval_status": "approved"}]
+    return fake_db
+
+
+def test_portfolio_bulk_is_one_insert_with_per_item_results(approved):
+    approved.media.docs = [{"_id": MEDIA_ID}]
+    items = [_item(0), {"title": "missing fields"}, _item(2, image_url=None, image_id=MEDIA_ID),
+             _item(3, image_url=None), _item(4, image_url=None, image_id="b" * 64)]
+
+    body = asyncio.run(server.create_portfolio_items_bulk(BulkCreate(items=items), PHOTOGRAPHER, approved))
+
+    assert (body["created"], body["failed"]) == (2, 3)
+    assert [r["status"] for r in body["results"]] == ["created", "failed", "created", "failed", "failed"]
+    assert "category: Field required" in body["results"][1]["error"]
+    assert body["results"][3]["error"] == "Provide image_url or image_id"
+    assert body["results"][4]["error"] == f"Unknown image: {'b' * 64}"
+
+    stored = approved.portfolio_items.docs
+    assert [d["id"] for d in stored] == [body["results"][0]["id"], body["results"][2]["id"]]
+    assert all(d["photographer_id"] == "p1" for d in stored)
+    assert stored[1]["image_variants"] == variant_urls(MEDIA_ID)
+    # approval, one media lookup, one insert_many, one cache bump
+    assert approved.commands.count(("insert", "portfolio_items")) == 1
+    assert approved.commands.count(("distinct", "media")) == 1
+    assert ("find", "media") not in approved.commands
+
+
+def test_portfolio_bulk_requires_an_approved_profile(fake_db):
+    fake_db.photographer_profiles.docs = [{"user_id": "p1", "approval_status": "pending"}]
+
+    with pytest.raises(server.HTTPException) as e:
+        asyncio.run(server.create_portfolio_items_bulk(BulkCreate(items=[_item(0)]), PHOTOGRAPHER, fake_db))
+
+    assert e.value.status_code == 403
+    assert fake_db.portfolio_items.docs == []
+
+
+def test_packages_bulk(fake_db):
+    items = [_package(0), _package(1, price="free"), _package(2)]
+
+    body = asyncio.run(server.create_packages_bulk(BulkCreate(items=items), PHOTOGRAPHER, fake_db))
+
+    assert (body["created"], body["failed"]) == (2, 1)
+    assert body["results"][1]["error"].startswith("price:")
+    assert [d["name"] for d in fake_db.packages.docs] == ["Package 0", "Package 2"]
+
+
+def test_batch_size_is_bounded():
+    with pytest.raises(ValueError):
+        BulkCreate(items=[_package(n) for n in range(bulk.BULK_MAX_ITEMS + 1)])
+    with pytest.raises(ValueError):
+        BulkCreate(items=[])
+
+
+class _RejectingCollection:
+    """insert_many that fails the documents at the given positions, like an unordered write."""
+
+    def __init__(self, rejected):
+        self.rejected = rejected
+        self.inserted = []
+
+    async def insert_many(self, docs, ordered=True):
+        assert ordered is False
+        self.inserted = [d for i, d in enumerate(docs) if i not in self.rejected]
+        raise BulkWriteError({"writeErrors": [
+            {"index": i, "code": 11000 if i == 0 else 121, "errmsg": "Document failed validation"} for i in self.rejected
+        ]})
+
+
+def test_insert_errors_map_back_to_request_positions():
+    collection = _RejectingCollection(rejected={0, 2})
+    # request items 1 and 3 failed validation earlier, so they are not sent
+    docs = {0: {"id": "a"}, 2: {"id": "b"}, 4: {"id": "c"}, 5: {"id": "d"}}
+
+    errors = asyncio.run(bulk.insert_items(collection, docs))
+
+    assert errors == {0: "Duplicate item", 4: "Document failed validation"}
+    assert [d["id"] for d in collection.inserted] == ["b", "d"]
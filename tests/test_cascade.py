@@ -0,0 +1,106 @@
+import asyncio
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from api import database
+from api.auth import ALGORITHM, SECRET_KEY, user_cache, user_from_token
+from api.cascade import CASCADE_DELETE, cascade_delete
+from api.job_handlers import RATING_RECOMPUTE
+from api.jobs import JOBS_COLLECTION
+from api.reviews_ratings import moderate_report
+
+
+@pytest.fixture(autouse=True)
+def standalone(monkeypatch):
+    monkeypatch.setattr(database, "_transactions", False)
+
+
+def _seed(db):
+    db.users.docs = [{"id": "bad", "role": "photographer"}, {"id": "p2", "role": "photographer"}, {"id": "u1", "role": "user"}]
+    db.photographer_profiles.docs = [
+        {"user_id": "bad", "approval_status": "approved"},
+        {"user_id": "p2", "approval_status": "approved", "rating_sum": 9, "rating_count": 2},
+    ]
+    db.portfolio_items.docs = [{"id": "i1", "photographer_id": "bad"}, {"id": "i2", "photographer_id": "p2"}]
+    db.packages.docs = [{"id": "k1", "photographer_id": "bad"}]
+    db.bookings.docs = [
+        {"id": "b1", "photographer_id": "bad", "user_id": "u1", "status": "confirmed"},
+        {"id": "b2", "photographer_id": "p2", "user_id": "bad", "status": "pending"},
+        {"id": "b3", "photographer_id": "p2", "user_id": "u1", "status": "pending"},
+    ]
+    db.reviews.docs = [
+        {"id": "r1", "photographer_id": "bad", "user_id": "u1", "rating": 1},
+        {"id": "r2", "photographer_id": "p2", "user_id": "bad", "rating": 5},
+    ]
+    db.reports.docs = [
+        {"id": "rep1", "photographer_id": "bad", "reporter_id": "u1", "status": "resolved"},
+        {"id": "rep2", "photographer_id": "bad", "reporter_id": "u1", "status": "pending"},
+    ]
+    db.notifications.docs = [
+        {"report_id": "rep1", "photographer_id": "bad"},
+        {"report_id": "rep2", "photographer_id": "bad"},
+    ]
+    db.about_me.docs = [{"user_id": "bad"}]
+    db.calendars.docs = [{"_id": "bad", "intervals": []}, {"_id": "p2", "intervals": [{"booking_id": "b2"}]}]
+
+
+def test_cascade_delete_removes_every_dependent(fake_db):
+    _seed(fake_db)
+    progress = {}
+
+    async def record(step, count):
+        progress[step] = count
+
+    result = asyncio.run(cascade_delete(fake_db, {"user_id": "bad", "keep_report_id": "rep1"}, record))
+
+    assert [u["id"] for u in fake_db.users.docs] == ["p2", "u1"]
+    assert [p["user_id"] for p in fake_db.photographer_profiles.docs] == ["p2"]
+    assert [i["id"] for i in fake_db.portfolio_items.docs] == ["i2"]
+    assert [b["id"] for b in fake_db.bookings.docs] == ["b3"]
+    assert fake_db.reviews.docs == []
+    assert fake_db.packages.docs == fake_db.about_me.docs == []
+    assert [c["_id"] for c in fake_db.calendars.docs] == ["p2"]
+    # the report behind the deletion and its notification stay as the moderation record
+    assert [r["id"] for r in fake_db.reports.docs] == ["rep1"]
+    assert [n["report_id"] for n in fake_db.notifications.docs] == ["rep1"]
+
+    # r2 on p2's profile is taken out of its aggregates by a follow-up job
+    assert result["ratings_recomputed"] == 1
+    assert [(j["type"], j["params"]) for j in fake_db[JOBS_COLLECTION].docs] == [(RATING_RECOMPUTE, {"photographer_id": "p2"})]
+    assert result["slots_released"] == 1  # b2 in p2's calendar
+    assert result["deleted"]["bookings"] == progress["bookings"] == 2
+    assert progress["users"] == 1
+
+
+def test_cascade_delete_is_a_no_op_the_second_time(fake_db):
+    _seed(fake_db)
+
+    async def ignore(step, count):
+        pass
+
+    asyncio.run(cascade_delete(fake_db, {"user_id": "bad", "keep_report_id": "rep1"}, ignore))
+    again = asyncio.run(cascade_delete(fake_db, {"user_id": "bad", "keep_report_id": "rep1"}, ignore))
+
+    assert sum(again["deleted"].values()) == 0
+    assert again["ratings_recomputed"] == again["slots_released"] == 0
+
+
+def test_delete_action_locks_the_user_out_before_the_job_runs(fake_db):
+    _seed(fake_db)
+    fake_db.users.docs[0].update(email="bad@example.com", full_name="Bad")
+    token = jwt.encode({"sub": "bad"}, SECRET_KEY, algorithm=ALGORITHM)
+    user_cache.clear()
+    assert asyncio.run(user_from_token(token, fake_db)).id == "bad"
+    assert user_cache.get("bad") is not None
+
+    result = asyncio.run(moderate_report("rep2", action="delete", admin_id="admin", db=fake_db))
+
+    job = next(j for j in fake_db[JOBS_COLLECTION].docs if j["type"] == CASCADE_DELETE)
+    assert (result["job_id"], job["status"]) == (job["id"], "queued")
+    assert user_cache.get("bad") is None
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(user_from_token(token, fake_db))
+    assert exc.value.status_code == 401
+    user_cache.clear()
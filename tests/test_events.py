@@ -0,0 +1,124 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+
+from api import events
+from api.events import EventBroker, event_from_change, format_sse
+
+
+def _change(coll, op, doc, token="82AB"):
+    return {"_id": {"_data": token}, "ns": {"db": "test", "coll": coll}, "operationType": op, "fullDocument": doc}
+
+
+def test_event_from_change_routes_to_recipients():
+    notification = event_from_change(_change("notifications", "insert", {"id": "n1", "photographer_id": "p1", "reporter_id": "u1"}))
+    created = event_from_change(_change("bookings", "insert", {"id": "b1", "photographer_id": "p1", "user_id": "u1"}))
+    status = event_from_change(_change("bookings", "update", {"id": "b1", "photographer_id": "p1", "user_id": "u1", "status": "approved"}))
+
+    assert (notification["type"], notification["recipients"]) == ("notification", ["p1", "u1"])
+    assert (created["type"], created["recipients"]) == ("booking_created", ["p1"])
+    assert (status["type"], sorted(status["recipients"])) == ("booking_status", ["p1", "u1"])
+    assert status["id"] == "82AB"
+
+
+def test_event_from_change_skips_deleted_documents():
+    assert event_from_change(_change("bookings", "update", None)) is None
+
+
+def test_publish_fans_out_to_every_connection_of_a_recipient():
+    async def run():
+        broker = EventBroker()
+        a, b, other = broker.subscribe("u1"), broker.subscribe("u1"), broker.subscribe("u2")
+        broker.publish("booking_status", ["u1"], {"id": "b1", "_id": object(), "at": datetime(2025, 1, 1, tzinfo=timezone.utc)})
+        return a.queue.qsize(), b.queue.qsize(), other.queue.qsize(), a.queue.get_nowait()
+
+    a, b, other, event = asyncio.run(run())
+
+    assert (a, b, other) == (1, 1, 0)
+    assert event["data"] == {"id": "b1", "at": "2025-01-01T00:00:00+00:00"}
+
+
+def test_publish_is_a_no_op_when_change_streams_feed_the_broker():
+    async def run():
+        broker = EventBroker()
+        broker.change_streams = True
+        subscription = broker.subscribe("u1")
+        broker.publish("notification", ["u1"], {"id": "n1"})
+        return subscription.queue.qsize()
+
+    assert asyncio.run(run()) == 0
+
+
+def test_slow_subscriber_is_cut_off_instead_of_blocking():
+    async def run():
+        broker = EventBroker(queue_size=2)
+        slow = broker.subscribe("u1")
+        for i in range(5):
+            broker.publish("notification", ["u1"], {"id": f"n{i}"})
+        return slow.overflowed, [slow.queue.get_nowait()["type"] for _ in range(slow.queue.qsize())]
+
+    overflowed, queued = asyncio.run(run())
+
+    assert overflowed
+    assert queued == ["overflow"]
+
+
+def test_missed_replays_local_events_for_the_user():
+    async def run():
+        broker = EventBroker()
+        for i in range(4):
+            broker.publish("notification", ["u1" if i % 2 else "u2"], {"id": f"n{i}"})
+        return await broker.missed("u1", "L-1"), await broker.missed("u1", "L-x")
+
+    missed, bad = asyncio.run(run())
+
+    assert [e["data"]["id"] for e in missed] == ["n1", "n3"]
+    assert bad is None
+
+
+def test_missed_reports_gap_once_replay_buffer_has_rolled_over():
+    async def run():
+        broker = EventBroker(replay_size=2)
+        for i in range(5):
+            broker.publish("notification", ["u1"], {"id": f"n{i}"})
+        return await broker.missed("u1", "L-1"), await broker.missed("u1", "L-3")
+
+    gone, recent = asyncio.run(run())
+
+    assert gone is None
+    assert [e["id"] for e in recent] == ["L-4", "L-5"]
+
+
+def test_event_stream_catches_up_then_streams_live_without_duplicates(monkeypatch):
+    broker = EventBroker()
+    monkeypatch.setattr(events, "broker", broker)
+
+    async def run():
+        broker.publish("notification", ["u1"], {"id": "n1"})
+        broker.publish("notification", ["u1"], {"id": "n2"})
+        stream = events.event_stream("u1", "L-1")
+        frames = [await stream.__anext__(), await stream.__anext__()]
+        broker.publish("booking_status", ["u1"], {"id": "b1"})
+        frames.append(await stream.__anext__())
+        await stream.aclose()
+        return frames
+
+    frames = asyncio.run(run())
+
+    assert frames[0].startswith("retry:")
+    assert frames[1] == format_sse({"id": "L-2", "type": "notification", "data": {"id": "n2"}})
+    assert frames[2].startswith("id: L-3\nevent: booking_status\n")
+    assert json.loads(frames[2].split("data: ")[1]) == {"id": "b1"}
+    assert broker.subscribers == {}
+
+
+def test_event_stream_asks_for_resync_when_events_are_lost(monkeypatch):
+    monkeypatch.setattr(events, "broker", EventBroker())
+
+    async def run():
+        stream = events.event_stream("u1", "82AB")
+        frames = [await stream.__anext__(), await stream.__anext__()]
+        await stream.aclose()
+        return frames
+
+    assert asyncio.run(run())[1].startswith("event: resync\n")
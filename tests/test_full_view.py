@@ -0,0 +1,66 @@
+import asyncio
+from collections import Counter
+
+import pytest
+
+from api.admin_insights import admin_photographer_full
+from api.auth import User
+from api.loaders import Loaders
+from api.reviews_ratings import get_photographer_full_view
+
+ADMIN = User(id="admin", email="admin@example.com", full_name="Admin", role="admin")
+
+
+def _created(i):
+    return f"2025-01-01T00:{i // 60:02d}:{i % 60:02d}+00:00"
+
+
+async def _seed(db, n):
+    await db.users.insert_many(
+        [{"id": "p1", "email": "p1@example.com", "full_name": "Asha Rao", "role": "photographer", "password": "x"}]
+        + [{"id": f"u{i}", "email": f"u{i}@example.com", "full_name": f"User {i}", "role": "user", "password": "x"} for i in range(n)]
+    )
+    await db.photographer_profiles.insert_many([{"user_id": "p1", "bio": "bio", "approval_status": "approved"}])
+    await db.about_me.insert_many([{"user_id": "p1", "about": "hello"}])
+    for collection, extra in (
+        ("portfolio_items", {}),
+        ("packages", {}),
+        ("reviews", {"rating": 5}),
+        ("reports", {"reason": "Spam", "status": "pending"}),
+    ):
+        await db[collection].insert_many([
+            {"id": f"{collection}-{i}", "photographer_id": "p1", "user_id": f"u{i}", "reporter_id": f"u{i}",
+             "created_at": _created(i), **extra}
+            for i in range(n)
+        ])
+    db.commands.clear()
+
+
+@pytest.mark.parametrize("n", [0, 3, 30])
+def test_admin_full_view_issues_constant_queries(fake_db, n):
+    asyncio.run(_seed(fake_db, n))
+
+    view = asyncio.run(admin_photographer_full("p1", 20, current_user=ADMIN, loaders=Loaders(fake_db), db=fake_db))
+
+    assert view.user["full_name"] == "Asha Rao" and "password" not in view.user
+    assert len(view.reviews) == min(n, 20)
+    if n:
+        assert view.reviews[0]["reviewer"]["full_name"] == f"User {n - 1}"
+    assert (view.next_cursors["reports"] is not None) == (n > 20)
+    # 3 lookups + 4 section pages at once, then one batched reviewer/reporter fetch
+    assert Counter(fake_db.commands) == Counter(
+        [("find", "users"), ("find", "photographer_profiles"), ("find", "about_me"),
+         ("find", "portfolio_items"), ("find", "packages"), ("find", "reviews"), ("find", "reports")]
+        + ([("find", "users")] if n else [])
+    )
+
+
+def test_public_full_view_keeps_its_shape(fake_db):
+    asyncio.run(_seed(fake_db, 2))
+
+    view = asyncio.run(get_photographer_full_view("p1", 20, loaders=Loaders(fake_db), db=fake_db))
+
+    assert view["user"] == {"full_name": "Asha Rao", "email": "p1@example.com", "role": "photographer"}
+    assert "about_me" not in view
+    assert view["reports"][0]["reporter"] == {"full_name": "User 1", "email": "u1@example.com"}
+    assert view["next_cursors"] == {"portfolio": None, "packages": None, "reviews": None, "reports": None}
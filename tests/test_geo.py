@@ -0,0 +1,35 @@
+import pytest
+
+from api.geo import location_point, resolve_location
+from api.photographer_search import near_pipeline, search_fields
+
+PUNE = (73.8567, 18.5204)
+
+
+@pytest.mark.parametrize("text", ["Pune", "  pune ", "Poona", "Koregaon Park, Pune", "Pune, Maharashtra", "Baner Pune"])
+def test_resolves_free_text_locations(text):
+    assert resolve_location(text) == PUNE
+
+
+def test_aliases_and_unknown_places():
+    assert resolve_location("Bangalore") == resolve_location("Bengaluru")
+    assert resolve_location("Atlantis") is None
+    assert resolve_location("") is None
+    assert location_point("Atlantis") is None
+
+
+def test_profile_writes_store_geojson_point():
+    fields = search_fields(location="Viman Nagar, Pune")
+
+    assert fields["location_point"] == {"type": "Point", "coordinates": list(PUNE)}
+    assert fields["location_lc"] == "viman nagar, pune"
+
+
+def test_near_pipeline_filters_inside_geonear():
+    pipeline = near_pipeline(73.85, 18.52, 10, "Wedding", offset=20, limit=11)
+
+    geo_near = pipeline[0]["$geoNear"]
+    assert geo_near["near"]["coordinates"] == [73.85, 18.52]
+    assert geo_near["maxDistance"] == 10_000
+    assert geo_near["query"] == {"approval_status": "approved", "specialties": "Wedding"}
+    assert pipeline[1:3] == [{"$skip": 20}, {"$limit": 11}]
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+import server
+from api import http_cache
+from api.http_cache import etag_matches, response_cache
+from api.pagination import PageParams
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    response_cache.clear()
+    yield
+    response_cache.clear()
+
+
+def _request(if_none_match=None, query=b""):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "query_string": query, "headers": headers})
+
+
+def _seed(db):
+    asyncio.run(db.packages.insert_many([
+        {"id": "pkg-1", "photographer_id": "p1", "name": "Basic", "type": "predefined", "category": "Wedding", "description": "d", "price": 100.0,
+         "duration": "2h", "deliverables": ["photos"], "created_at": "2025-01-01T00:00:00+00:00"},
+    ]))
+    db.commands.clear()
+
+
+def _get(db, **kwargs):
+    return asyncio.run(server.get_photographer_packages("p1", _request(**kwargs), PageParams(limit=100, cursor=None), db=db))
+
+
+def test_etag_comparison():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc", "def"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+def test_repeat_requests_cost_no_database_work(fake_db):
+    _seed(fake_db)
+
+    first = _get(fake_db)
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"].startswith("public")
+    etag = first.headers["ETag"]
+
+    fake_db.commands.clear()
+    again = _get(fake_db)
+    revalidated = _get(fake_db, if_none_match=etag)
+
+    assert again.body == first.body and again.headers["ETag"] == etag
+    assert revalidated.status_code == 304 and revalidated.body == b""
+    assert fake_db.commands == []
+
+
+def test_writes_bump_the_version_and_invalidate(fake_db):
+    _seed(fake_db)
+    etag = _get(fake_db).headers["ETag"]
+
+    asyncio.run(fake_db.packages.insert_many([
+        {"id": "pkg-2", "photographer_id": "p1", "name": "Premium", "type": "predefined", "category": "Wedding", "description": "d", "price": 300.0,
+         "duration": "6h", "deliverables": ["photos"], "created_at": "2025-01-02T00:00:00+00:00"},
+    ]))
+    asyncio.run(response_cache.bump(fake_db, "p1", http_cache.PACKAGES))
+
+    response = _get(fake_db, if_none_match=etag)
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert b"Premium" in response.body
+
+
+def test_query_strings_are_cached_separately(fake_db):
+    _seed(fake_db)
+
+    assert _get(fake_db).headers["ETag"] == _get(fake_db, query=b"limit=100").headers["ETag"]
+    assert len(response_cache._bodies) == 2
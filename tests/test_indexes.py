@@ -0,0 +1,18 @@
+from api.indexes import INDEXES, QUERY_SHAPES, plan_stages
+
+
+def test_plan_stages_flags_nested_collscan():
+    plan = {
+        "stage": "PROJECTION_SIMPLE",
+        "inputStage": {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}},
+    }
+    assert plan_stages(plan) == ["PROJECTION_SIMPLE", "SORT", "COLLSCAN"]
+
+
+def test_plan_stages_walks_or_branches():
+    plan = {"stage": "FETCH", "inputStage": {"stage": "OR", "inputStages": [{"stage": "IXSCAN"}, {"stage": "IXSCAN"}]}}
+    assert "COLLSCAN" not in plan_stages(plan)
+
+
+def test_every_audited_collection_has_registered_indexes():
+    assert {shape["collection"] for shape in QUERY_SHAPES} <= set(INDEXES)
@@ -0,0 +1,288 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from api import events, jobs
+from api.cascade import CASCADE_DELETE, cascade_delete
+from api.job_handlers import RATING_RECOMPUTE, REPORT_NOTIFICATION, recompute_rating, send_report_notification
+from api.jobs import DEAD, JOBS_COLLECTION, QUEUED, RUNNING, SUCCEEDED, JobRunner, job_runner
+
+
+def _job(db, job_id):
+    return next(j for j in db[JOBS_COLLECTION].docs if j["id"] == job_id)
+
+
+def _due(db, job_id):
+    _job(db, job_id)["run_at"] = datetime.now(timezone.utc)
+
+
+def test_job_runs_and_records_progress_and_result(fake_db):
+    runner = JobRunner()
+
+    async def count(db, params, progress):
+        await progress("items", params["n"])
+        return {"done": params["n"]}
+
+    runner.register("count", count)
+
+    async def go():
+        job = await runner.enqueue(fake_db, "count", {"n": 3})
+        assert await runner.run_once(fake_db)
+        assert not await runner.run_once(fake_db)
+        return job
+
+    job = _job(fake_db, asyncio.run(go())["id"])
+    assert job["status"] == SUCCEEDED
+    assert job["progress"] == {"items": 3}
+    assert job["result"] == {"done": 3}
+    assert job["attempts"] == 1
+    assert job["lease_until"] is None
+
+
+def test_failures_back_off_then_dead_letter(fake_db):
+    runner = JobRunner()
+
+    async def broken(db, params, progress):
+        raise RuntimeError("smtp down")
+
+    runner.register("broken", broken, max_attempts=2)
+
+    async def go():
+        job = await runner.enqueue(fake_db, "broken", {})
+        await runner.run_once(fake_db)
+        first = dict(_job(fake_db, job["id"]))
+        # not due again until the backoff has passed
+        assert not await runner.run_once(fake_db)
+        _due(fake_db, job["id"])
+        await runner.run_once(fake_db)
+        return first, _job(fake_db, job["id"])
+
+    first, last = asyncio.run(go())
+    assert first["status"] == QUEUED
+    assert first["run_at"] > datetime.now(timezone.utc)
+    assert first["error"] == "RuntimeError: smtp down"
+    assert last["status"] == DEAD
+    assert last["attempts"] == 2
+
+
+def test_dead_job_can_be_retried(fake_db):
+    runner = JobRunner()
+    calls = []
+
+    async def flaky(db, params, progress):
+        calls.append(params)
+        if len(calls) == 1:
+            raise RuntimeError("primary stepped down")
+        return {"ok": True}
+
+    runner.register("flaky", flaky, max_attempts=1)
+
+    async def go():
+        job = await runner.enqueue(fake_db, "flaky", {})
+        await runner.run_once(fake_db)
+        assert _job(fake_db, job["id"])["status"] == DEAD
+        assert await runner.retry(fake_db, job["id"])
+        # only dead jobs are retried
+        await runner.run_once(fake_db)
+        assert not await runner.retry(fake_db, job["id"])
+        return _job(fake_db, job["id"])
+
+    job = asyncio.run(go())
+    assert job["status"] == SUCCEEDED
+    assert job["attempts"] == 1
+    assert len(calls) == 2
+
+
+def test_lapsed_lease_is_claimed_again(fake_db):
+    runner = JobRunner()
+    runner.register("noop", lambda db, params, progress: asyncio.sleep(0, {}))
+    now = datetime.now(timezone.utc)
+    fake_db[JOBS_COLLECTION].docs = [
+        {"id": "held", "type": "noop", "params": {}, "status": RUNNING, "attempts": 1, "max_attempts": 5,
+         "run_at": now - timedelta(minutes=5), "lease_until": now + timedelta(seconds=30), "worker": "other"},
+        {"id": "orphan", "type": "noop", "params": {}, "status": RUNNING, "attempts": 1, "max_attempts": 5,
+         "run_at": now - timedelta(minutes=5), "lease_until": now - timedelta(seconds=1), "worker": "dead"},
+    ]
+
+    claimed = asyncio.run(runner.claim(fake_db))
+
+    assert claimed["id"] == "orphan"
+    assert claimed["worker"] == runner.worker_id
+    assert claimed["attempts"] == 2
+    assert _job(fake_db, "held")["worker"] == "other"
+
+
+def test_concurrency_limit_per_type(fake_db):
+    runner = JobRunner()
+    runner.register("slow", lambda db, params, progress: asyncio.sleep(0, {}), concurrency=1)
+    runner.register("fast", lambda db, params, progress: asyncio.sleep(0, {}))
+    runner._running["slow"] = 1
+
+    async def go():
+        await runner.enqueue(fake_db, "slow", {})
+        await runner.enqueue(fake_db, "fast", {})
+        return await runner.claim(fake_db), await runner.claim(fake_db)
+
+    first, second = asyncio.run(go())
+    assert first["type"] == "fast"
+    assert second is None
+
+
+def test_concurrent_claims_respect_the_limit(fake_db, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_POLL_SECONDS", 0.01)
+    runner = JobRunner()
+    running, peak, done = [], [], []
+
+    async def slow(db, params, progress):
+        running.append(params["n"])
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(params["n"])
+        done.append(params["n"])
+        return {}
+
+    runner.register("slow", slow, concurrency=1)
+    collection = fake_db[JOBS_COLLECTION]
+    find_one_and_update = collection.find_one_and_update
+
+    async def round_trip(*args, **kwargs):
+        # other pool tasks look for work while this claim is in flight
+        await asyncio.sleep(0.005)
+        return await find_one_and_update(*args, **kwargs)
+
+    collection.find_one_and_update = round_trip
+
+    async def go():
+        for n in range(3):
+            await runner.enqueue(fake_db, "slow", {"n": n})
+        runner.start(fake_db, workers=3)
+        for _ in range(100):
+            if len(done) == 3:
+                break
+            await asyncio.sleep(0.01)
+        await runner.stop()
+
+    asyncio.run(go())
+    assert sorted(done) == [0, 1, 2]
+    assert max(peak) == 1
+    assert runner._running["slow"] == 0
+
+
+def test_lost_lease_cancels_the_handler(fake_db, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_LEASE_SECONDS", 0.03)
+    runner = JobRunner()
+    cancelled = []
+
+    async def long(db, params, progress):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    runner.register("long", long)
+
+    async def go():
+        job = await runner.enqueue(fake_db, "long", {})
+        claimed = await runner.claim(fake_db)
+        # another worker takes over the job, e.g. after a long GC pause here
+        _job(fake_db, job["id"])["worker"] = "other"
+        await asyncio.wait_for(runner.execute(fake_db, claimed), 1)
+        return _job(fake_db, job["id"])
+
+    job = asyncio.run(go())
+    assert cancelled == [True]
+    # the new owner's state is left alone
+    assert job["status"] == RUNNING
+    assert job["worker"] == "other"
+    assert runner._running["long"] == 0
+
+
+def test_pool_drains_jobs_enqueued_in_process(fake_db, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_POLL_SECONDS", 5)
+    runner = JobRunner()
+    done = []
+
+    async def record(db, params, progress):
+        done.append(params["n"])
+        return {}
+
+    runner.register("record", record)
+
+    async def go():
+        runner.start(fake_db, workers=2)
+        for n in range(4):
+            await runner.enqueue(fake_db, "record", {"n": n})
+        # woken by enqueue, long before the 5s poll
+        for _ in range(50):
+            if len(done) == 4:
+                break
+            await asyncio.sleep(0.01)
+        await runner.stop()
+
+    asyncio.run(go())
+    assert sorted(done) == [0, 1, 2, 3]
+
+
+def test_transactional_enqueue_leaves_the_wake_to_the_caller(fake_db):
+    runner = JobRunner()
+    runner.register("record", lambda db, params, progress: {})
+
+    async def go():
+        runner._wake = asyncio.Event()
+        await runner.enqueue(fake_db, "record", {}, session=object())
+        woken_before_commit = runner._wake.is_set()
+        runner.wake()
+        return woken_before_commit, runner._wake.is_set()
+
+    assert asyncio.run(go()) == (False, True)
+
+
+def test_report_notification_is_inserted_once(fake_db):
+    notification = {"id": "n1", "report_id": "r1", "photographer_id": "p1", "reporter_id": "u1", "message": "hi"}
+
+    async def ignore(step, count):
+        pass
+
+    async def go():
+        subscription = events.broker.subscribe("p1")
+        try:
+            for _ in range(2):
+                await send_report_notification(fake_db, {"notification": notification}, ignore)
+        finally:
+            events.broker.unsubscribe(subscription)
+        return subscription.queue.qsize()
+
+    # the request path publishes it (local mode) or change streams do, never a rerun
+    assert asyncio.run(go()) == 0
+    assert fake_db.notifications.docs == [notification]
+
+
+def test_rating_recompute_converges_on_the_reviews(fake_db):
+    fake_db.photographer_profiles.docs = [{"user_id": "p1", "rating_sum": 99, "rating_count": 1, "average_rating": 99}]
+    fake_db.reviews.docs = [
+        {"photographer_id": "p1", "rating": 5},
+        {"photographer_id": "p1", "rating": 4},
+        {"photographer_id": "p2", "rating": 1},
+    ]
+
+    async def ignore(step, count):
+        pass
+
+    result = asyncio.run(recompute_rating(fake_db, {"photographer_id": "p1"}, ignore))
+
+    profile = fake_db.photographer_profiles.docs[0]
+    assert result == {"average_rating": 4.5, "rating_count": 2}
+    assert profile["rating_sum"] == 9
+    assert profile["rating_histogram"] == {"1": 0, "2": 0, "3": 0, "4": 1, "5": 1}
+
+
+@pytest.mark.parametrize("kind", [CASCADE_DELETE, REPORT_NOTIFICATION, RATING_RECOMPUTE])
+def test_handlers_are_registered(kind):
+    assert kind in job_runner.types
+
+
+def test_cascade_runs_one_at_a_time():
+    assert job_runner.types[CASCADE_DELETE].handler is cascade_delete
+    assert job_runner.types[CASCADE_DELETE].concurrency == 1
@@ -0,0 +1,55 @@
+import asyncio
+
+from fastapi import Response
+
+import server
+from api.loaders import BatchLoader, Loaders
+from api.pagination import PageParams
+
+
+def test_batch_loader_coalesces_dedupes_and_memoizes(fake_db):
+    async def scenario():
+        await fake_db.users.insert_many([{"id": "a"}, {"id": "b"}])
+        fake_db.commands.clear()
+        loader = BatchLoader(fake_db.users, "id")
+
+        first, second, again = await asyncio.gather(loader.load("a"), loader.load("b"), loader.load("a"))
+        batch = await loader.load_many(["a", "b", "missing", "a"])
+        return first, second, again, batch
+
+    first, second, again, batch = asyncio.run(scenario())
+
+    assert first == again == {"id": "a"}
+    assert second == {"id": "b"}
+    assert batch == {"a": {"id": "a"}, "b": {"id": "b"}, "missing": None}
+    assert fake_db.commands == [("find", "users"), ("find", "users")]
+
+
+def test_admin_bookings_issue_one_query_per_collection(fake_db):
+    admin = server.User(email="admin@example.com", full_name="Admin", role="admin")
+
+    async def scenario():
+        await fake_db.users.insert_many(
+            [{"id": f"u{i}", "email": f"u{i}@example.com"} for i in range(20)]
+        )
+        await fake_db.packages.insert_many([{"id": f"pkg{i}"} for i in range(5)])
+        await fake_db.bookings.insert_many([
+            {
+                "id": f"b{i}",
+                "user_id": f"u{i % 10}",
+                "photographer_id": f"u{10 + i % 5}",
+                "package_id": f"pkg{i % 5}",
+                "created_at": f"2025-01-01T00:{i // 60:02d}:{i % 60:02d}",
+            }
+            for i in range(1000)
+        ])
+        fake_db.commands.clear()
+        return await server.get_all_bookings(
+            Response(), PageParams(limit=500, cursor=None), current_user=admin, loaders=Loaders(fake_db), db=fake_db
+        )
+
+    result = asyncio.run(scenario())
+
+    assert len(result) == 500
+    assert result[0]["package"] == {"id": "pkg4"}
+    assert sorted(fake_db.commands) == [("find", "bookings"), ("find", "packages"), ("find", "users")]
@@ -0,0 +1,161 @@
+import asyncio
+import hashlib
+import io
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from api import media
+from api.media import attach_images, get_image, store_upload, variant_urls
+
+MEDIA_ID = hashlib.sha256(b"image").hexdigest()
+FIELDS = {"image_id": ("image_url", "image_variants")}
+
+
+async def _chunks(*parts):
+    for part in parts:
+        yield part
+
+
+@pytest.fixture(autouse=True)
+def media_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(media, "MEDIA_ROOT", tmp_path)
+    return tmp_path
+
+
+def test_variant_urls_cover_every_size_and_format():
+    urls = variant_urls(MEDIA_ID)
+
+    assert set(urls) == {"thumb", "card", "full"}
+    assert urls["thumb"]["webp"] == f"/api/media/{MEDIA_ID}/thumb.webp"
+    assert urls["full"]["jpeg"] == f"/api/media/{MEDIA_ID}/full.jpeg"
+
+
+def test_attach_images_replaces_id_with_urls(fake_db):
+    fake_db.media.docs = [{"_id": MEDIA_ID}]
+
+    data = asyncio.run(attach_images(fake_db, {"title": "t", "image_url": None, "image_id": MEDIA_ID}, FIELDS))
+
+    assert "image_id" not in data
+    assert data["image_url"] == f"/api/media/{MEDIA_ID}/full.jpeg"
+    assert data["image_variants"] == variant_urls(MEDIA_ID)
+
+
+def test_attach_images_clears_variants_for_external_url(fake_db):
+    data = asyncio.run(attach_images(fake_db, {"image_url": "https://example.com/a.jpg"}, FIELDS))
+
+    assert data == {"image_url": "https://example.com/a.jpg", "image_variants": None}
+
+
+def test_attach_images_keeps_variants_of_a_resubmitted_upload(fake_db):
+    url = f"/api/media/{MEDIA_ID}/full.jpeg"
+
+    data = asyncio.run(attach_images(fake_db, {"image_url": url, "image_id": ""}, FIELDS))
+
+    assert data == {"image_url": url, "image_variants": variant_urls(MEDIA_ID)}
+
+
+@pytest.mark.parametrize("media_id", [hashlib.sha256(b"other").hexdigest(), "../../etc/passwd"])
+def test_attach_images_rejects_unknown_ids(fake_db, media_id):
+    fake_db.media.docs = [{"_id": MEDIA_ID}]
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(attach_images(fake_db, {"image_id": media_id}, FIELDS))
+
+    assert exc.value.status_code == 400
+
+
+def test_store_upload_rejects_non_images(fake_db):
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(store_upload(fake_db, "p1", "application/pdf", _chunks(b"%PDF")))
+
+    assert exc.value.status_code == 415
+
+
+def test_store_upload_stops_reading_past_the_size_limit(fake_db, media_root, monkeypatch):
+    monkeypatch.setattr(media, "MEDIA_MAX_UPLOAD_BYTES", 10)
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(store_upload(fake_db, "p1", "image/png", _chunks(b"x" * 8, b"x" * 8)))
+
+    assert exc.value.status_code == 413
+    assert list((media_root / "tmp").iterdir()) == []
+
+
+def test_store_upload_returns_known_content_without_processing(fake_db):
+    fake_db.media.docs = [{"_id": MEDIA_ID, "width": 800, "height": 600}]
+
+    uploaded = asyncio.run(store_upload(fake_db, "p2", "image/jpeg", _chunks(b"ima", b"ge")))
+
+    assert uploaded["id"] == MEDIA_ID
+    assert (uploaded["width"], uploaded["height"]) == (800, 600)
+    assert ("insert", "media") not in fake_db.commands
+
+
+def test_store_upload_writes_to_disk_in_blocks_off_the_event_loop(fake_db, media_root, monkeypatch):
+    monkeypatch.setattr(media, "MEDIA_WRITE_BLOCK_BYTES", 4)
+    fdopen = media.os.fdopen
+    writes = []
+
+    class Recording(io.FileIO):
+        def write(self, data):
+            writes.append((bytes(data), threading.get_ident()))
+            return super().write(data)
+
+    monkeypatch.setattr(media.os, "fdopen", lambda fd, mode: Recording(fd, "w") if mode == "wb" else fdopen(fd, mode))
+
+    async def render(source, target):
+        assert source.read_bytes() == b"image"
+        return {"sizes": {"full": [8, 6]}}
+
+    monkeypatch.setattr(media.media_processor, "render", render)
+
+    uploaded = asyncio.run(store_upload(fake_db, "p1", "image/png", _chunks(b"im", b"ag", b"e")))
+
+    assert uploaded["id"] == MEDIA_ID
+    assert [data for data, _ in writes] == [b"imag", b"e"]
+    assert threading.get_ident() not in {thread for _, thread in writes}
+    assert list((media_root / "tmp").iterdir()) == []
+
+
+@pytest.mark.parametrize("name", ["thumb.gif", "huge.webp", "original", "card"])
+def test_get_image_only_serves_variants(name):
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(get_image(MEDIA_ID, name))
+
+    assert exc.value.status_code == 404
+
+
+def test_get_image_is_immutable(media_root):
+    path = media.media_dir(MEDIA_ID)
+    path.mkdir(parents=True)
+    (path / "card.webp").write_bytes(b"RIFF")
+
+    response = asyncio.run(get_image(MEDIA_ID, "card.webp"))
+
+    assert response.media_type == "image/webp"
+    assert "immutable" in response.headers["cache-control"]
+
+
+def test_render_variants_resizes_without_upscaling(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    source = tmp_path / "original"
+    buffer = io.BytesIO()
+    Image.new("RGBA", (3000, 1500), (200, 10, 10, 128)).save(buffer, "PNG")
+    source.write_bytes(buffer.getvalue())
+
+    rendered = media.render_variants(str(source), str(tmp_path))
+
+    assert rendered["sizes"] == {"full": [2048, 1024], "card": [960, 480], "thumb": [320, 160]}
+    with Image.open(tmp_path / "thumb.jpeg") as thumb:
+        assert (thumb.format, thumb.mode, thumb.size) == ("JPEG", "RGB", (320, 160))
+
+
+def test_render_variants_rejects_garbage(tmp_path):
+    pytest.importorskip("PIL")
+    source = tmp_path / "original"
+    source.write_bytes(b"not an image")
+
+    with pytest.raises(ValueError):
+        media.render_variants(str(source), str(tmp_path))
@@ -0,0 +1,115 @@
+import asyncio
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+
+from api import metrics
+from api.metrics import QUERY_COUNT_HEADER, CommandTimer, Counter, Histogram, MetricsMiddleware, Registry
+
+
+def _command(timer, name, command, request_id, duration_micros=1500, failed=False):
+    started = SimpleNamespace(connection_id=("db", 27017), request_id=request_id, command_name=name, command=command)
+    timer.started(started)
+    finished = SimpleNamespace(connection_id=("db", 27017), request_id=request_id, command_name=name,
+                               duration_micros=duration_micros)
+    (timer.failed if failed else timer.succeeded)(finished)
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    latency = registry.register(Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1)))
+    hits = registry.register(Counter("hits_total", "Hits.", ("route",)))
+    for value in (0.05, 0.5, 3):
+        latency.observe(value, ("/a",))
+    hits.inc(("/a",), 2)
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE latency_seconds histogram" in lines
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'latency_seconds_sum{route="/a"} 3.55' in lines
+    assert 'latency_seconds_count{route="/a"} 3' in lines
+    assert 'hits_total{route="/a"} 2' in lines
+
+
+def test_label_values_are_escaped():
+    counter = Counter("c_total", "C.", ("path",))
+    counter.inc(('say "hi"\n',))
+
+    assert counter.render()[-1] == 'c_total{path="say \\"hi\\"\\n"} 1'
+
+
+def test_command_timer_labels_by_collection_and_command():
+    timer = CommandTimer()
+    before = metrics.db_latency.count(("bookings", "find"))
+    failures = metrics.db_failures.value(("bookings", "insert"))
+
+    _command(timer, "find", {"find": "bookings", "filter": {}}, 1)
+    _command(timer, "getMore", {"getMore": 123, "collection": "bookings"}, 2)
+    _command(timer, "insert", {"insert": "bookings"}, 3, failed=True)
+    _command(timer, "hello", {"hello": 1}, 4)
+
+    assert metrics.db_latency.count(("bookings", "find")) == before + 1
+    assert metrics.db_latency.count(("bookings", "getMore")) >= 1
+    assert metrics.db_latency.count(("", "hello")) >= 1
+    assert metrics.db_failures.value(("bookings", "insert")) == failures + 1
+    assert timer._pending == {}
+
+
+def _app(timer):
+    app = FastAPI()
+
+    @app.get("/api/items/{item_id}")
+    async def get_item(item_id: str):
+        # an N+1 in miniature; Motor would issue these from its executor threads
+        for n in range(3):
+            await asyncio.to_thread(_command, timer, "find", {"find": "items"}, n)
+        return {"id": item_id}
+
+    return app
+
+
+def _call(asgi, path, app):
+    scope = {"type": "http", "method": "GET", "path": path, "raw_path": path.encode(), "root_path": "",
+             "query_string": b"", "headers": [], "app": app, "scheme": "http", "server": ("test", 80)}
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi(scope, receive, send))
+    return sent[0]
+
+
+def test_middleware_records_route_template_and_query_count():
+    timer = CommandTimer()
+    app = _app(timer)
+    asgi = MetricsMiddleware(app, debug=True)
+    labels = ("GET", "/api/items/{item_id}")
+    before = metrics.http_requests.value(labels + ("200",))
+
+    start = _call(asgi, "/api/items/42", app)
+    _call(asgi, "/api/items/43", app)
+
+    assert start["status"] == 200
+    assert (QUERY_COUNT_HEADER.lower().encode(), b"3") in start["headers"]
+    assert metrics.http_requests.value(labels + ("200",)) == before + 2
+    assert metrics.http_in_flight.value(labels) == 0
+    assert metrics.http_db_commands.count(labels) >= 2
+    assert 'route="/api/items/42"' not in metrics.registry.render()
+
+
+def test_unknown_paths_share_one_label_and_no_header_outside_debug():
+    app = _app(CommandTimer())
+    asgi = MetricsMiddleware(app, debug=False)
+
+    start = _call(asgi, "/nope/1", app)
+
+    assert start["status"] == 404
+    assert all(name != QUERY_COUNT_HEADER.lower().encode() for name, _ in start["headers"])
+    assert metrics.http_requests.value(("GET", metrics.UNMATCHED_ROUTE, "404")) >= 1
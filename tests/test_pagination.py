@@ -0,0 +1,80 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from api.pagination import PageParams, decode_cursor, encode_cursor, paginate
+
+
+def test_cursor_round_trips_datetimes_and_strings():
+    values = [datetime(2025, 3, 1, 12, 30, tzinfo=timezone.utc), "abc"]
+    assert decode_cursor(encode_cursor(values)) == values
+
+
+def test_garbage_cursor_is_rejected():
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("not-a-cursor")
+    assert exc.value.status_code == 400
+
+
+def test_paginate_walks_every_document_once_with_ties(fake_db):
+    async def scenario():
+        # Three documents share each timestamp so the id tie-breaker matters
+        await fake_db.items.insert_many([
+            {"id": f"{i:03d}", "owner": "a", "created_at": f"2025-01-01T00:00:{i // 3:02d}"}
+            for i in range(20)
+        ] + [{"id": "x", "owner": "b", "created_at": "2025-01-01T00:00:00"}])
+        seen, cursor = [], None
+        while True:
+            docs, cursor = await paginate(fake_db.items, {"owner": "a"}, {"_id": 0}, PageParams(limit=6, cursor=cursor))
+            seen.extend(d["id"] for d in docs)
+            if cursor is None:
+                return seen
+
+    seen = asyncio.run(scenario())
+
+    assert seen == [f"{i:03d}" for i in reversed(range(20))]
+
+
+def test_paginate_reaches_documents_missing_the_sort_key(fake_db):
+    async def scenario():
+        await fake_db.items.insert_many(
+            [{"id": f"{i:02d}", "created_at": f"2025-01-01T00:00:{i:02d}"} for i in range(5)]
+            + [{"id": "n1", "created_at": None}, {"id": "n2"}, {"id": "n3"}]
+        )
+        seen, cursor = [], None
+        while True:
+            docs, cursor = await paginate(fake_db.items, {}, {"_id": 0}, PageParams(limit=2, cursor=cursor))
+            seen.extend(d["id"] for d in docs)
+            if cursor is None:
+                return seen
+
+    seen = asyncio.run(scenario())
+
+    # newest first, then the undated ones (which sort as null) by id
+    assert seen == ["04", "03", "02", "01", "00", "n3", "n2", "n1"]
+
+
+
+def test_paginate_walks_mixed_string_and_date_timestamps(fake_db):
+    # part way through migrate_timestamps: some created_at are dates, some still ISO strings
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    def created(i):
+        value = base.replace(minute=i)
+        return value if i % 2 else value.isoformat()
+
+    async def scenario():
+        await fake_db.items.insert_many([{"id": f"{i:02d}", "created_at": created(i)} for i in range(9)])
+        seen, cursor = [], None
+        while True:
+            docs, cursor = await paginate(fake_db.items, {}, {"_id": 0}, PageParams(limit=2, cursor=cursor))
+            seen.extend(d["id"] for d in docs)
+            if cursor is None:
+                return seen
+
+    seen = asyncio.run(scenario())
+
+    # dates sort above strings, so each type comes out newest first in turn
+    assert seen == ["07", "05", "03", "01", "08", "06", "04", "02", "00"]
@@ -0,0 +1,53 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+import server
+from api.passwords import BCRYPT_ROUNDS, PasswordHasher, pwd_context
+
+
+def test_full_pool_and_queue_shed_load_with_503():
+    hasher = PasswordHasher(workers=1, max_queue=1)
+    gate = threading.Event()
+
+    async def go():
+        running = hasher._submit(gate.wait)
+        queued = hasher._submit(gate.wait)
+        with pytest.raises(HTTPException) as shed:
+            hasher._submit(gate.wait)
+        gate.set()
+        await asyncio.gather(running, queued)
+        # capacity is back once the hashes finish
+        await hasher._submit(lambda: None)
+        return shed.value
+
+    try:
+        error = asyncio.run(go())
+    finally:
+        gate.set()
+        hasher.shutdown()
+
+    assert error.status_code == 503
+    assert error.headers == {"Retry-After": "1"}
+    assert hasher.pending == 0
+
+
+def test_login_rewrites_a_hash_with_an_outdated_cost(fake_db):
+    weak = pwd_context.handler("bcrypt").using(rounds=4).hash("s3cret-pass")
+    fake_db.users.docs = [{"id": "u1", "email": "u1@example.com", "full_name": "U", "role": "user", "password": weak}]
+
+    async def login():
+        return await server.login(server.UserLogin(email="u1@example.com", password="s3cret-pass"), db=fake_db)
+
+    first = asyncio.run(login())
+    upgraded = fake_db.users.docs[0]["password"]
+    second = asyncio.run(login())
+
+    assert "access_token" in first and "access_token" in second
+    assert upgraded != weak
+    assert pwd_context.verify("s3cret-pass", upgraded)
+    assert pwd_context.handler("bcrypt").from_string(upgraded).rounds == BCRYPT_ROUNDS
+    # the upgraded hash is current, so the second login leaves it alone
+    assert fake_db.users.docs[0]["password"] == upgraded
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException, Response
+
+from api.pagination import PageParams
+from api.photographer_search import search_photographers
+
+
+async def _seed(db):
+    profiles = [
+        ("a", "Asha Rao", ["Wedding"], "Pune", 8, 4.8),
+        ("b", "Ben Das", ["Portrait"], "Mumbai", 2, 3.9),
+        ("c", "Chitra Iyer", ["Wedding", "Portrait"], "Pune", 5, 4.2),
+        ("d", "Dev Pending", ["Wedding"], "Pune", 10, 5.0),
+    ]
+    await db.photographer_profiles.insert_many([
+        {
+            "id": f"profile-{key}",
+            "user_id": key,
+            "full_name": name,
+            "bio": "bio",
+            "specialties": specialties,
+            "experience_years": years,
+            "phone": "123",
+            "location": location,
+            "location_lc": location.lower(),
+            "average_rating": rating,
+            "rating_count": 3,
+            "approval_status": "pending" if key == "d" else "approved",
+            "created_at": f"2025-01-0{i + 1}T00:00:00+00:00",
+        }
+        for i, (key, name, specialties, location, years, rating) in enumerate(profiles)
+    ])
+    await db.packages.insert_many([
+        {"id": "pkg-a", "photographer_id": "a", "price": 50000},
+        {"id": "pkg-b", "photographer_id": "b", "price": 8000},
+        {"id": "pkg-c", "photographer_id": "c", "price": 15000},
+    ])
+    db.commands.clear()
+
+
+def _search(db, limit=100, cursor=None, **filters):
+    params = dict(q=None, specialty=None, location=None, min_experience=None, min_price=None, max_price=None, sort=None)
+    params.update(filters)
+    response = Response()
+    result = asyncio.run(search_photographers(response, page=PageParams(limit=limit, cursor=cursor), db=db, **params))
+    return result, response
+
+
+def test_filters_combine_and_skip_unapproved(fake_db):
+    asyncio.run(_seed(fake_db))
+
+    result, _ = _search(fake_db, specialty="Wedding", location="pu", min_experience=3)
+
+    assert [r["user"]["id"] for r in result] == ["c", "a"]
+    assert result[0]["user"]["full_name"] == "Chitra Iyer"
+    assert "phone" not in result[0]["profile"]
+
+
+def test_price_filter_uses_one_distinct(fake_db):
+    asyncio.run(_seed(fake_db))
+
+    result, _ = _search(fake_db, min_price=5000, max_price=20000, sort="rating")
+
+    assert [r["user"]["id"] for r in result] == ["c", "b"]
+    assert fake_db.commands == [("distinct", "packages"), ("find", "photographer_profiles")]
+
+
+def test_sorted_pages_follow_cursor(fake_db):
+    asyncio.run(_seed(fake_db))
+
+    first, response = _search(fake_db, limit=2, sort="experience")
+    second, _ = _search(fake_db, limit=2, sort="experience", cursor=response.headers["X-Next-Cursor"])
+
+    assert [r["user"]["id"] for r in first + second] == ["a", "c", "b"]
+
+
+def test_rejects_unknown_sort(fake_db):
+    with pytest.raises(HTTPException) as exc:
+        _search(fake_db, sort="cheapest")
+    assert exc.value.status_code == 400
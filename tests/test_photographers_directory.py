@@ -0,0 +1,63 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+import server
+from api.pagination import PageParams
+
+
+async def _seed(db, n):
+    users, profiles = [], []
+    for i in range(n):
+        created = datetime(2025, 1, 1, tzinfo=timezone.utc).replace(minute=i % 60, hour=i // 60).isoformat()
+        user_id = f"user-{i}"
+        users.append({
+            "id": user_id,
+            "email": f"p{i}@example.com",
+            "full_name": f"Photographer {i}",
+            "role": "photographer",
+            "password": "hashed",
+            "created_at": created,
+        })
+        profiles.append({
+            "id": f"profile-{i}",
+            "user_id": user_id,
+            "bio": "bio",
+            "specialties": ["Wedding"],
+            "experience_years": 3,
+            "phone": "123",
+            "location": "Pune",
+            "approval_status": "approved",
+            "created_at": created,
+        })
+    await db.users.insert_many(users)
+    await db.photographer_profiles.insert_many(profiles)
+    db.commands.clear()
+
+
+def _listings(db):
+    response = asyncio.run(server.get_all_photographers(PageParams(limit=100, cursor=None), db=db))
+    return json.loads(response.body)
+
+
+@pytest.mark.parametrize("n", [0, 1, 5, 50])
+def test_get_all_photographers_issues_constant_queries(fake_db, n):
+    asyncio.run(_seed(fake_db, n))
+
+    result = _listings(fake_db)
+
+    assert len(result) == n
+    assert fake_db.commands == [("find", "photographer_profiles"), ("find", "users")]
+
+
+def test_get_all_photographers_response_shape(fake_db):
+    asyncio.run(_seed(fake_db, 2))
+
+    result = _listings(fake_db)
+
+    assert set(result[0]) == {"profile", "user"}
+    assert result[0]["profile"]["user_id"] == result[0]["user"]["id"]
+    assert "password" not in result[0]["user"]
+    assert {r["profile"]["created_at"] for r in result} == {"2025-01-01T00:00:00Z", "2025-01-01T00:01:00Z"}
@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from api import database
+from api.jobs import JOBS_COLLECTION
+from api.ratings import apply_rating_change, rating_delta_pipeline
+from api.reviews_ratings import ReviewSchema, add_or_update_review
+
+
+@pytest.fixture(autouse=True)
+def standalone(monkeypatch):
+    monkeypatch.setattr(database, "_transactions", False)
+
+
+def _deltas(pipeline):
+    return {field: expr["$add"][1] for field, expr in pipeline[0]["$set"].items()}
+
+
+def test_new_review_increments_count_sum_and_bucket():
+    assert _deltas(rating_delta_pipeline(4, None)) == {
+        "rating_sum": 4,
+        "rating_count": 1,
+        "rating_histogram.4": 1,
+    }
+
+
+def test_edit_moves_between_buckets_without_touching_count():
+    assert _deltas(rating_delta_pipeline(2, 5)) == {
+        "rating_sum": -3,
+        "rating_count": 0,
+        "rating_histogram.2": 1,
+        "rating_histogram.5": -1,
+    }
+
+
+def test_same_rating_edit_is_a_no_op():
+    assert _deltas(rating_delta_pipeline(3, 3)) == {
+        "rating_sum": 0,
+        "rating_count": 0,
+        "rating_histogram.3": 0,
+    }
+
+
+def _apply(db, *changes):
+    async def go():
+        return [await apply_rating_change(db, "p1", new, old) for new, old in changes]
+
+    return asyncio.run(go())
+
+
+def test_pipeline_starts_a_profile_without_aggregates_from_zero(fake_db):
+    fake_db.photographer_profiles.docs = [{"user_id": "p1"}]
+
+    averages = _apply(fake_db, (4, None), (5, None), (1, None))
+
+    profile = fake_db.photographer_profiles.docs[0]
+    assert averages == [4, 4.5, 3.33]
+    assert (profile["rating_sum"], profile["rating_count"]) == (10, 3)
+    assert profile["rating_histogram"] == {"1": 1, "4": 1, "5": 1}
+
+
+def test_pipeline_moves_an_edit_between_buckets_and_handles_removal(fake_db):
+    fake_db.photographer_profiles.docs = [{
+        "user_id": "p1", "rating_sum": 7, "rating_count": 2, "average_rating": 3.5,
+        "rating_histogram": {"1": 0, "2": 1, "3": 0, "4": 0, "5": 1},
+    }]
+
+    edited, removed, emptied = _apply(fake_db, (4, 2), (None, 5), (None, 4))
+
+    profile = fake_db.photographer_profiles.docs[0]
+    assert (edited, removed, emptied) == (4.5, 4, 0)
+    assert (profile["rating_sum"], profile["rating_count"]) == (0, 0)
+    assert profile["rating_histogram"] == {"1": 0, "2": 0, "3": 0, "4": 0, "5": 0}
+
+
+def test_pipeline_on_a_missing_profile_returns_zero(fake_db):
+    assert _apply(fake_db, (5, None)) == [0]
+
+
+def test_review_write_moves_the_aggregates_in_the_request(fake_db):
+    fake_db.photographer_profiles.docs = [{"user_id": "p1"}]
+
+    async def go():
+        first = await add_or_update_review(ReviewSchema(photographer_id="p1", user_id="u1", rating=4), fake_db)
+        second = await add_or_update_review(ReviewSchema(photographer_id="p1", user_id="u2", rating=1), fake_db)
+        edit = await add_or_update_review(ReviewSchema(photographer_id="p1", user_id="u2", rating=3), fake_db)
+        return first, second, edit
+
+    first, second, edit = asyncio.run(go())
+
+    assert first == {"message": "Review added successfully", "average_rating": 4}
+    assert second["average_rating"] == 2.5
+    assert edit == {"message": "Review updated successfully", "average_rating": 3.5}
+    profile = fake_db.photographer_profiles.docs[0]
+    assert profile["rating_sum"] == 7
+    assert profile["rating_count"] == 2
+    assert profile["rating_histogram"] == {"1": 0, "3": 1, "4": 1}
+    # applied in place, nothing left for the job queue
+    assert fake_db[JOBS_COLLECTION].docs == []
+
+
+def test_concurrent_first_review_is_retried_as_an_edit(fake_db):
+    fake_db.photographer_profiles.docs = [{"user_id": "p1"}]
+    reviews = fake_db.reviews
+    upsert = reviews.find_one_and_update
+
+    async def racing(query, update, **kwargs):
+        if not reviews.docs:
+            # the same user's other request inserts first, then our upsert hits the unique index
+            reviews.docs.append({"id": "other", "photographer_id": "p1", "user_id": "u1", "rating": 2})
+            await apply_rating_change(fake_db, "p1", 2, None)
+            raise DuplicateKeyError("E11000 duplicate key error collection: reviews")
+        return await upsert(query, update, **kwargs)
+
+    reviews.find_one_and_update = racing
+
+    result = asyncio.run(add_or_update_review(ReviewSchema(photographer_id="p1", user_id="u1", rating=5), fake_db))
+
+    profile = fake_db.photographer_profiles.docs[0]
+    assert result == {"message": "Review updated successfully", "average_rating": 5}
+    assert [r["rating"] for r in reviews.docs] == [5]
+    assert (profile["rating_sum"], profile["rating_count"]) == (5, 1)
+    assert profile["rating_histogram"] == {"2": 0, "5": 1}
@@ -0,0 +1,87 @@
+import asyncio
+
+from api.search_index import SearchIndex, SearchIndexHolder, bounded_levenshtein
+
+
+def _profile(user_id, full_name, specialties, location, bio, status="approved"):
+    return {
+        "user_id": user_id,
+        "full_name": full_name,
+        "specialties": specialties,
+        "location": location,
+        "bio": bio,
+        "approval_status": status,
+    }
+
+
+def _index():
+    return SearchIndex.from_profiles([
+        _profile("a", "Asha Rao", ["Wedding"], "Pune", "Candid wedding stories"),
+        _profile("b", "Ben Das", ["Portrait"], "Mumbai", "Studio portraits and headshots"),
+        _profile("c", "Chitra Iyer", ["Wedding", "Portrait"], "Pune", "Natural light"),
+        _profile("d", "Dev Pending", ["Wedding"], "Pune", "Wedding wedding", status="pending"),
+    ])
+
+
+def _ids(results):
+    return [r["user"]["id"] for r in results]
+
+
+def test_bounded_levenshtein():
+    assert bounded_levenshtein("wedding", "weddign", 2) == 1
+    assert bounded_levenshtein("wedding", "wdedign", 1) is None
+    assert bounded_levenshtein("pune", "pne", 1) == 1
+    assert bounded_levenshtein("pune", "mumbai", 1) is None
+
+
+def test_prefix_typo_and_all_tokens_required():
+    index = _index()
+
+    assert set(_ids(index.search("wed"))) == {"a", "c"}
+    assert set(_ids(index.search("portriat"))) == {"b", "c"}
+    assert _ids(index.search("portrait pun")) == ["c"]
+    assert index.search("portrait goa") == []
+
+
+def test_name_outranks_bio_and_cards_are_shaped():
+    index = SearchIndex.from_profiles([
+        _profile("a", "Meera Shah", ["Event"], "Goa", "Worked with Kavya on many shoots"),
+        _profile("b", "Kavya Nair", ["Event"], "Goa", "Event photographer"),
+    ])
+
+    results = index.search("kavya")
+
+    assert _ids(results) == ["b", "a"]
+    assert results[0]["user"] == {"id": "b", "full_name": "Kavya Nair"}
+    assert results[0]["profile"]["location"] == "Goa"
+
+
+def test_incremental_updates():
+    index = _index()
+
+    index.upsert(_profile("d", "Dev Rao", ["Wedding"], "Goa", "Beach weddings"))
+    index.upsert(_profile("b", "Ben Das", ["Portrait"], "Mumbai", "Studio", status="rejected"))
+    index.remove("a")
+
+    assert _ids(index.search("goa")) == ["d"]
+    assert "b" not in _ids(index.search("portrait"))
+    assert "a" not in _ids(index.search("wedding"))
+    assert "asha" not in index.vocabulary
+
+
+def test_rebuild_replays_concurrent_writes(fake_db):
+    asyncio.run(fake_db.photographer_profiles.insert_many([
+        _profile("a", "Asha Rao", ["Wedding"], "Pune", "Candid"),
+    ]))
+    holder = SearchIndexHolder()
+
+    async def rebuild_while_writing():
+        rebuild = asyncio.create_task(holder.rebuild(fake_db))
+        await asyncio.sleep(0)
+        holder.upsert(_profile("b", "Ben Das", ["Portrait"], "Mumbai", "Studio"))
+        await rebuild
+
+    asyncio.run(rebuild_while_writing())
+
+    assert _ids(holder.search("asha")) == ["a"]
+    assert _ids(holder.search("ben")) == ["b"]
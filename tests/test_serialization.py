@@ -0,0 +1,28 @@
+import json
+
+from api.auth import User
+from api.serialization import dump_list, list_adapter, list_response
+
+
+def _user(i, **extra):
+    return {"id": f"u{i}", "email": f"u{i}@example.com", "full_name": f"User {i}", "role": "user",
+            "created_at": "2025-01-01T10:00:00+00:00", **extra}
+
+
+def test_dump_list_parses_iso_dates_and_drops_unknown_fields():
+    body = json.loads(dump_list(User, [_user(1, password="hashed", restriction_reason="spam")]))
+
+    assert body == [{"id": "u1", "email": "u1@example.com", "full_name": "User 1", "role": "user", "restricted": False,
+                     "created_at": "2025-01-01T10:00:00Z"}]
+
+
+def test_list_adapter_is_built_once_per_model():
+    assert list_adapter(User) is list_adapter(User)
+
+
+def test_list_response_carries_headers():
+    response = list_response(User, [_user(1), _user(2)], {"X-Next-Cursor": "abc"})
+
+    assert response.media_type == "application/json"
+    assert response.headers["x-next-cursor"] == "abc"
+    assert [u["id"] for u in json.loads(response.body)] == ["u1", "u2"]
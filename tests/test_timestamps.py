@@ -0,0 +1,75 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from api.timestamps import MIGRATIONS_COLLECTION, migrate_field, parse_timestamp
+
+UTC_NOON = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("value", ["2025-01-01T12:00:00+00:00", "2025-01-01T17:30:00+05:30", "2025-01-01T12:00:00"])
+def test_parse_timestamp_normalizes_to_utc(value):
+    parsed = parse_timestamp(value)
+
+    assert parsed == UTC_NOON
+    assert parsed.tzinfo == timezone.utc
+
+
+@pytest.mark.parametrize("value", ["yesterday", "", None])
+def test_parse_timestamp_rejects_garbage(value):
+    assert parse_timestamp(value) is None
+
+
+def _seed(db, n):
+    db.packages.docs = [
+        {"_id": i, "id": f"pkg-{i}", "created_at": UTC_NOON if i % 3 == 0 else UTC_NOON.isoformat()}
+        for i in range(n)
+    ]
+    db.packages.docs.append({"_id": n, "id": "broken", "created_at": "not a date"})
+
+
+def test_migrate_field_converts_strings_in_batches(fake_db):
+    _seed(fake_db, 10)
+
+    converted, unparseable = asyncio.run(migrate_field(fake_db, "packages", "created_at", batch_size=4))
+
+    assert (converted, unparseable) == (6, 1)
+    assert all(d["created_at"] == UTC_NOON for d in fake_db.packages.docs if d["id"] != "broken")
+    assert fake_db.commands.count(("bulkWrite", "packages")) == 2
+    assert fake_db[MIGRATIONS_COLLECTION].docs[0]["last_id"] == 10
+
+
+def test_migrate_field_resumes_after_its_checkpoint(fake_db):
+    _seed(fake_db, 10)
+    fake_db[MIGRATIONS_COLLECTION].docs = [
+        {"_id": "timestamps:packages.created_at", "last_id": 5, "converted": 4, "unparseable": 0},
+    ]
+
+    converted, _ = asyncio.run(migrate_field(fake_db, "packages", "created_at"))
+
+    assert converted == 4 + 2  # ids 7 and 8 (6 and 9 were already dates)
+    assert isinstance(fake_db.packages.docs[1]["created_at"], str)  # before the checkpoint, untouched
+
+
+def test_migrate_field_skips_values_changed_since_they_were_read(fake_db):
+    fake_db.packages.docs = [{"_id": 1, "created_at": "2025-01-01T12:00:00+00:00"}]
+    real_find = fake_db.packages.find
+
+    def find_then_concurrent_write(query, projection=None):
+        cursor = real_find(query, projection)
+        real_to_list = cursor.to_list
+
+        async def to_list(length=None):
+            docs = await real_to_list(length)
+            fake_db.packages.docs[0]["created_at"] = UTC_NOON  # written by the app meanwhile
+            return docs
+
+        cursor.to_list = to_list
+        return cursor
+
+    fake_db.packages.find = find_then_concurrent_write
+    converted, _ = asyncio.run(migrate_field(fake_db, "packages", "created_at"))
+
+    assert converted == 0
+    assert fake_db.packages.docs[0]["created_at"] == UTC_NOON
@@ -0,0 +1,58 @@
+import asyncio
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from api.auth import ALGORITHM, SECRET_KEY, User, UserCache, invalidate_user, user_cache, user_from_token
+
+
+def _user(user_id):
+    return User(id=user_id, email=f"{user_id}@example.com", full_name=user_id, role="user")
+
+
+def test_lru_evicts_least_recently_used():
+    cache = UserCache(maxsize=2, ttl=60)
+    for user_id in ("a", "b"):
+        cache.set(user_id, _user(user_id), cache.generation)
+    cache.get("a")
+    cache.set("c", _user("c"), cache.generation)
+
+    assert cache.get("b") is None
+    assert cache.get("a").id == "a"
+    assert cache.get("c").id == "c"
+
+
+def test_entries_expire_after_ttl():
+    cache = UserCache(maxsize=10, ttl=-1)
+    cache.set("a", _user("a"), cache.generation)
+    assert cache.get("a") is None
+
+
+def test_invalidation_blocks_in_flight_write_back():
+    cache = UserCache(maxsize=10, ttl=60)
+    generation = cache.generation  # lookup starts
+    cache.invalidate("a")          # user restricted meanwhile
+    cache.set("a", _user("a"), generation)
+
+    assert cache.get("a") is None
+
+
+@pytest.fixture
+def token():
+    user_cache.clear()
+    yield jwt.encode({"sub": "p1"}, SECRET_KEY, algorithm=ALGORITHM)
+    user_cache.clear()
+
+
+def test_restricted_user_is_refused_once_evicted(fake_db, token):
+    fake_db.users.docs = [{"id": "p1", "email": "p1@example.com", "full_name": "P", "role": "photographer"}]
+    assert asyncio.run(user_from_token(token, fake_db)).id == "p1"
+
+    fake_db.users.docs[0]["restricted"] = True
+    invalidate_user("p1")
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(user_from_token(token, fake_db))
+    assert exc.value.status_code == 403
+    assert user_cache.get("p1") is None